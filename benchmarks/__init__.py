@@ -0,0 +1,5 @@
+"""Benchmarks for PromptForge.
+
+The benchmarks run against a deterministic fake Gemini model so they can be
+executed offline and without spending API quota.
+"""
@@ -0,0 +1,161 @@
+"""Benchmark inline vs out-of-row compressed storage of project texts.
+
+Seeds a database in the layout used before the artifacts table, with the
+refined prompt, checklist and Cursor rules stored inline in every
+``projects`` row and a share of cloned projects repeating the texts of
+another one, and with the full-text index of that layout. It then times a
+page of the project list, a scan of every row and a bulk load of rows,
+moves the texts into the artifacts table with the schema migrations run by
+``flask db --upgrade`` and times the same queries again. Both database files are compacted before
+they are measured.
+
+Usage:
+    python -m benchmarks.bench_artifact_storage [--projects 5000] [--clones 0.2]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from sqlalchemy import text  # noqa: E402
+
+from src.database import get_engine, init_db  # noqa: E402
+
+VOCABULARY = [f"term{index}" for index in range(1500)]
+PHRASES = [
+    "Implement the endpoint and validate its input",
+    "Add unit tests covering the error paths",
+    "Use environment variables for configuration",
+    "Keep functions small and add type hints",
+    "Document public functions with docstrings",
+    "Handle database errors and roll back the session",
+]
+
+# Queries timed before and after the conversion
+QUERIES = {
+    "list page": (
+        "SELECT id, name, substr(description, 1, 101), created_at FROM projects "
+        "ORDER BY created_at DESC, id DESC LIMIT 21 OFFSET 2000"
+    ),
+    "scan": "SELECT count(*) FROM projects WHERE description LIKE '%needle%'",
+    "load 1000 rows": "SELECT * FROM projects ORDER BY id LIMIT 1000",
+}
+
+
+def document(rng: random.Random, lines: int) -> str:
+    """Return generated markdown resembling a model-written artifact."""
+    body = []
+    for index in range(lines):
+        if index % 8 == 0:
+            body.append(f"## {' '.join(rng.choices(VOCABULARY, k=3)).title()}")
+        body.append(
+            f"- [ ] {rng.choice(PHRASES)} for {' '.join(rng.choices(VOCABULARY, k=6))}."
+        )
+    return "\n".join(body)
+
+
+def seed_inline(projects: int, clone_share: float, rng: random.Random) -> None:
+    """Create the pre-artifacts ``projects`` table and its search index."""
+    engine = get_engine()
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE projects (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL "
+            "UNIQUE, description TEXT, refined_prompt TEXT, frameworks_languages TEXT, "
+            "checklist_steps TEXT, cursor_rules_content TEXT, created_at DATETIME NOT NULL, "
+            "updated_at DATETIME NOT NULL)"
+        ))
+        connection.execute(text("CREATE INDEX ix_projects_created_at ON projects (created_at)"))
+        connection.execute(text(
+            "CREATE VIRTUAL TABLE projects_fts USING fts5(name, description, "
+            "refined_prompt, frameworks_languages, checklist_steps, content='projects', "
+            "content_rowid='id', tokenize='porter unicode61')"
+        ))
+
+        started = datetime(2024, 1, 1)
+        originals: list[dict] = []
+        for offset in range(0, projects, 1000):
+            rows = []
+            for index in range(offset, min(offset + 1000, projects)):
+                if originals and rng.random() < clone_share:
+                    texts = dict(rng.choice(originals))
+                else:
+                    texts = {
+                        "refined_prompt": document(rng, 30),
+                        "checklist_steps": document(rng, 40),
+                        "cursor_rules_content": document(rng, 60),
+                    }
+                    originals.append(texts)
+                rows.append({
+                    "id": index + 1,
+                    "name": f"Project {index}",
+                    "description": " ".join(rng.choices(VOCABULARY, k=40)),
+                    "frameworks_languages": "Backend: Flask\nDatabase: SQLite",
+                    "created_at": started + timedelta(seconds=index),
+                    "updated_at": started + timedelta(seconds=index),
+                    **texts,
+                })
+            connection.execute(text(
+                "INSERT INTO projects VALUES (:id, :name, :description, :refined_prompt, "
+                ":frameworks_languages, :checklist_steps, :cursor_rules_content, "
+                ":created_at, :updated_at)"
+            ), rows)
+        connection.execute(text("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')"))
+
+
+def vacuum_and_measure() -> float:
+    """Compact the database file and return its size in megabytes."""
+    engine = get_engine()
+    with engine.connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+    return os.path.getsize(engine.url.database) / 1024 / 1024
+
+
+def time_queries(repeat: int) -> dict[str, float]:
+    """Return the median latency of every query in QUERIES in milliseconds."""
+    timings = {}
+    with get_engine().connect() as connection:
+        for name, sql in QUERIES.items():
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                connection.execute(text(sql)).all()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(samples)
+    return timings
+
+
+def main() -> None:
+    """Parse arguments, measure both layouts and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--projects", type=int, default=5000)
+    parser.add_argument("--clones", type=float, default=0.2, help="share of cloned projects")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    seed_inline(args.projects, args.clones, random.Random(42))
+    results = {"inline": (vacuum_and_measure(), time_queries(args.repeat))}
+
+    started = time.perf_counter()
+    init_db()
+    elapsed = time.perf_counter() - started
+    results["artifacts"] = (vacuum_and_measure(), time_queries(args.repeat))
+
+    print(f"{args.projects} projects, {args.clones:.0%} clones, converted in {elapsed:.1f}s")
+    print(f"{'layout':>10}{'file MB':>9}" + "".join(f"{name + ' ms':>18}" for name in QUERIES))
+    for layout, (size, timings) in results.items():
+        print(
+            f"{layout:>10}{size:>9.1f}"
+            + "".join(f"{timings[name]:>18.2f}" for name in QUERIES)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark upstream calls per refinement chat turn.
+
+Drives the ``create_project`` chat through the Flask test client against a
+fake model and reports how many upstream calls and input tokens each turn
+costs, with the context budget in place and with it disabled. Without the
+budget the tokens per turn grow with the conversation; with it they level
+off, with an extra summarization call every few turns.
+
+Usage:
+    python -m benchmarks.bench_chat_turns [--turns 40] [--budget 4000]
+"""
+
+import argparse
+import os
+import tempfile
+from unittest import mock
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from benchmarks.fake_genai import FakeModel, patched_model  # noqa: E402
+from src import conversation  # noqa: E402
+from src.app import create_app  # noqa: E402
+from src.database import init_db  # noqa: E402
+
+# A reply of realistic length, so the history grows like a real one
+REPLY = (
+    "Thanks, that helps. Before we go further: who exactly are the users, "
+    "how many of them are there, which platforms must be supported, and what "
+    "should happen when two people edit the same record at the same time? "
+) * 3
+
+
+def run(turns: int, budget: int) -> list[tuple[int, int]]:
+    """Run one conversation and record the cost of every turn.
+
+    Args:
+        turns: Number of follow-up messages to send after starting the chat
+        budget: Context token budget to apply
+
+    Returns:
+        list[tuple[int, int]]: Upstream calls and estimated input tokens per
+        turn, starting with ``start_chat``
+    """
+    init_db()
+    app = create_app({"TESTING": True})
+    client = app.test_client()
+    costs = []
+
+    with mock.patch.object(conversation, "CONTEXT_TOKEN_BUDGET", budget), \
+            patched_model(FakeModel(reply=REPLY)) as model:
+        client.post("/create_project", data={
+            "action": "start_chat",
+            "name": "Benchmark Project",
+            "description": "A project used for benchmarking.",
+        })
+        costs.append((model.calls, model.input_tokens))
+
+        for turn in range(turns):
+            calls, tokens = model.calls, model.input_tokens
+            client.post("/create_project", data={
+                "action": "send_message",
+                "message": f"Requirement number {turn}: the system must handle case {turn} gracefully.",
+            })
+            costs.append((model.calls - calls, model.input_tokens - tokens))
+
+    return costs
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=40)
+    parser.add_argument("--budget", type=int, default=conversation.CONTEXT_TOKEN_BUDGET)
+    args = parser.parse_args()
+
+    for name, budget in (("no budget", 10 ** 9), (f"budget {args.budget}", args.budget)):
+        costs = run(args.turns, budget)
+        calls = sum(turn_calls for turn_calls, _ in costs)
+        tokens = [turn_tokens for _, turn_tokens in costs]
+        print(f"{name}:")
+        for turn in range(0, len(costs), max(1, len(costs) // 8)):
+            print(f"  turn {turn:>3}: {costs[turn][0]} call(s), ~{costs[turn][1]} tokens in")
+        print(
+            f"  total: {calls} upstream calls for {len(costs)} turns, "
+            f"~{sum(tokens)} tokens in, largest turn ~{max(tokens)} tokens"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""Load test of concurrent refinement chats in gevent serving mode.
+
+Serves the app from ``create_app`` with gevent's WSGI server, the server
+Gunicorn's gevent workers use, in a single monkey-patched process. For each
+concurrency level a separate client process starts that many chats at once
+and sends ``--messages`` turns per chat over HTTP, pausing ``--think``
+seconds between turns like a user typing, against a fake model that takes
+``--latency`` seconds per call like the real API. Chat turns are I/O bound,
+so the server process should keep the turn latency close to the model's and
+its peak memory should barely move as the number of concurrent chats grows.
+
+Requires gevent (``pip install gevent``).
+
+Usage:
+    python -m benchmarks.bench_concurrent_chats [--levels 50,200,400] [--messages 3] [--think 1]
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import http.cookiejar  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import resource  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+import urllib.error  # noqa: E402
+import urllib.parse  # noqa: E402
+import urllib.request  # noqa: E402
+from unittest import mock  # noqa: E402
+
+import gevent  # noqa: E402
+from gevent.pywsgi import WSGIServer  # noqa: E402
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+# Every turn waits on the fake model for longer than the default threshold
+os.environ.setdefault("SLOW_REQUEST_SECONDS", "60")
+
+from benchmarks.bench_scenarios import percentile  # noqa: E402
+from benchmarks.fake_genai import FakeModel, patched_model  # noqa: E402
+from src import gemini_config  # noqa: E402
+from src.app import create_app  # noqa: E402
+from src.database import init_db  # noqa: E402
+from src.llm_client import LLMClient  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident memory of this process in megabytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def chat(
+    base_url: str, index: int, messages: int, think: float
+) -> tuple[list[float], int]:
+    """Start a chat and send ``messages`` turns as one client.
+
+    Args:
+        base_url: Address of the server
+        index: Client number, used to keep project names unique
+        messages: Turns sent after the opening message
+        think: Seconds to wait before each turn
+
+    Returns:
+        tuple[list[float], int]: Latency of every request and the error count
+    """
+    opener = urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+    )
+    latencies, errors = [], 0
+    requests = [(
+        "/create_project",
+        urllib.parse.urlencode({
+            "action": "start_chat",
+            "name": f"Concurrent chat {index}",
+            "description": "A project used by the concurrency load test.",
+        }).encode(),
+        "application/x-www-form-urlencoded",
+    )] + [(
+        "/create_project/turn",
+        json.dumps({"message": f"Requirement {turn} of chat {index}."}).encode(),
+        "application/json",
+    ) for turn in range(messages)]
+
+    for number, (path, body, content_type) in enumerate(requests):
+        if number:
+            time.sleep(think)
+        started = time.perf_counter()
+        try:
+            with opener.open(urllib.request.Request(
+                base_url + path, data=body, headers={"Content-Type": content_type}
+            )) as response:
+                response.read()
+        except (urllib.error.URLError, ConnectionError):
+            errors += 1
+        latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+
+def run_clients(base_url: str, clients: int, messages: int, think: float, offset: int) -> dict:
+    """Run ``clients`` chats at once and summarize them."""
+    greenlets = [
+        gevent.spawn(chat, base_url, offset + index, messages, think)
+        for index in range(clients)
+    ]
+    gevent.joinall(greenlets)
+    latencies = [latency for greenlet in greenlets for latency in greenlet.value[0]]
+    return {
+        "requests": len(latencies),
+        "errors": sum(greenlet.value[1] for greenlet in greenlets),
+        "p50": percentile(latencies, 0.50),
+        "p95": percentile(latencies, 0.95),
+    }
+
+
+def run_level(base_url: str, clients: int, args: argparse.Namespace, offset: int) -> dict:
+    """Drive the server from a client process and add its peak memory."""
+    output = subprocess.run(
+        [
+            sys.executable, "-m", "benchmarks.bench_concurrent_chats",
+            "--client", base_url, "--levels", str(clients), "--offset", str(offset),
+            "--messages", str(args.messages), "--think", str(args.think),
+        ],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return {**json.loads(output), "peak_rss_mb": peak_rss_mb()}
+
+
+def main() -> None:
+    """Parse arguments, run every concurrency level and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", default="50,200,400", help="concurrent chats per run")
+    parser.add_argument("--messages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--think", type=float, default=1.0, help="seconds between turns")
+    parser.add_argument("--client", metavar="URL", help=argparse.SUPPRESS)
+    parser.add_argument("--offset", type=int, default=0, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.client:
+        print(json.dumps(run_clients(
+            args.client, int(args.levels), args.messages, args.think, args.offset
+        )))
+        return
+
+    init_db()
+    app = create_app({"TESTING": True})
+    server = WSGIServer(("127.0.0.1", 0), app, log=None, backlog=2048)
+    server.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    # No rate limits: the fake model is the only thing clients wait on
+    client = LLMClient(requests_per_minute=0, tokens_per_minute=0)
+    model = FakeModel(latency=args.latency)
+    levels = [int(level) for level in args.levels.split(",")]
+    with patched_model(model), mock.patch.object(gemini_config, "llm_client", client):
+        # Warm up imports, templates and the connection pool
+        run_clients(base_url, 5, 1, 0.0, offset=0)
+        baseline = peak_rss_mb()
+        print(f"model latency {args.latency:.2f}s, peak memory after warm-up {baseline:.0f}MB")
+        print(
+            f"{'chats':>6}{'requests':>10}{'errors':>8}{'req/s':>8}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'peak MB':>9}"
+        )
+        offset = 5
+        for clients in levels:
+            started = time.perf_counter()
+            result = run_level(base_url, clients, args, offset)
+            elapsed = time.perf_counter() - started
+            offset += clients
+            print(
+                f"{clients:>6}{result['requests']:>10}{result['errors']:>8}"
+                f"{result['requests'] / elapsed:>8.0f}"
+                f"{result['p50'] * 1000:>9.0f}{result['p95'] * 1000:>9.0f}"
+                f"{result['peak_rss_mb']:>9.0f}"
+            )
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Report the billed input tokens saved by caching the refined prompt.
+
+Generates one project per refined prompt size against a fake model posing
+as an SDK with context caching, and prints the token accounting of each
+generation: tokens sent, read from the cache and written to it, the input
+tokens billed (cached ones at ``GEMINI_CACHED_INPUT_RATIO``) and the tokens
+saved compared with sending every prompt whole. The fake model poses as
+``gemini-2.5-flash``; prompts below its minimum cacheable size are not
+cached. Each row is checked
+against the tokens the fake model actually received.
+
+Two fallbacks are then exercised on the largest prompt: an SDK without
+caching, and cached content that has expired before the stages use it.
+
+Usage:
+    python -m benchmarks.bench_context_cache [--sizes 500,4000,40000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from benchmarks.fake_genai import FakeModel, patched_model  # noqa: E402
+from src.context_cache import CACHED_INPUT_RATIO, TokenUsage  # noqa: E402
+from src.database import init_db  # noqa: E402
+from src.gemini_config import generate_project_data  # noqa: E402
+from src.llm_client import CHARS_PER_TOKEN  # noqa: E402
+
+MODEL_NAME = "models/gemini-2.5-flash"
+VOCABULARY = [f"requirement{index}" for index in range(2000)]
+
+COLUMNS = (
+    ("prompt", 8), ("calls", 6), ("input", 9), ("cached", 9), ("written", 9),
+    ("billed", 9), ("saved", 9), ("saved %", 8), ("stub", 6),
+)
+
+
+def refined_prompt(tokens: int, rng: random.Random) -> str:
+    """Return a refined prompt of about ``tokens`` tokens."""
+    words = []
+    length = 0
+    while length < tokens * CHARS_PER_TOKEN:
+        word = rng.choice(VOCABULARY)
+        words.append(word)
+        length += len(word) + 1
+    return "Project: Benchmark\nDescription: " + " ".join(words)
+
+
+def generate(prompt: str, model: FakeModel) -> TokenUsage:
+    """Generate a project with ``model`` and return the app's accounting."""
+    usage = TokenUsage()
+    with patched_model(model):
+        generate_project_data(prompt, bypass_cache=True, usage=usage)
+    return usage
+
+
+def stub_billed(model: FakeModel) -> float:
+    """Compute the billed input tokens from what the fake model received."""
+    uncached = model.input_tokens - model.cached_tokens
+    return uncached + model.cached_tokens * CACHED_INPUT_RATIO + model.cache_write_tokens
+
+
+def row(label: str, usage: TokenUsage, model: FakeModel) -> str:
+    """Format one generation of the report."""
+    report = usage.report()
+    matches = abs(stub_billed(model) - usage.billed_input_tokens) < 1
+    values = (
+        label,
+        report["calls"],
+        report["input_tokens"],
+        report["cached_tokens"],
+        report["cache_write_tokens"],
+        report["billed_input_tokens"],
+        report["saved_tokens"],
+        f"{report['saved_tokens'] / report['input_tokens']:.0%}",
+        "ok" if matches else "DIFF",
+    )
+    return "".join(f"{value:>{width}}" for value, (_, width) in zip(values, COLUMNS))
+
+
+def main() -> None:
+    """Parse arguments, generate the projects and print the report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="500,4000,40000")
+    args = parser.parse_args()
+    init_db()
+    rng = random.Random(42)
+    prompts = [refined_prompt(int(size), rng) for size in args.sizes.split(",")]
+
+    print(f"cached input tokens billed at {CACHED_INPUT_RATIO:.0%}; one project per row")
+    print("".join(f"{name:>{width}}" for name, width in COLUMNS))
+    for prompt in prompts:
+        model = FakeModel(context_caching=True, model_name=MODEL_NAME)
+        usage = generate(prompt, model)
+        print(row(str(len(prompt) // CHARS_PER_TOKEN), usage, model))
+        if model.cache_writes != model.cache_deletes:
+            print(f"  {model.cache_writes - model.cache_deletes} cached contents left behind")
+
+    largest = max(prompts, key=len)
+    print("\nfallbacks on the largest prompt")
+    for label, model in (
+        ("no SDK", FakeModel(context_caching=False, model_name=MODEL_NAME)),
+        ("expired", FakeModel(context_caching=True, cache_ttl=0, model_name=MODEL_NAME)),
+    ):
+        usage = generate(largest, model)
+        print(row(label, usage, model))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Concurrent read/write load test for the SQLite engine configuration.
+
+Starts several processes, as Gunicorn workers would, that hit the read
+routes through the Flask test client while also inserting and updating
+projects. Reports throughput and how many operations failed with
+"database is locked".
+
+Usage:
+    python -m benchmarks.bench_db_concurrency [--processes 4] [--seconds 5]
+    SQLITE_JOURNAL_MODE=DELETE python -m benchmarks.bench_db_concurrency
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+
+def worker(worker_id: int, seconds: float, write_ratio: float, results) -> None:
+    """Run mixed reads and writes for ``seconds`` and report the counts.
+
+    Args:
+        worker_id: Index of the process, used to keep project names unique
+        seconds: How long to generate load
+        write_ratio: Fraction of operations that write
+        results: Queue receiving ``(reads, writes, locked_errors)``
+    """
+    from sqlalchemy.exc import OperationalError
+
+    from src.app import create_app
+    from src.database import SessionLocal
+    from src.models import Project
+
+    app = create_app({"TESTING": True})
+    client = app.test_client()
+    rng = random.Random(worker_id)
+    reads = writes = locked = attempts = 0
+    deadline = time.monotonic() + seconds
+
+    try:
+        while time.monotonic() < deadline:
+            try:
+                if rng.random() < write_ratio:
+                    attempts += 1
+                    db = SessionLocal()
+                    try:
+                        project = Project(
+                            name=f"Worker {worker_id} project {attempts}",
+                            description="Load test project",
+                            refined_prompt="Prompt " * 200
+                        )
+                        db.add(project)
+                        db.commit()
+                        project.description = "Updated load test project"
+                        db.commit()
+                    finally:
+                        db.close()
+                    writes += 1
+                else:
+                    url = rng.choice(["/projects", "/projects/search?q=load", "/project/1"])
+                    response = client.get(url)
+                    if response.status_code >= 500:
+                        locked += 1
+                    reads += 1
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                locked += 1
+    finally:
+        results.put((reads, writes, locked))
+
+
+def main() -> None:
+    """Parse arguments, run the load test and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    from src.database import engine_settings, init_db
+
+    init_db()
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = [
+        context.Process(
+            target=worker, args=(index, args.seconds, args.write_ratio, results)
+        )
+        for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    reads = sum(result[0] for result in totals)
+    writes = sum(result[1] for result in totals)
+    locked = sum(result[2] for result in totals)
+    print(f"journal mode: {engine_settings()['SQLITE_JOURNAL_MODE']}")
+    print(f"processes: {args.processes}, duration: {args.seconds:.1f}s")
+    print(f"reads: {reads} ({reads / args.seconds:.0f}/s)")
+    print(f"writes: {writes} ({writes / args.seconds:.0f}/s)")
+    print(f"locked errors: {locked}")
+
+
+if __name__ == "__main__":
+    main()
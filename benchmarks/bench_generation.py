@@ -0,0 +1,83 @@
+"""Benchmark the wall time of ``generate_project_data``.
+
+Every upstream call sleeps for the same latency, so a sequential pipeline
+takes three latencies while the concurrent one should take about two (the
+frameworks -> cursor rules chain) however the stages are scheduled. A final
+run with the response cache enabled shows the cost of a repeat generation,
+and the single-call mode is measured for upstream calls and tokens.
+
+Usage:
+    python -m benchmarks.bench_generation [--latency 0.5] [--runs 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from benchmarks.fake_genai import FakeModel, patched_model  # noqa: E402
+from src.database import init_db  # noqa: E402
+from src.gemini_config import generate_project_data  # noqa: E402
+
+
+def run(
+    latency: float, runs: int, bypass_cache: bool = True, mode: str = "staged"
+) -> tuple[list[float], FakeModel]:
+    """Time ``runs`` generations of the same prompt against a fake model.
+
+    Args:
+        latency: Seconds each upstream call takes
+        runs: Number of generations to time
+        bypass_cache: Skip the response cache so every run calls upstream
+        mode: Generation mode passed to ``generate_project_data``
+
+    Returns:
+        tuple[list[float], FakeModel]: Wall time of each generation in
+        seconds and the fake model with its call and token counters
+    """
+    timings = []
+    with patched_model(FakeModel(latency=latency)) as model:
+        for _ in range(runs):
+            started = time.perf_counter()
+            generate_project_data(
+                "Project: Benchmark\nDescription: Timing run.",
+                bypass_cache=bypass_cache,
+                mode=mode,
+            )
+            timings.append(time.perf_counter() - started)
+    return timings, model
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    init_db()
+
+    timings, staged = run(args.latency, args.runs)
+    print(f"sequential (sum of stages): {3 * args.latency:.3f}s")
+    print(f"critical path (longest chain): {2 * args.latency:.3f}s")
+    for index, elapsed in enumerate(timings):
+        print(f"run {index}: {elapsed:.3f}s")
+
+    cached = run(args.latency, 1, bypass_cache=False)[0][0]
+    print(f"repeat with response cache: {cached:.3f}s")
+
+    single_timings, single = run(args.latency, args.runs, mode="single")
+    for name, model, runs in (("staged", staged, timings), ("single", single, single_timings)):
+        print(
+            f"{name} mode: {sum(runs) / len(runs):.3f}s, "
+            f"{model.calls / len(runs):.1f} calls, "
+            f"~{model.input_tokens // len(runs)} tokens in, "
+            f"~{model.output_tokens // len(runs)} tokens out per generation"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Exercise the shared model client against a flaky fake upstream.
+
+Sends a burst of concurrent generation requests through
+``gemini_config.generate_content`` twice: once against an upstream failing
+a share of calls with 503s, where retries should hide the failures, and once
+against an upstream that is down, where the circuit breaker should make the
+later requests fail immediately instead of each one retrying for seconds.
+
+Usage:
+    python -m benchmarks.bench_llm_client [--requests 40] [--failure-rate 0.3] [--rpm 600]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from benchmarks.fake_genai import FakeModel
+from src import gemini_config
+from src.llm_client import CircuitBreaker, LLMClient, UpstreamUnavailableError
+
+
+def burst(model: FakeModel, client: LLMClient, requests: int, concurrency: int) -> dict:
+    """Send ``requests`` prompts through ``client`` and summarize the outcome.
+
+    Args:
+        model: Fake upstream model
+        client: Client the calls go through
+        requests: Number of prompts to send
+        concurrency: Number of prompts in flight at once
+
+    Returns:
+        dict: Succeeded and failed counts, latencies and client statistics
+    """
+    def send(index: int) -> tuple[bool, float]:
+        started = time.perf_counter()
+        try:
+            gemini_config.generate_content(model, f"Prompt {index}")
+            return True, time.perf_counter() - started
+        except UpstreamUnavailableError:
+            return False, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with mock.patch.object(gemini_config, "llm_client", client):
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(send, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    failed = [latency for ok, latency in outcomes if not ok]
+    return {
+        "succeeded": len(outcomes) - len(failed),
+        "failed": len(failed),
+        "slowest_failure": max(failed, default=0.0),
+        "elapsed": elapsed,
+        "upstream_calls": model.calls,
+        **client.stats(),
+    }
+
+
+def main() -> None:
+    """Parse arguments, run both scenarios and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--failure-rate", type=float, default=0.3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rpm", type=int, default=600)
+    args = parser.parse_args()
+
+    def client() -> LLMClient:
+        return LLMClient(
+            requests_per_minute=args.rpm,
+            backoff_base=0.05,
+            backoff_max=0.5,
+            transient_errors=gemini_config.transient_errors,
+            breaker=CircuitBreaker(failure_threshold=5, reset_timeout=30),
+        )
+
+    scenarios = {
+        f"flaky upstream ({args.failure_rate:.0%} errors)": FakeModel(
+            latency=args.latency, failure_rate=args.failure_rate
+        ),
+        "upstream down": FakeModel(latency=args.latency, failure_rate=1.0),
+    }
+    for name, model in scenarios.items():
+        result = burst(model, client(), args.requests, args.concurrency)
+        print(f"{name}:")
+        print(
+            f"  succeeded {result['succeeded']}, failed {result['failed']} "
+            f"in {result['elapsed']:.2f}s"
+        )
+        print(
+            f"  upstream calls {result['upstream_calls']}, retries {result['retries']}, "
+            f"rejected by breaker {result['rejected']}, throttled {result['throttled']}, "
+            f"breaker {result['breaker']}"
+        )
+        print(f"  slowest failure: {result['slowest_failure']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark ``/projects`` latency as the number of projects grows.
+
+Seeds the database with projects carrying realistically large text columns,
+then times the first page and a deep page reached by following the
+pagination cursor.
+
+Usage:
+    python -m benchmarks.bench_project_listing [--sizes 100 1000 10000 100000]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from src.app import create_app  # noqa: E402
+from src.database import SessionLocal, init_db  # noqa: E402
+from src.models import Project  # noqa: E402
+from src.storage import store_project_texts  # noqa: E402
+
+LARGE_TEXT = "Lorem ipsum dolor sit amet. " * 50
+
+
+def seed(total: int) -> None:
+    """Grow the projects table to ``total`` rows.
+
+    Args:
+        total: Number of projects the table should contain
+    """
+    db = SessionLocal()
+    try:
+        existing = db.scalar(select(func.count()).select_from(Project)) or 0
+        started = datetime(2024, 1, 1)
+        for offset in range(existing, total, 5000):
+            rows = [
+                {
+                    "name": f"Project {index}",
+                    "description": LARGE_TEXT,
+                    "refined_prompt": LARGE_TEXT,
+                    "frameworks_languages": LARGE_TEXT,
+                    "checklist_steps": LARGE_TEXT,
+                    "cursor_rules_content": LARGE_TEXT,
+                    "created_at": started + timedelta(seconds=index),
+                    "updated_at": started + timedelta(seconds=index),
+                }
+                for index in range(offset, min(offset + 5000, total))
+            ]
+            db.execute(insert(Project), store_project_texts(db, rows))
+        db.commit()
+    finally:
+        db.close()
+
+
+def time_request(client, url: str, repeat: int) -> float:
+    """Return the median latency of ``repeat`` GET requests in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--depth", type=int, default=5, help="Pages to follow")
+    args = parser.parse_args()
+
+    init_db()
+    app = create_app({"TESTING": True})
+    client = app.test_client()
+
+    print(f"{'rows':>8} {'first page':>12} {'page ' + str(args.depth):>12}")
+    for size in sorted(args.sizes):
+        seed(size)
+
+        # Follow the cursor to reach a deep page
+        url = "/projects"
+        for _ in range(args.depth):
+            html = client.get(url).get_data(as_text=True)
+            if "after=" not in html:
+                break
+            cursor = html.split("after=", 1)[1].split('"', 1)[0]
+            url = f"/projects?after={cursor}"
+
+        first = time_request(client, "/projects", args.repeat)
+        deep = time_request(client, url, args.repeat)
+        print(f"{size:>8} {first:>10.2f}ms {deep:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark editing a project: full regeneration vs dependency-aware updates.
+
+Before per-artifact regeneration, refreshing any artifact meant a new
+conversation and a full ``generate_project_data`` run. This compares that
+with the edits ``src.artifacts.update_project`` supports, counting upstream
+calls against a fake model with a fixed latency per call.
+
+Usage:
+    python -m benchmarks.bench_regeneration [--latency 0.3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from benchmarks.fake_genai import FakeModel, patched_model  # noqa: E402
+from src.artifacts import update_project  # noqa: E402
+from src.database import SessionLocal, init_db  # noqa: E402
+from src.gemini_config import generate_project_data  # noqa: E402
+from src.models import Project  # noqa: E402
+
+REFINED_PROMPT = (
+    "Project: Inventory Tracker\n"
+    "Description: A web app for small shops to track stock levels, "
+    "suppliers and reorder points, with CSV import and email alerts."
+)
+
+
+def main() -> None:
+    """Parse arguments, run every edit and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+    init_db()
+
+    db = SessionLocal()
+    project = Project(name="Inventory Tracker", refined_prompt=REFINED_PROMPT)
+    db.add(project)
+    db.commit()
+
+    edits = {
+        "full regeneration": lambda: generate_project_data(
+            REFINED_PROMPT, bypass_cache=True
+        ),
+        "edit tech stack": lambda: update_project(
+            db, project, edits={"frameworks_languages": "Backend: Go\nDatabase: SQLite"}
+        ),
+        "regenerate checklist": lambda: update_project(
+            db, project, regenerate=("checklist_steps",)
+        ),
+        "regenerate cursor rules": lambda: update_project(
+            db, project, regenerate=("cursor_rules_content",)
+        ),
+        "unchanged tech stack": lambda: update_project(
+            db, project, edits={"frameworks_languages": "Backend: Go\nDatabase: SQLite"}
+        ),
+    }
+    try:
+        for name, edit in edits.items():
+            model = FakeModel(latency=args.latency)
+            with patched_model(model):
+                started = time.perf_counter()
+                edit()
+                elapsed = time.perf_counter() - started
+            print(f"{name}: {model.calls} upstream call(s), {elapsed:.2f}s")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
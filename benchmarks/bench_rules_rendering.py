@@ -0,0 +1,118 @@
+"""Benchmark the cursor rules stage: full-file generation vs local rendering.
+
+The previous pipeline sent the whole rules template to the model and had it
+write the complete file back. The current one asks for the template fields
+as compact JSON and renders the file locally. The fake model charges a fixed
+latency per call plus a delay per output token, which is how generation time
+scales in practice, and estimates the tokens in both directions.
+
+Usage:
+    python -m benchmarks.bench_rules_rendering [--latency 0.3] [--ms-per-token 5] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from benchmarks.fake_genai import FakeModel  # noqa: E402
+from src.database import init_db  # noqa: E402
+from src.gemini_config import _generate_cursor_rules, _project_prefix  # noqa: E402
+from src.rules import RULES_FIELDS, read_rules_template, render_cursor_rules  # noqa: E402
+
+REFINED_PROMPT = (
+    "Project: Inventory Tracker\n"
+    "Description: A web app for small shops to track stock levels, "
+    "suppliers and reorder points, with CSV import and email alerts."
+)
+FRAMEWORKS = "Backend: Python, Flask, SQLAlchemy\nDatabase: PostgreSQL"
+
+# A plausible answer for every template field
+SAMPLE_FIELDS = {
+    key: f"Example {key.replace('_', ' ')} for the inventory tracker project"
+    for key in RULES_FIELDS.values()
+}
+
+
+def legacy_prompt(refined_prompt: str, frameworks_languages: str) -> str:
+    """Build the previous prompt asking the model to fill the whole template."""
+    return f"""Generate content for a .cursor/rules file for this project. Use this exact template and fill in the sections based on the project requirements:
+
+Project: {refined_prompt}
+Tech Stack: {frameworks_languages}
+
+TEMPLATE TO FILL:
+{read_rules_template()}"""
+
+
+def respond(prompt: str) -> str:
+    """Answer like the real model: JSON fields or the complete rules file."""
+    if "JSON object" in prompt:
+        return json.dumps(SAMPLE_FIELDS)
+    return render_cursor_rules(SAMPLE_FIELDS)
+
+
+def run_legacy(model: FakeModel) -> None:
+    """Run one stage the previous way."""
+    model.generate_content(legacy_prompt(REFINED_PROMPT, FRAMEWORKS)).text.strip()
+
+
+def run_rendered(model: FakeModel) -> None:
+    """Run one stage the current way, skipping the response cache."""
+    with _project_prefix(model, REFINED_PROMPT) as prefix:
+        _generate_cursor_rules(model, prefix, FRAMEWORKS, bypass_cache=True)
+
+
+def measure(stage, latency: float, seconds_per_token: float, runs: int) -> dict:
+    """Time ``runs`` executions of ``stage`` and report per-run averages."""
+    model = FakeModel(
+        latency=latency, seconds_per_token=seconds_per_token, responder=respond
+    )
+    started = time.perf_counter()
+    for _ in range(runs):
+        stage(model)
+    elapsed = time.perf_counter() - started
+    return {
+        "seconds": elapsed / runs,
+        "input_tokens": model.input_tokens // runs,
+        "output_tokens": model.output_tokens // runs,
+    }
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--ms-per-token", type=float, default=5.0)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    init_db()
+
+    # Compile the template before timing, as a long-running worker would
+    render_cursor_rules(SAMPLE_FIELDS)
+
+    seconds_per_token = args.ms_per_token / 1000
+    results = {
+        "full generation": measure(run_legacy, args.latency, seconds_per_token, args.runs),
+        "local rendering": measure(run_rendered, args.latency, seconds_per_token, args.runs),
+    }
+    for name, result in results.items():
+        print(
+            f"{name}: {result['seconds']:.3f}s, "
+            f"~{result['input_tokens']} tokens in, ~{result['output_tokens']} tokens out"
+        )
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        render_cursor_rules(SAMPLE_FIELDS)
+    render_ms = time.perf_counter() - started  # 1000 renders, so seconds == ms each
+    print(f"local render time: {render_ms:.3f}ms per file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+"""End-to-end load test of the project creation flow.
+
+Concurrent clients drive the real Flask app from ``create_app`` through the
+whole flow against the fake model:
+
+    start_chat -> N chat messages -> approve_prompt -> wait for the
+    generation job -> project detail page -> project listing
+
+The report gives p50/p95/p99 latency per step, requests per second and
+upstream calls per scenario. ``--save-baseline`` stores the results as JSON
+and ``--baseline`` compares a run against them, exiting with status 1 when
+a step's p95 or the calls per scenario regress beyond ``--tolerance``.
+
+Usage:
+    python -m benchmarks.bench_scenarios [--clients 8] [--scenarios 4] [--messages 5]
+    python -m benchmarks.bench_scenarios --save-baseline benchmarks/baseline.json
+    python -m benchmarks.bench_scenarios --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from benchmarks.fake_genai import FakeModel, patched_model  # noqa: E402
+from src import gemini_config  # noqa: E402
+from src.app import create_app  # noqa: E402
+from src.database import init_db  # noqa: E402
+from src.llm_client import CircuitBreaker, LLMClient  # noqa: E402
+
+# Steps in the order a scenario runs them
+STEPS = (
+    "start_chat", "send_message", "approve_prompt", "job_status",
+    "project_detail", "projects",
+)
+
+# Seconds a scenario waits for its generation job
+JOB_TIMEOUT = 60.0
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of ``values`` (0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Recorder:
+    """Thread-safe collection of request latencies by step."""
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def request(self, step: str, send, ok_statuses: tuple[int, ...] = (200, 302)):
+        """Time one request and record it under ``step``."""
+        started = time.perf_counter()
+        response = send()
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies[step].append(elapsed)
+            if response.status_code not in ok_statuses:
+                self.errors[step] += 1
+        return response
+
+
+def run_scenario(app, recorder: Recorder, index: int, messages: int) -> bool:
+    """Run the full creation flow once with a fresh client.
+
+    Args:
+        app: The Flask application
+        recorder: Where request latencies are recorded
+        index: Scenario number, used to keep project names unique
+        messages: Chat messages sent before approving
+
+    Returns:
+        bool: Whether the project was created
+    """
+    client = app.test_client()
+    recorder.request("start_chat", lambda: client.post("/create_project", data={
+        "action": "start_chat",
+        "name": f"Load test project {index}",
+        "description": f"Scenario {index} of the load test.",
+    }))
+    for turn in range(messages):
+        recorder.request("send_message", lambda: client.post("/create_project", data={
+            "action": "send_message",
+            "message": f"Requirement {turn} of scenario {index}.",
+        }))
+
+    # The scenarios' briefs are near-duplicates; generate past the suggestions
+    response = recorder.request("approve_prompt", lambda: client.post(
+        "/create_project", data={"action": "approve_prompt", "generate": "1"}
+    ))
+    job_url = response.headers.get("Location", "")
+    if "/jobs/" not in job_url:
+        return False
+
+    deadline = time.monotonic() + JOB_TIMEOUT
+    while time.monotonic() < deadline:
+        status = recorder.request(
+            "job_status", lambda: client.get(f"{job_url}/status")
+        ).get_json()
+        if status["status"] in ("succeeded", "failed"):
+            break
+        time.sleep(0.01)
+    if status.get("status") != "succeeded":
+        return False
+
+    recorder.request("project_detail", lambda: client.get(status["project_url"]))
+    recorder.request("projects", lambda: client.get("/projects"))
+    return True
+
+
+def run(args: argparse.Namespace) -> dict:
+    """Run every scenario and summarize the results."""
+    init_db()
+    app = create_app({"TESTING": True})
+    recorder = Recorder()
+    client = LLMClient(
+        requests_per_minute=args.rpm,
+        tokens_per_minute=0,
+        transient_errors=gemini_config.transient_errors,
+        breaker=CircuitBreaker(failure_threshold=10 ** 6),
+        backoff_base=0.05,
+        backoff_max=0.5,
+    )
+    model = FakeModel(
+        latency=args.latency,
+        seconds_per_token=args.ms_per_token / 1000,
+        failure_rate=args.failure_rate,
+    )
+
+    total = args.clients * args.scenarios
+    started = time.perf_counter()
+    with patched_model(model), mock.patch.object(gemini_config, "llm_client", client):
+        with ThreadPoolExecutor(max_workers=args.clients) as executor:
+            outcomes = list(executor.map(
+                lambda index: run_scenario(app, recorder, index, args.messages),
+                range(total),
+            ))
+    elapsed = time.perf_counter() - started
+
+    requests = sum(len(latencies) for latencies in recorder.latencies.values())
+    return {
+        "settings": {
+            "clients": args.clients,
+            "scenarios": total,
+            "messages": args.messages,
+            "latency": args.latency,
+            "ms_per_token": args.ms_per_token,
+            "failure_rate": args.failure_rate,
+        },
+        "completed": sum(outcomes),
+        "seconds": elapsed,
+        "requests_per_second": requests / elapsed,
+        "upstream_calls_per_scenario": model.calls / total,
+        "input_tokens_per_scenario": model.input_tokens / total,
+        "steps": {
+            step: {
+                "count": len(recorder.latencies[step]),
+                "errors": recorder.errors[step],
+                "p50": percentile(recorder.latencies[step], 0.50),
+                "p95": percentile(recorder.latencies[step], 0.95),
+                "p99": percentile(recorder.latencies[step], 0.99),
+            }
+            for step in STEPS
+        },
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """List the measurements that regressed against ``baseline``.
+
+    Latencies below 5ms are ignored, as their noise exceeds any tolerance.
+    """
+    regressions = []
+    allowed = 1 + tolerance
+    calls, base_calls = (
+        results["upstream_calls_per_scenario"], baseline["upstream_calls_per_scenario"]
+    )
+    if calls > base_calls * allowed:
+        regressions.append(f"upstream calls per scenario: {base_calls:.1f} -> {calls:.1f}")
+    for step, stats in results["steps"].items():
+        base = baseline["steps"].get(step)
+        if base and stats["p95"] > max(base["p95"] * allowed, 0.005):
+            regressions.append(
+                f"{step} p95: {base['p95'] * 1000:.1f}ms -> {stats['p95'] * 1000:.1f}ms"
+            )
+    return regressions
+
+
+def main() -> None:
+    """Parse arguments, run the load test and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--scenarios", type=int, default=4, help="scenarios per client")
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--ms-per-token", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--rpm", type=int, default=0, help="client rate limit (0: none)")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args)
+    print(
+        f"{results['completed']}/{results['settings']['scenarios']} scenarios in "
+        f"{results['seconds']:.2f}s, {results['requests_per_second']:.1f} req/s, "
+        f"{results['upstream_calls_per_scenario']:.1f} upstream calls per scenario"
+    )
+    print(f"{'step':<16}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step, stats in results["steps"].items():
+        print(
+            f"{step:<16}{stats['count']:>7}{stats['errors']:>8}"
+            f"{stats['p50'] * 1000:>10.1f}{stats['p95'] * 1000:>10.1f}{stats['p99'] * 1000:>10.1f}"
+        )
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        if regressions:
+            print("regressions against the baseline:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("no regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
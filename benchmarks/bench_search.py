@@ -0,0 +1,109 @@
+"""Benchmark full-text project search against a ``LIKE`` scan.
+
+Seeds projects built from a random vocabulary, with a rare term in one row
+out of every 10,000, and times the FTS5 search used by ``/projects/search``
+next to a ``LIKE '%term%'`` scan of the columns stored in the ``projects``
+row, the fallback used on other databases. The compressed texts are not
+scanned by ``LIKE`` at all, so the FTS5 search also covers more text.
+
+Usage:
+    python -m benchmarks.bench_search [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from sqlalchemy import func, insert, or_, select  # noqa: E402
+
+from src.database import SessionLocal, init_db  # noqa: E402
+from src.models import ARTIFACT_FIELDS, Project  # noqa: E402
+from src.search import FTS_COLUMNS, search_projects, update_search_index  # noqa: E402
+from src.storage import store_project_texts  # noqa: E402
+
+VOCABULARY = [f"word{index}" for index in range(5000)]
+
+
+def seed(total: int, rng: random.Random) -> None:
+    """Grow the projects table to ``total`` rows of random text."""
+    def words(count: int) -> str:
+        return " ".join(rng.choices(VOCABULARY, k=count))
+
+    db = SessionLocal()
+    try:
+        existing = db.scalar(select(func.count()).select_from(Project)) or 0
+        last_id = db.scalar(select(func.max(Project.id))) or 0
+        started = datetime(2024, 1, 1)
+        rows = [
+            {
+                "name": f"Project {index} {words(2)}",
+                "description": words(30) + (" needle" if index % 10000 == 0 else ""),
+                "refined_prompt": words(150),
+                "frameworks_languages": words(10),
+                "checklist_steps": words(80),
+                "created_at": started + timedelta(seconds=index),
+                "updated_at": started + timedelta(seconds=index),
+            }
+            for index in range(existing, total)
+        ]
+        for offset in range(0, len(rows), 5000):
+            db.execute(insert(Project), store_project_texts(db, rows[offset:offset + 5000]))
+        # Bulk inserts bypass the ORM hook feeding the index
+        update_search_index(db, db.scalars(select(Project.id).where(Project.id > last_id)))
+        db.commit()
+    finally:
+        db.close()
+
+
+def median_ms(function, repeat: int) -> float:
+    """Return the median run time of ``function`` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    init_db()
+    rng = random.Random(42)
+    term = "needle"
+    # Compressed texts cannot be matched in SQL
+    columns = [getattr(Project, name) for name in FTS_COLUMNS if name not in ARTIFACT_FIELDS]
+
+    print(f"{'rows':>8} {'fts5':>10} {'like':>10}")
+    for size in sorted(args.sizes):
+        seed(size, rng)
+        db = SessionLocal()
+        try:
+            fts = median_ms(lambda: search_projects(db, term), args.repeat)
+            like = median_ms(
+                lambda: db.execute(
+                    select(Project.id)
+                    .where(or_(*(column.like(f"%{term}%") for column in columns)))
+                    .limit(20)
+                ).all(),
+                args.repeat
+            )
+        finally:
+            db.close()
+        print(f"{size:>8} {fts:>8.2f}ms {like:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark near-duplicate lookups as the number of projects grows.
+
+The index is filled with unrelated projects, whose signatures are drawn at
+random (computing 100k real ones would dominate the run), plus clusters of
+genuine near-duplicate briefs. At each size the script times
+``find_similar`` for a fresh variant of every cluster against a linear scan
+comparing the query with every stored signature, and reports the recall of
+the planted clusters. LSH lookups should stay roughly flat while the scan
+grows with the table.
+
+Usage:
+    python -m benchmarks.bench_similarity [--sizes 1000,10000,100000] [--clusters 20]
+"""
+
+import argparse
+import os
+import random
+import struct
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from sqlalchemy import insert, select  # noqa: E402
+
+from src.database import SessionLocal, init_db  # noqa: E402
+from src.models import Project, ProjectBucket, ProjectSignature  # noqa: E402
+from src.similarity import (  # noqa: E402
+    NUM_PERM,
+    SIMILARITY_THRESHOLD,
+    bucket_keys,
+    estimate_similarity,
+    find_similar,
+    index_projects,
+    project_text,
+    signature,
+)
+
+VOCABULARY = [f"word{index}" for index in range(5000)]
+BRIEF_WORDS = 60
+
+
+def variant(brief: list[str], rng: random.Random, changed: float = 0.05) -> str:
+    """Return the brief with a share of its words replaced."""
+    return " ".join(
+        rng.choice(VOCABULARY) if rng.random() < changed else word for word in brief
+    )
+
+
+def add_filler(db, count: int, start: int, rng: random.Random) -> None:
+    """Insert ``count`` unrelated projects with random signatures."""
+    batch = 5000
+    for offset in range(0, count, batch):
+        ids = range(start + offset, start + min(offset + batch, count))
+        db.execute(insert(Project), [
+            {"id": project_id, "name": f"Filler {project_id}"} for project_id in ids
+        ])
+        signatures, buckets = [], []
+        for project_id in ids:
+            minhash = [rng.getrandbits(61) for _ in range(NUM_PERM)]
+            signatures.append({
+                "project_id": project_id,
+                "minhash": struct.pack(f"<{NUM_PERM}Q", *minhash),
+            })
+            buckets.extend(
+                {"bucket": key, "project_id": project_id}
+                for key in set(bucket_keys(minhash))
+            )
+        db.execute(insert(ProjectSignature), signatures)
+        db.execute(insert(ProjectBucket), buckets)
+        db.commit()
+
+
+def linear_scan(db, text: str) -> list[int]:
+    """Find similar projects by comparing against every stored signature."""
+    minhash = signature(text)
+    return [
+        project_id
+        for project_id, packed in db.execute(
+            select(ProjectSignature.project_id, ProjectSignature.minhash)
+        )
+        if estimate_similarity(minhash, struct.unpack(f"<{NUM_PERM}Q", packed))
+        >= SIMILARITY_THRESHOLD
+    ]
+
+
+def main() -> None:
+    """Parse arguments, grow the index and print a report per size."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--clusters", type=int, default=20)
+    parser.add_argument("--variants", type=int, default=3, help="stored projects per cluster")
+    args = parser.parse_args()
+    init_db()
+    rng = random.Random(42)
+
+    db = SessionLocal()
+    briefs = [rng.choices(VOCABULARY, k=BRIEF_WORDS) for _ in range(args.clusters)]
+    clusters: list[set[int]] = []
+    next_id = 1
+    for cluster, brief in enumerate(briefs):
+        rows = [
+            (next_id + index, variant(brief, rng), None) for index in range(args.variants)
+        ]
+        db.execute(insert(Project), [
+            {"id": project_id, "name": f"Cluster {cluster} #{project_id}", "description": text}
+            for project_id, text, _ in rows
+        ])
+        index_projects(db, rows)
+        clusters.append({project_id for project_id, _, _ in rows})
+        next_id += args.variants
+    db.commit()
+
+    print(f"{'projects':>9}{'lsh ms':>9}{'scan ms':>10}{'recall':>8}")
+    size = next_id - 1
+    for target in (int(value) for value in args.sizes.split(",")):
+        if target > size:
+            add_filler(db, target - size, next_id, rng)
+            next_id += target - size
+            size = target
+
+        queries = [variant(brief, rng) for brief in briefs]
+        started = time.perf_counter()
+        results = [find_similar(db, query, None) for query in queries]
+        lsh_ms = (time.perf_counter() - started) / len(queries) * 1000
+
+        started = time.perf_counter()
+        for query in queries[:3]:
+            linear_scan(db, project_text(query, None))
+        scan_ms = (time.perf_counter() - started) / 3 * 1000
+
+        found = sum(
+            any(match.id in cluster for match in matches)
+            for matches, cluster in zip(results, clusters)
+        )
+        print(f"{size:>9}{lsh_ms:>9.2f}{scan_ms:>10.1f}{found / len(clusters):>8.0%}")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure application startup: eager vs lazy Gemini SDK import.
+
+Each run starts a fresh interpreter, imports ``src.app`` and calls
+``create_app()``, which is what a web worker or a ``flask`` CLI command pays
+before serving anything. The eager variant imports the Gemini SDK first, as
+the application did when ``src.gemini_config`` imported it at module level;
+the lazy variant is the current startup path, where the SDK is only imported
+on the first model call. That deferred cost is reported separately.
+
+``--importtime`` also prints the slowest imports made directly by the
+startup path, from ``python -X importtime``.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--importtime]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SDK_IMPORT = "import google.generativeai, google.api_core.exceptions"
+
+STARTUP = """
+import time
+started = time.perf_counter()
+{before}
+from src.app import create_app
+create_app()
+print(time.perf_counter() - started)
+"""
+
+FIRST_MODEL_USE = """
+import time
+from src.app import create_app
+create_app()
+from src import gemini_config
+started = time.perf_counter()
+gemini_config._genai()
+gemini_config.transient_errors()
+print(time.perf_counter() - started)
+"""
+
+
+def run_python(code: str, env: dict, *flags: str) -> subprocess.CompletedProcess:
+    """Run ``code`` in a fresh interpreter from the project root."""
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def timed(code: str, env: dict, runs: int) -> float:
+    """Return the median of the seconds printed by ``runs`` runs of ``code``."""
+    return statistics.median(
+        float(run_python(code, env).stdout.split()[-1]) for _ in range(runs)
+    )
+
+
+def slowest_imports(env: dict, limit: int = 10) -> list[tuple[str, int]]:
+    """Return the slowest imports made by the startup path (microseconds)."""
+    stderr = run_python(STARTUP.format(before=""), env, "-X", "importtime").stderr
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nesting is shown by two spaces per level; keep the first two levels
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        if depth <= 1:
+            imports.append((name.strip(), int(cumulative)))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true")
+    args = parser.parse_args()
+
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tempfile.mkdtemp()}/bench.db"}
+    # Warm the bytecode cache so neither variant pays for compilation
+    run_python(STARTUP.format(before=SDK_IMPORT), env)
+
+    eager = timed(STARTUP.format(before=SDK_IMPORT), env, args.runs)
+    lazy = timed(STARTUP.format(before=""), env, args.runs)
+    deferred = timed(FIRST_MODEL_USE, env, args.runs)
+    print(f"eager SDK import: {eager * 1000:.0f}ms to a ready app")
+    print(f"lazy SDK import:  {lazy * 1000:.0f}ms to a ready app ({eager / lazy:.1f}x faster)")
+    print(f"deferred to the first model call: {deferred * 1000:.0f}ms")
+
+    if args.importtime:
+        print("slowest imports (lazy):")
+        for name, microseconds in slowest_imports(env):
+            print(f"  {name:<32}{microseconds / 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark static asset traffic over repeat page views.
+
+A client with an HTTP cache loads the home page ``--views`` times and
+fetches every stylesheet and script the page references, honoring
+``Cache-Control`` the way a browser does: fresh entries are reused without
+a request and stale ones are revalidated with ``If-None-Match``. This is
+run against a copy of the static folder as Flask serves it by default and
+again after ``build_assets``, counting the asset requests that reach the
+app and the bytes transferred. The working tree is not modified.
+
+Usage:
+    python -m benchmarks.bench_static_assets [--views 20]
+"""
+
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db"
+)
+
+from src.app import create_app  # noqa: E402
+from src.assets import ASSETS_DIR, build_assets, init_app  # noqa: E402
+from src.database import init_db  # noqa: E402
+
+ASSET_URL = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+class CachingClient:
+    """Test client wrapper keeping a browser-like cache of responses."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        # URL -> (expiry on the monotonic clock, entity tag)
+        self.cache: dict[str, tuple[float, str]] = {}
+        self.requests = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def fetch(self, url: str) -> None:
+        """Load ``url`` from the cache or the app."""
+        now = time.monotonic()
+        cached = self.cache.get(url)
+        if cached and cached[0] > now:
+            return
+        headers = {"Accept-Encoding": "br, gzip"}
+        if cached:
+            headers["If-None-Match"] = cached[1]
+        started = time.perf_counter()
+        response = self.client.get(url, headers=headers)
+        self.seconds += time.perf_counter() - started
+        self.requests += 1
+        self.bytes += len(response.get_data())
+
+        cache_control = response.cache_control
+        max_age = 0 if cache_control.no_cache else (cache_control.max_age or 0)
+        etag = response.headers.get("ETag") or (cached[1] if cached else "")
+        self.cache[url] = (now + max_age, etag)
+        response.close()
+
+
+def visit(app, views: int) -> tuple[int, int, float]:
+    """Load the home page ``views`` times with its assets.
+
+    Returns:
+        tuple[int, int, float]: Asset requests, asset bytes and milliseconds
+        spent on them
+    """
+    browser = CachingClient(app.test_client())
+    for _ in range(views):
+        page = app.test_client().get("/").get_data(as_text=True)
+        for url in ASSET_URL.findall(page):
+            browser.fetch(url)
+    return browser.requests, browser.bytes, browser.seconds * 1000
+
+
+def main() -> None:
+    """Parse arguments, run both configurations and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--views", type=int, default=20)
+    args = parser.parse_args()
+    init_db()
+
+    app = create_app({"TESTING": True})
+    static_folder = os.path.join(tempfile.mkdtemp(), "static")
+    shutil.copytree(
+        app.static_folder, static_folder, ignore=shutil.ignore_patterns(ASSETS_DIR)
+    )
+    app.static_folder = static_folder
+
+    print(f"{args.views} views of / with a caching client")
+    print(f"{'assets':>8}{'requests':>10}{'bytes':>9}{'ms':>8}")
+    for label, build in (("source", False), ("built", True)):
+        if build:
+            build_assets(static_folder)
+        init_app(app)
+        requests, transferred, elapsed = visit(app, args.views)
+        print(f"{label:>8}{requests:>10}{transferred:>9}{elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Benchmark moving projects between two databases with export/import.
+
+Seeds a source database, streams it to an NDJSON file with the exporter and
+loads the file into an empty target database with the batched importer.
+With ``--no-index`` the import skips the similarity index, which is then
+built by the backfill and timed separately.
+
+Usage:
+    python -m benchmarks.bench_transfer [--rows 100000] [--no-index]
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{WORK_DIR}/source.db")
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from benchmarks.bench_project_listing import seed  # noqa: E402
+from src.archive import export_ndjson, import_records, open_records  # noqa: E402
+from src.database import SessionLocal, init_db  # noqa: E402
+from src.models import Base, Project  # noqa: E402
+from src.search import ensure_search_index  # noqa: E402
+from src.similarity import backfill_signatures  # noqa: E402
+
+
+def main() -> None:
+    """Parse arguments, run the benchmark and print a report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--no-index", action="store_true")
+    args = parser.parse_args()
+
+    init_db()
+    seed(args.rows)
+    export_path = os.path.join(WORK_DIR, "projects.ndjson")
+
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        with open(export_path, "w", encoding="utf-8") as stream:
+            for line in export_ndjson(db, args.batch_size):
+                stream.write(line)
+    finally:
+        db.close()
+    exported = time.perf_counter() - started
+
+    target_engine = create_engine(f"sqlite:///{WORK_DIR}/target.db")
+    Base.metadata.create_all(target_engine)
+    ensure_search_index(target_engine)
+    target = sessionmaker(bind=target_engine)()
+
+    started = time.perf_counter()
+    try:
+        counts = import_records(
+            target, open_records(export_path), batch_size=args.batch_size,
+            index=not args.no_index
+        )
+        imported = time.perf_counter() - started
+        total = target.scalar(select(func.count()).select_from(Project))
+        if args.no_index:
+            started = time.perf_counter()
+            backfilled = backfill_signatures(target, batch_size=args.batch_size)
+            backfill = time.perf_counter() - started
+    finally:
+        target.close()
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    size_mb = os.path.getsize(export_path) / (1024 * 1024)
+    print(f"export: {args.rows} rows in {exported:.2f}s ({args.rows / exported:.0f} rows/s, {size_mb:.1f} MB)")
+    print(f"import: {counts['imported']} rows in {imported:.2f}s ({counts['imported'] / imported:.0f} rows/s)")
+    if args.no_index:
+        print(f"similarity backfill: {backfilled} rows in {backfill:.2f}s ({backfilled / backfill:.0f} rows/s)")
+    print(f"target rows: {total}")
+    print(f"peak RSS (includes SQLite mmap pages): {peak_mb:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Deterministic stand-in for the Gemini generative model.
+
+The fake model mimics the small part of the ``google.generativeai`` API that
+PromptForge uses and counts every upstream call it receives, together with
+an estimate of the input and output tokens. Prompts asking for a JSON object
+are answered with an object holding every quoted key of the prompt.
+
+The fake can also pose as a newer SDK with system instructions and cached
+content; it then counts the tokens read from and written to caches.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Iterator, Optional, Union
+from unittest import mock
+
+from google.api_core import exceptions as google_exceptions
+
+from src import context_cache
+from src.llm_client import estimate_tokens
+
+
+class FakeResponse:
+    """Response object exposing the ``text`` and ``usage_metadata`` of a reply."""
+
+    def __init__(self, text: str, usage_metadata: Any = None) -> None:
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+
+class FakeCachedContent:
+    """Cached content created by a fake model, expiring after its TTL."""
+
+    def __init__(self, model: "FakeModel", text: str, ttl: float) -> None:
+        self.model = model
+        self.text = text
+        self.expires = time.monotonic() + ttl
+        self.deleted = False
+
+    @property
+    def expired(self) -> bool:
+        """Whether the content is gone upstream."""
+        return self.deleted or time.monotonic() >= self.expires
+
+    def delete(self) -> None:
+        """Delete the content before its TTL."""
+        self.deleted = True
+        self.model.count_cache_delete()
+
+
+class FakeCachedModel:
+    """Model answering on top of fake cached content."""
+
+    def __init__(self, cache: FakeCachedContent) -> None:
+        self.cache = cache
+        self.model_name = cache.model.model_name
+
+    def generate_content(self, contents: Any, **kwargs: Any) -> FakeResponse:
+        """Answer ``contents`` after the cached text.
+
+        Raises:
+            google.api_core.exceptions.NotFound: If the content has expired
+        """
+        if self.cache.expired:
+            raise google_exceptions.NotFound("Fake cached content not found")
+        return self.cache.model.generate_content(contents, cached_text=self.cache.text)
+
+
+class FakeChatSession:
+    """Chat session that records history and forwards sends to its model."""
+
+    def __init__(self, model: "FakeModel", history: Optional[list] = None) -> None:
+        self.model = model
+        self.history = list(history or [])
+
+    def send_message(
+        self, content: str, stream: bool = False, **kwargs: Any
+    ) -> Union[FakeResponse, list[FakeResponse]]:
+        """Send a message, counting it as one upstream call.
+
+        Args:
+            content: The user message
+            stream: Return the reply as a list of word-sized chunks
+            **kwargs: Ignored generation options
+
+        Returns:
+            Union[FakeResponse, list[FakeResponse]]: The canned reply
+        """
+        self.model.count_context("\n".join(
+            [self.model.system_instruction or ""]
+            + [str(part) for turn in self.history for part in turn["parts"]]
+        ))
+        response = self.model.generate_content(content)
+        self.history.append({"role": "user", "parts": [content]})
+        self.history.append({"role": "model", "parts": [response.text]})
+        if stream:
+            words = response.text.split(" ")
+            return [
+                FakeResponse(word if index == 0 else f" {word}")
+                for index, word in enumerate(words)
+            ]
+        return response
+
+
+class FakeModel:
+    """Fake generative model with configurable latency.
+
+    Attributes:
+        model_name: Name reported to the response cache
+        latency: Seconds each upstream call sleeps for
+        seconds_per_token: Extra seconds slept per output token
+        failure_rate: Fraction of calls failing with a 503 error
+        system_instructions: Pose as an SDK accepting system instructions
+        context_caching: Pose as an SDK able to create cached content
+        cache_ttl: Seconds cached content lives, overriding the requested TTL
+        system_instruction: The instruction the model was created with
+        calls: Number of upstream calls received so far
+        failures: Number of calls that failed
+        input_tokens: Estimated prompt tokens received so far, cached included
+        output_tokens: Estimated reply tokens returned so far
+        cached_tokens: Estimated prompt tokens read from cached content
+        cache_writes: Cached contents created
+        cache_write_tokens: Estimated tokens uploaded to create them
+        cache_deletes: Cached contents deleted before their TTL
+        spans: ``[prompt, start, end]`` of every generation call, on the
+            ``time.monotonic()`` clock; ``end`` is None while it runs
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        reply: str = "Fake reply.",
+        seconds_per_token: float = 0.0,
+        responder: Optional[Callable[[str], str]] = None,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        system_instructions: bool = False,
+        context_caching: bool = False,
+        cache_ttl: Optional[float] = None,
+        model_name: str = "models/fake-model",
+    ) -> None:
+        self.model_name = model_name
+        self.latency = latency
+        self.reply = reply
+        self.seconds_per_token = seconds_per_token
+        self.responder = responder
+        self.failure_rate = failure_rate
+        self.system_instructions = system_instructions
+        self.context_caching = context_caching
+        self.cache_ttl = cache_ttl
+        self.system_instruction: Optional[str] = None
+        self.calls = 0
+        self.failures = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.cache_writes = 0
+        self.cache_write_tokens = 0
+        self.cache_deletes = 0
+        self.spans: list[list] = []
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def start_chat(self, history: Optional[list] = None) -> FakeChatSession:
+        """Start a chat session seeded with ``history`` (no upstream call)."""
+        return FakeChatSession(self, history)
+
+    def count_context(self, text: str) -> None:
+        """Count history sent along with a chat message as input tokens."""
+        with self._lock:
+            self.input_tokens += estimate_tokens(text)
+
+    def create_cached_content(self, text: str, ttl: float = 600) -> tuple[Any, Any]:
+        """Cache ``text`` (no generation call) like ``CachedContent.create``.
+
+        Returns:
+            tuple[Any, Any]: The cached content and a model bound to it
+        """
+        cache = FakeCachedContent(self, text, self.cache_ttl if self.cache_ttl is not None else ttl)
+        with self._lock:
+            self.cache_writes += 1
+            self.cache_write_tokens += estimate_tokens(text)
+        return cache, FakeCachedModel(cache)
+
+    def count_cache_delete(self) -> None:
+        """Count cached content deleted before its TTL."""
+        with self._lock:
+            self.cache_deletes += 1
+
+    def respond(self, prompt: str) -> str:
+        """Return the reply text for ``prompt``."""
+        if self.responder is not None:
+            return self.responder(prompt)
+        if "JSON object" in prompt:
+            keys = dict.fromkeys(re.findall(r'"(\w+)"', prompt))
+            return json.dumps({key: f"Fake {key}." for key in keys})
+        return self.reply
+
+    def generate_content(
+        self, contents: Any, cached_text: str = "", **kwargs: Any
+    ) -> FakeResponse:
+        """Simulate a single upstream generation request.
+
+        Args:
+            contents: The prompt
+            cached_text: Cached content the prompt follows
+            **kwargs: Ignored generation options
+
+        Returns:
+            FakeResponse: The canned reply
+
+        Raises:
+            google.api_core.exceptions.ServiceUnavailable: For the share of
+                calls given by ``failure_rate``
+        """
+        prompt = str(contents)
+        span = [prompt, time.monotonic(), None]
+        with self._lock:
+            self.spans.append(span)
+        try:
+            return self._generate(prompt, cached_text)
+        finally:
+            span[2] = time.monotonic()
+
+    def _generate(self, prompt: str, cached_text: str) -> FakeResponse:
+        """Answer ``prompt`` for ``generate_content``."""
+        text = self.respond(prompt)
+        output_tokens = estimate_tokens(text)
+        cached_tokens = estimate_tokens(cached_text)
+        input_tokens = cached_tokens + estimate_tokens(prompt)
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.cached_tokens += cached_tokens
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+            else:
+                self.output_tokens += output_tokens
+        if failed:
+            if self.latency:
+                time.sleep(self.latency)
+            raise google_exceptions.ServiceUnavailable("Fake upstream is overloaded")
+        delay = self.latency + self.seconds_per_token * output_tokens
+        if delay:
+            time.sleep(delay)
+        return FakeResponse(text, SimpleNamespace(
+            prompt_token_count=input_tokens,
+            candidates_token_count=output_tokens,
+            cached_content_token_count=cached_tokens,
+        ))
+
+
+@contextmanager
+def patched_model(model: FakeModel) -> Iterator[FakeModel]:
+    """Route every ``get_chat_model()`` call in the app to ``model``.
+
+    The SDK features the app detects are those ``model`` poses with.
+
+    Args:
+        model: The fake model to install
+
+    Yields:
+        FakeModel: The installed model
+    """
+    def chat_model(*args: Any, system_instruction: Optional[str] = None) -> FakeModel:
+        if system_instruction is not None:
+            model.system_instruction = system_instruction
+        return model
+
+    def create_cached_content(_model: Any, text: str) -> tuple[Any, Any]:
+        return model.create_cached_content(text, context_cache.CONTEXT_CACHE_TTL_SECONDS)
+
+    with (
+        mock.patch("src.gemini_config.get_chat_model", side_effect=chat_model),
+        mock.patch(
+            "src.gemini_config.supports_system_instruction",
+            return_value=model.system_instructions,
+        ),
+        mock.patch(
+            "src.gemini_config.supports_context_caching", return_value=model.context_caching
+        ),
+        mock.patch(
+            "src.gemini_config.create_cached_content", side_effect=create_cached_content
+        ),
+    ):
+        yield model
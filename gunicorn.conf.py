@@ -0,0 +1,49 @@
+"""Gunicorn settings for PromptForge.
+
+Used automatically by ``gunicorn wsgi:app`` when run from the project root.
+
+Two serving modes are supported, chosen with ``GUNICORN_WORKER_CLASS``:
+
+``gthread`` (default)
+    Each worker serves ``GUNICORN_THREADS`` requests at once. The app is
+    preloaded in the master process so workers fork with templates, models
+    and routes already imported and share those pages copy-on-write.
+    Connections must not be shared across processes, so each worker drops
+    the pooled connections it inherited and opens its own.
+
+``gevent``
+    Each worker serves up to ``GUNICORN_WORKER_CONNECTIONS`` requests at
+    once on greenlets, which suits the chat routes: nearly all of their time
+    is spent waiting on the model API, and a waiting greenlet costs a few
+    kilobytes instead of a thread. Requires ``pip install gevent``. The app
+    is loaded in each worker after gevent has patched the standard library,
+    so that locks and sleeps created at import time cooperate with it, and
+    gRPC (used by the Gemini SDK) is switched to gevent-compatible polling.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+preload_app = worker_class != "gevent"
+
+
+def post_fork(server, worker):
+    """Discard database connections inherited from the master process."""
+    from src import database
+
+    for engine in (database.engine, database.replica_engine):
+        if engine is not None:
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Make gRPC cooperate with gevent before the SDK opens a channel."""
+    if worker_class == "gevent":
+        import grpc.experimental.gevent
+
+        grpc.experimental.gevent.init_gevent()
@@ -7,10 +7,17 @@ This script starts the Flask development server with appropriate settings.
 import os
 import sys
 
+from dotenv import load_dotenv
+
 # Add the project directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from src.app import app
+# Load .env before src is imported, as wsgi.py does
+load_dotenv()
+
+from src.app import create_app  # noqa: E402
+
+app = create_app()
 
 if __name__ == "__main__":
     # Development server settings
@@ -2,6 +2,11 @@
 
 This module creates and configures the Flask application instance,
 registers blueprints, and sets up necessary extensions.
+
+Importing it is cheap and has no side effects: the app, the database engine
+and the Gemini SDK are only set up when ``create_app()`` runs or a model is
+first called. ``flask`` finds the factory through ``FLASK_APP=src.app``,
+and ``wsgi.py`` builds the app for production servers.
 """
 
 import os
@@ -10,7 +15,22 @@ from typing import Optional
 from dotenv import load_dotenv
 from flask import Flask
 
+from src import (
+    context_cache,
+    conversation,
+    database,
+    gemini_config,
+    jobs,
+    metrics,
+    render_cache,
+    response_cache,
+    similarity,
+)
+from src.assets import init_app as init_assets
 from src.commands import register_commands
+from src.database import get_engine, init_app as init_database
+from src.jobs import init_app as init_jobs
+from src.metrics import init_app as init_metrics, instrument_engine
 from src.routes import main
 from src.gemini_config import configure_gemini
 
@@ -35,11 +55,14 @@ def create_app(config: Optional[dict] = None) -> Flask:
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv(
         "DATABASE_URL", "sqlite:///instance/app.db"
     )
+    # Optional read replica for the project list and detail pages
+    app.config["DATABASE_REPLICA_URL"] = os.getenv("DATABASE_REPLICA_URL")
+    
+    app.config["PROJECTS_PER_PAGE"] = int(os.getenv("PROJECTS_PER_PAGE", "20"))
     
-    # Configure session for chat state management
-    app.config["SESSION_TYPE"] = "filesystem"
+    # Chat transcripts live in the conversations table; the signed session
+    # cookie only carries the active conversation id
     app.config["SESSION_PERMANENT"] = False
-    app.config["SESSION_USE_SIGNER"] = True
     
     # Configure Gemini API
     try:
@@ -53,14 +76,39 @@ def create_app(config: Optional[dict] = None) -> Flask:
     if config:
         app.config.update(config)
 
+    # Apply the module settings from the app config or the environment, now
+    # that .env is loaded
+    for module in (
+        gemini_config,
+        context_cache,
+        response_cache,
+        render_cache,
+        conversation,
+        similarity,
+        jobs,
+        metrics,
+    ):
+        module.configure(app.config)
+
+    # Scope database sessions to the application context
+    init_database(app)
+
+    # Time requests, model calls, queries and templates; serve /metrics
+    init_metrics(app, get_engine())
+    if database.replica_engine is not None:
+        instrument_engine(database.replica_engine)
+
+    # Resume queued generation jobs in thread mode
+    init_jobs(app)
+
     # Register blueprints
     app.register_blueprint(main)
 
+    # Serve fingerprinted, precompressed static files once they are built
+    init_assets(app)
+
     # Register CLI commands
     register_commands(app)
 
     return app
-
-
-# Create app instance
-app = create_app() 
\ No newline at end of file
+ 
\ No newline at end of file
@@ -0,0 +1,300 @@
+"""Bulk export and import of projects.
+
+Projects are streamed out of the database in batches with ``yield_per`` so
+memory use stays flat regardless of the number of rows, either as NDJSON
+(one project per line) or as a zip archive with one folder per project.
+Imports insert rows in batches with a single ``executemany`` per batch.
+"""
+
+import io
+import json
+import re
+import sys
+import zipfile
+from datetime import datetime
+from typing import IO, Iterable, Iterator, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from src.models import Project
+from src.search import update_search_index
+from src.similarity import index_projects
+from src.storage import store_project_texts
+
+# Columns carried by an export, in output order
+EXPORT_FIELDS = (
+    "name",
+    "description",
+    "refined_prompt",
+    "frameworks_languages",
+    "checklist_steps",
+    "cursor_rules_content",
+    "created_at",
+    "updated_at",
+)
+
+# What to do when an imported project's name already exists
+CONFLICT_POLICIES = ("skip", "rename", "replace", "fail")
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportConflictError(Exception):
+    """Raised when an imported name exists and the policy is "fail"."""
+
+    pass
+
+
+def iter_projects(db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[dict]:
+    """Yield every project as a JSON-serializable dictionary.
+
+    Args:
+        db: Database session
+        batch_size: Number of rows fetched from the cursor at a time
+
+    Yields:
+        dict: Project fields from EXPORT_FIELDS
+    """
+    columns = [getattr(Project, field) for field in EXPORT_FIELDS]
+    rows = db.execute(
+        select(*columns)
+        .order_by(Project.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        record = dict(zip(EXPORT_FIELDS, row))
+        record["created_at"] = record["created_at"].isoformat()
+        record["updated_at"] = record["updated_at"].isoformat()
+        yield record
+
+
+def export_ndjson(db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[str]:
+    """Stream all projects as newline-delimited JSON.
+
+    Args:
+        db: Database session
+        batch_size: Number of rows fetched from the cursor at a time
+
+    Yields:
+        str: One JSON document per project, newline terminated
+    """
+    for record in iter_projects(db, batch_size):
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable stream collecting bytes until drained."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        """Return and forget everything written so far."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _folder_name(name: str, used: set[str]) -> str:
+    """Derive a unique, filesystem-safe folder name from a project name."""
+    base = re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-.") or "project"
+    folder = base
+    suffix = 2
+    while folder in used:
+        folder = f"{base}-{suffix}"
+        suffix += 1
+    used.add(folder)
+    return folder
+
+
+def export_zip(db: Session, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[bytes]:
+    """Stream all projects as a zip archive with one folder per project.
+
+    Each folder holds ``.cursor/rules``, ``CHECKLIST.md``, ``PROMPT.md`` and
+    a ``project.json`` with every exported field, which is what
+    :func:`read_zip` reads back.
+
+    Args:
+        db: Database session
+        batch_size: Number of rows fetched from the cursor at a time
+
+    Yields:
+        bytes: Successive chunks of the archive
+    """
+    buffer = _ChunkBuffer()
+    used_folders: set[str] = set()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for record in iter_projects(db, batch_size):
+            folder = _folder_name(record["name"], used_folders)
+            archive.writestr(f"{folder}/.cursor/rules", record["cursor_rules_content"] or "")
+            archive.writestr(f"{folder}/CHECKLIST.md", record["checklist_steps"] or "")
+            archive.writestr(f"{folder}/PROMPT.md", record["refined_prompt"] or "")
+            archive.writestr(
+                f"{folder}/project.json",
+                json.dumps(record, ensure_ascii=False, indent=2)
+            )
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def _parse_record(record: dict) -> dict:
+    """Convert an exported record into insertable column values."""
+    values = {field: record.get(field) for field in EXPORT_FIELDS}
+    if not values["name"]:
+        raise ValueError("Imported project is missing a name")
+    now = datetime.utcnow()
+    for field in ("created_at", "updated_at"):
+        values[field] = datetime.fromisoformat(values[field]) if values[field] else now
+    return values
+
+
+def _free_name(db: Session, name: str, taken: set[str]) -> str:
+    """Find the first ``name (n)`` not used in the database or this import."""
+    suffix = 2
+    while True:
+        candidate = f"{name} ({suffix})"
+        if candidate not in taken and db.scalar(
+            select(Project.id).where(Project.name == candidate)
+        ) is None:
+            return candidate
+        suffix += 1
+
+
+def _import_batch(
+    db: Session, batch: list[dict], on_conflict: str, counts: dict, index: bool
+) -> None:
+    """Insert one batch of parsed records according to the conflict policy.
+
+    A name repeated within the batch conflicts with its earlier occurrence.
+    """
+    names = [record["name"] for record in batch]
+    existing = set(db.scalars(select(Project.name).where(Project.name.in_(names))))
+    rows = []
+    seen: set[str] = set()
+
+    for record in batch:
+        name = record["name"]
+        if name in existing or name in seen:
+            if on_conflict == "fail":
+                raise ImportConflictError(f"Project '{name}' already exists.")
+            if on_conflict == "skip":
+                counts["skipped"] += 1
+                continue
+            if on_conflict == "rename":
+                record["name"] = _free_name(db, name, existing | seen)
+                counts["renamed"] += 1
+            elif on_conflict == "replace":
+                counts["replaced"] += 1
+                if name in seen:
+                    rows = [row for row in rows if row["name"] != name]
+        seen.add(record["name"])
+        rows.append(record)
+
+    if on_conflict == "replace":
+        replaced = [row["name"] for row in rows if row["name"] in existing]
+        if replaced:
+            db.execute(delete(Project).where(Project.name.in_(replaced)))
+
+    if rows:
+        db.execute(insert(Project), store_project_texts(db, rows))
+        project_ids = db.scalars(
+            select(Project.id).where(Project.name.in_([row["name"] for row in rows]))
+        ).all()
+        update_search_index(db, project_ids)
+        if index:
+            index_projects(db, db.execute(
+                select(Project.id, Project.description, Project.refined_prompt)
+                .where(Project.id.in_(project_ids))
+            ))
+    counts["imported"] += len(rows)
+
+
+def import_records(
+    db: Session,
+    records: Iterable[dict],
+    on_conflict: str = "skip",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    index: bool = True,
+) -> dict:
+    """Insert exported project records in batches.
+
+    Args:
+        db: Database session
+        records: Exported project dictionaries
+        on_conflict: One of CONFLICT_POLICIES, applied to existing names
+        batch_size: Number of rows inserted per statement
+        index: Compute the similarity signatures of the imported projects;
+            without it, ``backfill_signatures`` indexes them later
+
+    Returns:
+        dict: Counts of ``imported``, ``skipped``, ``renamed`` and ``replaced`` rows
+
+    Raises:
+        ValueError: If the policy is unknown or a record is malformed
+        ImportConflictError: If a name exists and the policy is "fail"
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {on_conflict}")
+
+    counts = {"imported": 0, "skipped": 0, "renamed": 0, "replaced": 0}
+    batch: list[dict] = []
+    try:
+        for record in records:
+            batch.append(_parse_record(record))
+            if len(batch) >= batch_size:
+                _import_batch(db, batch, on_conflict, counts, index)
+                batch = []
+        if batch:
+            _import_batch(db, batch, on_conflict, counts, index)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return counts
+
+
+def read_ndjson(stream: IO[str]) -> Iterator[dict]:
+    """Parse an NDJSON export line by line, skipping blank lines."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_zip(path_or_file: object) -> Iterator[dict]:
+    """Read the ``project.json`` of every folder in a zip export."""
+    with zipfile.ZipFile(path_or_file) as archive:
+        for member in archive.namelist():
+            if member.endswith("/project.json"):
+                yield json.loads(archive.read(member))
+
+
+def open_records(path: str) -> Iterator[dict]:
+    """Read records from an NDJSON or zip export, chosen by file extension.
+
+    Args:
+        path: Path of the export file, or "-" for NDJSON on stdin
+
+    Yields:
+        dict: Exported project dictionaries
+    """
+    if path.endswith(".zip"):
+        yield from read_zip(path)
+    elif path == "-":
+        yield from read_ndjson(sys.stdin)
+    else:
+        with open(path, encoding="utf-8") as stream:
+            yield from read_ndjson(stream)
+
+
+def export_filename(export_format: str, now: Optional[datetime] = None) -> str:
+    """Return a timestamped download name for an export."""
+    stamp = (now or datetime.utcnow()).strftime("%Y%m%d-%H%M%S")
+    return f"promptforge-projects-{stamp}.{export_format}"
@@ -0,0 +1,133 @@
+"""Regeneration of individual project artifacts.
+
+A project's generated artifacts are derived from its stored inputs: the
+frameworks and the checklist from the refined prompt, and the cursor rules
+from the refined prompt and the tech stack. When an input is edited only
+the artifacts derived from it are regenerated, so changing the tech stack
+costs one call for the cursor rules instead of a full three-call run.
+Regenerated text that matches the stored text is not written, and a
+project whose fields did not change keeps its ``updated_at`` and cached
+page.
+"""
+
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database import release_connection
+from src.gemini_config import regenerate_artifact
+from src.models import Project
+from src.render_cache import project_pages
+from src.similarity import index_project
+
+# Inputs of every generated artifact, listed in dependency order
+ARTIFACT_INPUTS = {
+    "frameworks_languages": ("refined_prompt",),
+    "checklist_steps": ("refined_prompt",),
+    "cursor_rules_content": ("refined_prompt", "frameworks_languages"),
+}
+
+# Inputs that may be edited directly
+EDITABLE_FIELDS = ("refined_prompt", "frameworks_languages")
+
+
+class ArtifactError(Exception):
+    """Raised when a project's artifacts cannot be regenerated."""
+
+    pass
+
+
+def stale_artifacts(changed: Iterable[str]) -> list[str]:
+    """Return the artifacts derived, directly or not, from changed fields.
+
+    Args:
+        changed: Names of the fields that changed
+
+    Returns:
+        list[str]: Artifacts to regenerate, in dependency order
+    """
+    stale = set(changed)
+    result = []
+    for artifact, inputs in ARTIFACT_INPUTS.items():
+        if stale.intersection(inputs):
+            stale.add(artifact)
+            result.append(artifact)
+    return result
+
+
+def update_project(
+    db: Session,
+    project: Project,
+    edits: Optional[dict[str, str]] = None,
+    regenerate: Iterable[str] = (),
+) -> list[str]:
+    """Apply edits and regenerate the artifacts they make stale.
+
+    Artifacts named in ``regenerate`` skip the response cache so they get a
+    fresh answer; artifacts regenerated because an input changed may reuse
+    a cached answer for the new inputs. Nothing is written if a model call
+    fails.
+
+    Args:
+        db: Database session
+        project: The project to update
+        edits: New values for fields in EDITABLE_FIELDS
+        regenerate: Artifacts to regenerate even if their inputs are unchanged
+
+    Returns:
+        list[str]: Names of the fields whose stored value changed
+
+    Raises:
+        ArtifactError: If a field cannot be edited or regenerated
+    """
+    edits = edits or {}
+    regenerate = set(regenerate)
+    for field in edits:
+        if field not in EDITABLE_FIELDS:
+            raise ArtifactError(f"'{field}' cannot be edited.")
+    for artifact in regenerate:
+        if artifact not in ARTIFACT_INPUTS:
+            raise ArtifactError(f"'{artifact}' cannot be regenerated.")
+
+    values = {
+        field: getattr(project, field) for field in (*EDITABLE_FIELDS, *ARTIFACT_INPUTS)
+    }
+    changed = [field for field, value in edits.items() if value != values[field]]
+    values.update(edits)
+
+    if not regenerate and not stale_artifacts(changed):
+        return _save(db, project, values, changed)
+    if not values["refined_prompt"]:
+        raise ArtifactError("The project has no refined prompt to generate from.")
+
+    # Don't hold a pooled connection while waiting on the model
+    release_connection(db)
+
+    # Artifacts come in dependency order, so a regenerated tech stack that
+    # differs from the stored one makes the cursor rules stale in turn
+    for artifact, inputs in ARTIFACT_INPUTS.items():
+        if artifact not in regenerate and not set(changed).intersection(inputs):
+            continue
+        text = regenerate_artifact(
+            artifact,
+            values["refined_prompt"],
+            values["frameworks_languages"],
+            bypass_cache=artifact in regenerate,
+        )
+        if text != values[artifact]:
+            values[artifact] = text
+            changed.append(artifact)
+
+    return _save(db, project, values, changed)
+
+
+def _save(db: Session, project: Project, values: dict, changed: list[str]) -> list[str]:
+    """Write the changed fields, refreshing ``updated_at``, caches and indexes."""
+    if changed:
+        for field in changed:
+            setattr(project, field, values[field])
+        if "refined_prompt" in changed:
+            index_project(db, project)
+        db.commit()
+        project_pages.invalidate(project.id)
+    return changed
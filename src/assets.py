@@ -0,0 +1,248 @@
+"""Fingerprinted, precompressed static assets.
+
+``flask assets build`` minifies every file of the static folder that has a
+minifier (CSS), names the result after a hash of its content, writes gzip
+and brotli variants next to it under ``static/dist/`` and records the
+mapping in ``static/dist/manifest.json``.
+
+When the manifest exists, ``url_for("static", filename="style.css")``
+emits the fingerprinted URL and the static view serves the best
+precompressed variant the client accepts with a one-year ``immutable``
+lifetime: browsers never revalidate an asset, and a changed file gets a new
+URL. Without a manifest Flask's default static handling is unchanged.
+"""
+
+import gzip
+import json
+import mimetypes
+import os
+import re
+import shutil
+from dataclasses import asdict, dataclass
+from hashlib import sha256
+from typing import Any, Callable, Optional
+
+from flask import Flask, Response, current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Build output, relative to the static folder
+ASSETS_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+
+# Hex digits of the content hash kept in file names
+HASH_LENGTH = 12
+
+# Lifetime of fingerprinted assets in seconds (one year)
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+# File extension of each precompressed variant, best encoding first
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Strings and comments of a stylesheet, which minification must not touch
+_CSS_TOKENS = re.compile(
+    r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)""", re.DOTALL
+)
+
+
+@dataclass
+class Asset:
+    """A built static file.
+
+    Attributes:
+        source: Path of the original file, relative to the static folder
+        path: Path of the fingerprinted file, relative to the static folder
+        encodings: Content encodings with a precompressed variant, best first
+        size: Size of the fingerprinted file in bytes
+    """
+
+    source: str
+    path: str
+    encodings: list[str]
+    size: int
+
+
+def minify_css(source: str) -> str:
+    """Strip comments and insignificant whitespace from a stylesheet.
+
+    Args:
+        source: CSS text
+
+    Returns:
+        str: Equivalent, smaller CSS
+    """
+    def squeeze(css: str) -> str:
+        css = re.sub(r"\s+", " ", css)
+        # Spaces before ":" are kept: in a selector they are a combinator
+        css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+        return re.sub(r":\s+", ":", css).replace(";}", "}")
+
+    # Comments are dropped and the code around them squeezed as one piece
+    parts = []
+    code = ""
+    position = 0
+    for match in _CSS_TOKENS.finditer(source):
+        code += source[position:match.start()]
+        if match.group(1):
+            parts.extend((squeeze(code), match.group(1)))
+            code = ""
+        position = match.end()
+    parts.append(squeeze(code + source[position:]))
+    return "".join(parts).strip()
+
+
+# Minifiers by file extension; other files are fingerprinted as they are
+MINIFIERS: dict[str, Callable[[str], str]] = {".css": minify_css}
+
+
+def _fingerprinted_name(source: str, content: bytes) -> str:
+    """Insert a hash of ``content`` before the extension of ``source``."""
+    root, extension = os.path.splitext(source)
+    digest = sha256(content).hexdigest()[:HASH_LENGTH]
+    return f"{root}.{digest}{extension}"
+
+
+def _precompress(path: str, content: bytes) -> list[str]:
+    """Write the compressed variants of a file that come out smaller."""
+    variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli:
+        variants["br"] = brotli.compress(content, quality=11)
+
+    encodings = []
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        body = variants.get(encoding)
+        if body is not None and len(body) < len(content):
+            with open(path + suffix, "wb") as variant:
+                variant.write(body)
+            encodings.append(encoding)
+    return encodings
+
+
+def build_assets(static_folder: str) -> dict[str, Asset]:
+    """Build every static file into the assets directory and write the manifest.
+
+    Files from an earlier build are removed first.
+
+    Args:
+        static_folder: The application's static folder
+
+    Returns:
+        dict[str, Asset]: Built assets keyed by their source path
+    """
+    output = os.path.join(static_folder, ASSETS_DIR)
+    shutil.rmtree(output, ignore_errors=True)
+
+    sources = []
+    for directory, subdirectories, files in os.walk(static_folder):
+        if os.path.abspath(directory) == os.path.abspath(static_folder):
+            subdirectories[:] = [name for name in subdirectories if name != ASSETS_DIR]
+        for name in files:
+            sources.append(os.path.relpath(os.path.join(directory, name), static_folder))
+
+    assets = {}
+    for source in sorted(sources):
+        source_key = source.replace(os.sep, "/")
+        with open(os.path.join(static_folder, source), "rb") as source_file:
+            content = source_file.read()
+        minify = MINIFIERS.get(os.path.splitext(source)[1])
+        if minify:
+            content = minify(content.decode("utf-8")).encode("utf-8")
+
+        path = f"{ASSETS_DIR}/{_fingerprinted_name(source_key, content)}"
+        target = os.path.join(static_folder, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "wb") as built:
+            built.write(content)
+        assets[source_key] = Asset(
+            source=source_key,
+            path=path,
+            encodings=_precompress(target, content),
+            size=len(content),
+        )
+
+    with open(os.path.join(output, MANIFEST_NAME), "w", encoding="utf-8") as manifest:
+        json.dump(
+            {source: asdict(asset) for source, asset in assets.items()}, manifest, indent=2
+        )
+    return assets
+
+
+def clean_assets(static_folder: str) -> None:
+    """Remove the built assets, going back to serving the source files."""
+    shutil.rmtree(os.path.join(static_folder, ASSETS_DIR), ignore_errors=True)
+
+
+def load_manifest(static_folder: str) -> dict[str, Asset]:
+    """Read the manifest of the last build.
+
+    Args:
+        static_folder: The application's static folder
+
+    Returns:
+        dict[str, Asset]: Built assets keyed by source path, empty if never built
+    """
+    path = os.path.join(static_folder, ASSETS_DIR, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as manifest:
+            return {source: Asset(**asset) for source, asset in json.load(manifest).items()}
+    except FileNotFoundError:
+        return {}
+
+
+def _send_asset(asset: Asset) -> Response:
+    """Serve the best variant of a fingerprinted asset, cacheable forever."""
+    encoding = next(
+        (name for name in asset.encodings if request.accept_encodings[name]), None
+    )
+    mimetype = mimetypes.guess_type(asset.source)[0] or "application/octet-stream"
+    response = send_from_directory(
+        current_app.static_folder,
+        asset.path + (ENCODING_SUFFIXES[encoding] if encoding else ""),
+        mimetype=mimetype,
+        max_age=ASSET_MAX_AGE,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if asset.encodings:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app: Flask) -> None:
+    """Serve the built assets of ``app`` if ``flask assets build`` was run.
+
+    Calling it again reloads the manifest, for instance after a build.
+
+    Args:
+        app: The Flask application instance
+    """
+    manifest = load_manifest(app.static_folder)
+    registered = "assets" in app.extensions
+    app.extensions["assets"] = {
+        "sources": manifest,
+        "paths": {asset.path: asset for asset in manifest.values()},
+    }
+    if registered:
+        return
+    send_static_file = app.view_functions["static"]
+
+    @app.url_defaults
+    def fingerprint_static_url(endpoint: str, values: dict[str, Any]) -> None:
+        """Point ``url_for("static", ...)`` at the fingerprinted file."""
+        sources = app.extensions["assets"]["sources"]
+        if endpoint == "static" and values.get("filename") in sources:
+            values["filename"] = sources[values["filename"]].path
+
+    def static(filename: str) -> Response:
+        """Serve fingerprinted assets; leave other files to Flask."""
+        asset: Optional[Asset] = app.extensions["assets"]["paths"].get(filename)
+        if asset is None:
+            return send_static_file(filename=filename)
+        return _send_asset(asset)
+
+    app.view_functions["static"] = static
@@ -4,11 +4,29 @@ This module defines custom Flask CLI commands for database management
 and other administrative tasks.
 """
 
+import sys
+from typing import Optional
+
 import click
-from flask import Flask
+from flask import Flask, current_app
 from flask.cli import with_appcontext
 
-from src.database import init_db
+from src.archive import (
+    CONFLICT_POLICIES,
+    ImportConflictError,
+    export_ndjson,
+    export_zip,
+    import_records,
+    open_records,
+)
+from src.assets import build_assets, clean_assets
+from src.database import SessionLocal, get_engine, init_db, vacuum_db
+from src.jobs import run_worker
+from src.migrations import applied_versions, discover, schema_differences
+from src.response_cache import cache_stats, clear_cache
+from src.search import rebuild_search_index
+from src.similarity import backfill_signatures
+from src.storage import prune_artifacts, storage_stats
 
 
 def register_commands(app: Flask) -> None:
@@ -18,20 +36,278 @@ def register_commands(app: Flask) -> None:
         app: The Flask application instance
     """
     app.cli.add_command(init_db_command)
+    app.cli.add_command(cache_command)
+    app.cli.add_command(worker_command)
+    app.cli.add_command(search_command)
+    app.cli.add_command(similarity_command)
+    app.cli.add_command(projects_command)
+    app.cli.add_command(artifacts_command)
+    app.cli.add_command(assets_command)
 
 
 @click.command("db")
 @click.option("--init", is_flag=True, help="Initialize the database")
+@click.option("--upgrade", is_flag=True, help="Apply pending schema migrations")
+@click.option("--to", "target", type=int, help="Last migration version to apply")
+@click.option("--status", is_flag=True, help="List migrations and whether they are applied")
+@click.option("--check", is_flag=True, help="Fail if the schema differs from the models")
+@click.option("--vacuum", is_flag=True, help="Compact the database to reclaim freed space")
 @with_appcontext
-def init_db_command(init: bool) -> None:
+def init_db_command(
+    init: bool, upgrade: bool, target: Optional[int], status: bool, check: bool, vacuum: bool
+) -> None:
     """Database management commands.
 
     Args:
         init: Flag to initialize the database
+        upgrade: Flag to apply pending migrations
+        target: Last migration version to apply (default: all)
+        status: Flag to print the applied and pending migrations
+        check: Flag to compare the schema with the models
+        vacuum: Flag to compact the database, e.g. after an upgrade moved data
     """
     if init:
         click.echo("Initializing the database...")
         init_db()
         click.echo("Database initialized successfully!")
+    elif upgrade:
+        applied = init_db(target)
+        for name in applied:
+            click.echo(f"Applied {name}")
+        click.echo(f"Applied {len(applied)} migrations." if applied else "Database is up to date.")
+    elif status:
+        applied = applied_versions(get_engine())
+        for migration in discover():
+            applied_at = applied.get(migration.version)
+            state = f"applied {applied_at:%Y-%m-%d %H:%M}" if applied_at else "pending"
+            click.echo(f"{migration.name}: {state}")
+    elif check:
+        differences = schema_differences(get_engine())
+        for difference in differences:
+            click.echo(difference)
+        if differences:
+            sys.exit(1)
+        click.echo("Schema matches the models.")
+    elif vacuum:
+        click.echo("Compacting the database...")
+        vacuum_db()
+        click.echo("Database compacted.")
+    else:
+        click.echo("Please specify an action: --init, --upgrade, --status, --check or --vacuum")
+
+
+@click.command("cache")
+@click.option("--stats", is_flag=True, help="Show response cache statistics")
+@click.option("--clear", is_flag=True, help="Delete all cached responses")
+@with_appcontext
+def cache_command(stats: bool, clear: bool) -> None:
+    """Gemini response cache management commands.
+
+    Args:
+        stats: Flag to print cache statistics
+        clear: Flag to empty the cache
+    """
+    if clear:
+        removed = clear_cache()
+        click.echo(f"Removed {removed} cached responses.")
+    elif stats:
+        for name, value in cache_stats().items():
+            click.echo(f"{name}: {value}")
+    else:
+        click.echo("Please specify an action: --stats or --clear")
+
+
+@click.command("worker")
+@click.option("--concurrency", default=2, show_default=True, help="Jobs to run at once")
+@click.option(
+    "--poll-interval", default=1.0, show_default=True, help="Seconds between queue polls"
+)
+@with_appcontext
+def worker_command(concurrency: int, poll_interval: float) -> None:
+    """Run a worker that processes queued project generation jobs.
+
+    Args:
+        concurrency: Number of jobs to run at the same time
+        poll_interval: Seconds to wait before polling an empty queue again
+    """
+    click.echo(f"Starting generation worker with {concurrency} slot(s)...")
+    try:
+        run_worker(concurrency=concurrency, poll_interval=poll_interval)
+    except KeyboardInterrupt:
+        click.echo("Worker stopped.")
+
+
+@click.command("search")
+@click.option("--rebuild", is_flag=True, help="Rebuild the full-text search index")
+@with_appcontext
+def search_command(rebuild: bool) -> None:
+    """Full-text search index management commands.
+
+    Args:
+        rebuild: Flag to rebuild the index from the projects table
+    """
+    if rebuild:
+        click.echo("Rebuilding the search index...")
+        rebuild_search_index(get_engine())
+        click.echo("Search index rebuilt successfully!")
     else:
-        click.echo("Please specify an action: --init") 
\ No newline at end of file
+        click.echo("Please specify an action: --rebuild")
+
+
+@click.command("similarity")
+@click.option("--backfill", is_flag=True, help="Index projects without a signature")
+@click.option("--rebuild", is_flag=True, help="Drop the index and index every project")
+@click.option("--batch-size", default=1000, show_default=True, help="Projects per transaction")
+@with_appcontext
+def similarity_command(backfill: bool, rebuild: bool, batch_size: int) -> None:
+    """Near-duplicate project index management commands.
+
+    Args:
+        backfill: Flag to index the projects that have no signature yet
+        rebuild: Flag to recompute the signature of every project
+        batch_size: Number of projects indexed per transaction
+    """
+    if not backfill and not rebuild:
+        click.echo("Please specify an action: --backfill or --rebuild")
+        return
+
+    db = SessionLocal()
+    try:
+        indexed = backfill_signatures(db, rebuild=rebuild, batch_size=batch_size)
+    finally:
+        db.close()
+    click.echo(f"Indexed {indexed} projects.")
+
+
+@click.group("projects")
+def projects_command() -> None:
+    """Bulk project export and import commands."""
+    pass
+
+
+@projects_command.command("export")
+@click.option(
+    "--format", "export_format", type=click.Choice(["ndjson", "zip"]), default="ndjson",
+    show_default=True, help="Archive format"
+)
+@click.option("--output", "-o", default="-", help="Output file (default: stdout)")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows fetched per batch")
+@with_appcontext
+def export_projects_command(export_format: str, output: str, batch_size: int) -> None:
+    """Stream every project to an NDJSON file or a zip archive.
+
+    Args:
+        export_format: Either "ndjson" or "zip"
+        output: Path of the output file, or "-" for stdout
+        batch_size: Number of rows fetched from the database at a time
+    """
+    db = SessionLocal()
+    try:
+        if export_format == "zip":
+            chunks = export_zip(db, batch_size)
+        else:
+            chunks = (line.encode("utf-8") for line in export_ndjson(db, batch_size))
+
+        stream = sys.stdout.buffer if output == "-" else open(output, "wb")
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+        finally:
+            if output != "-":
+                stream.close()
+    finally:
+        db.close()
+
+    if output != "-":
+        click.echo(f"Exported projects to {output}")
+
+
+@projects_command.command("import")
+@click.argument("path")
+@click.option(
+    "--on-conflict", type=click.Choice(CONFLICT_POLICIES), default="skip",
+    show_default=True, help="What to do with names that already exist"
+)
+@click.option("--batch-size", default=1000, show_default=True, help="Rows inserted per batch")
+@click.option(
+    "--index/--no-index", default=True, show_default=True,
+    help="Index imported projects for similarity (else run `flask similarity --backfill`)"
+)
+@with_appcontext
+def import_projects_command(path: str, on_conflict: str, batch_size: int, index: bool) -> None:
+    """Import projects from an NDJSON file (or "-" for stdin) or a zip export.
+
+    Args:
+        path: Path of the export file
+        on_conflict: Policy for project names that already exist
+        batch_size: Number of rows inserted per statement
+        index: Flag to compute similarity signatures during the import
+    """
+    db = SessionLocal()
+    try:
+        counts = import_records(db, open_records(path), on_conflict, batch_size, index)
+    except (ImportConflictError, ValueError) as e:
+        raise click.ClickException(str(e))
+    finally:
+        db.close()
+
+    click.echo(", ".join(f"{name}: {count}" for name, count in counts.items()))
+    if not index:
+        click.echo("Similarity index skipped; run `flask similarity --backfill` to build it.")
+
+
+@click.command("artifacts")
+@click.option("--prune", is_flag=True, help="Delete artifacts no project refers to")
+@click.option("--stats", is_flag=True, help="Show artifact storage statistics")
+@with_appcontext
+def artifacts_command(prune: bool, stats: bool) -> None:
+    """Compressed project text storage management commands.
+
+    Projects created before the artifacts table are converted by
+    ``flask db --upgrade``.
+
+    Args:
+        prune: Flag to delete unreferenced artifacts
+        stats: Flag to print storage statistics
+    """
+    if not prune and not stats:
+        click.echo("Please specify an action: --prune or --stats")
+        return
+
+    db = SessionLocal()
+    try:
+        if prune:
+            click.echo(f"Removed {prune_artifacts(db)} unreferenced artifacts.")
+        if stats:
+            for name, value in storage_stats(db).items():
+                click.echo(f"{name}: {value}")
+    finally:
+        db.close()
+
+
+@click.group("assets")
+def assets_command() -> None:
+    """Static asset build commands."""
+    pass
+
+
+@assets_command.command("build")
+@with_appcontext
+def build_assets_command() -> None:
+    """Minify, fingerprint and precompress the static files.
+
+    Restart the application afterwards so it serves the new build.
+    """
+    assets = build_assets(current_app.static_folder)
+    for asset in assets.values():
+        encodings = ", ".join(asset.encodings) or "uncompressed"
+        click.echo(f"{asset.source} -> {asset.path} ({asset.size} bytes; {encodings})")
+    click.echo(f"Built {len(assets)} assets.")
+
+
+@assets_command.command("clean")
+@with_appcontext
+def clean_assets_command() -> None:
+    """Remove the built assets and serve the source files again."""
+    clean_assets(current_app.static_folder)
+    click.echo("Removed the built assets.")
@@ -0,0 +1,258 @@
+"""Upstream caching of the prompt prefix shared by generation stages.
+
+Every generation stage of a project starts with the same refined prompt.
+Instead of uploading it with each call, :class:`SharedPrefix` registers it
+once as Gemini cached content with a TTL, and each stage then sends only its
+own instruction. Cached tokens are billed at ``GEMINI_CACHED_INPUT_RATIO``
+of the input price, but creating the cache bills the prefix once at the full
+price (plus storage for as long as it lives), so the prefix is only cached
+when it reaches the smallest size the API caches for the model
+(:data:`MIN_CACHE_TOKENS`) and enough calls share it to come out ahead. Otherwise, and whenever the SDK
+cannot cache or creating the cache fails, calls send the whole prompt.
+
+The input tokens of every call are added to a :class:`TokenUsage`, which
+reports the billed input tokens and those the cache saved. Nothing here
+depends on the Gemini SDK; the cache is created by a function passed in.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, Optional
+
+from src.llm_client import estimate_tokens
+from src.settings import resolve_settings
+
+logger = logging.getLogger(__name__)
+
+# Context cache settings and their defaults, applied by configure().
+# GEMINI_CACHED_INPUT_RATIO is the price of a cached input token relative
+# to an uncached one. GEMINI_CONTEXT_CACHE_MIN_TOKENS overrides the model's
+# minimum cacheable size when positive.
+CONTEXT_CACHE_SETTINGS = {
+    "GEMINI_CONTEXT_CACHE_DISABLED": False,
+    "GEMINI_CONTEXT_CACHE_TTL": 600,
+    "GEMINI_CONTEXT_CACHE_MIN_TOKENS": 0,
+    "GEMINI_CACHED_INPUT_RATIO": 0.25,
+}
+CONTEXT_CACHE_DISABLED = CONTEXT_CACHE_SETTINGS["GEMINI_CONTEXT_CACHE_DISABLED"]
+CONTEXT_CACHE_TTL_SECONDS = CONTEXT_CACHE_SETTINGS["GEMINI_CONTEXT_CACHE_TTL"]
+CONTEXT_CACHE_MIN_TOKENS = CONTEXT_CACHE_SETTINGS["GEMINI_CONTEXT_CACHE_MIN_TOKENS"]
+CACHED_INPUT_RATIO = CONTEXT_CACHE_SETTINGS["GEMINI_CACHED_INPUT_RATIO"]
+
+# Smallest content the API caches, in tokens, by model name prefix; the
+# longest matching prefix applies
+MIN_CACHE_TOKENS = {
+    "gemini-1.5": 32768,
+    "gemini-2.0": 4096,
+    "gemini-2.5-flash": 1024,
+    "gemini-2.5-pro": 4096,
+}
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+# Registers a prefix upstream; returns the cache handle and a model bound to it
+CacheFactory = Callable[[str], tuple[Any, Any]]
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply CONTEXT_CACHE_SETTINGS from ``config``, the environment and defaults.
+
+    Args:
+        config: Application config, if any
+    """
+    global CONTEXT_CACHE_DISABLED, CONTEXT_CACHE_TTL_SECONDS
+    global CONTEXT_CACHE_MIN_TOKENS, CACHED_INPUT_RATIO
+    settings = resolve_settings(CONTEXT_CACHE_SETTINGS, config)
+    CONTEXT_CACHE_DISABLED = settings["GEMINI_CONTEXT_CACHE_DISABLED"]
+    CONTEXT_CACHE_TTL_SECONDS = settings["GEMINI_CONTEXT_CACHE_TTL"]
+    CONTEXT_CACHE_MIN_TOKENS = settings["GEMINI_CONTEXT_CACHE_MIN_TOKENS"]
+    CACHED_INPUT_RATIO = settings["GEMINI_CACHED_INPUT_RATIO"]
+
+
+@dataclass
+class TokenUsage:
+    """Input tokens of a group of model calls, e.g. one project's generation.
+
+    Attributes:
+        calls: Upstream calls made
+        input_tokens: Prompt tokens of the calls, cached ones included
+        cached_tokens: Prompt tokens read from cached content
+        cache_write_tokens: Tokens uploaded to create cached content
+    """
+
+    calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add_call(self, input_tokens: int, cached_tokens: int = 0) -> None:
+        """Record one call; stages running concurrently may share the usage."""
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.cached_tokens += cached_tokens
+
+    def add_cache_write(self, tokens: int) -> None:
+        """Record the upload of cached content."""
+        with self._lock:
+            self.cache_write_tokens += tokens
+
+    @property
+    def billed_input_tokens(self) -> float:
+        """Input tokens billed, in uncached-token equivalents.
+
+        Storage of cached content, billed per hour, is not included.
+        """
+        return (
+            self.input_tokens
+            - self.cached_tokens * (1 - CACHED_INPUT_RATIO)
+            + self.cache_write_tokens
+        )
+
+    @property
+    def saved_tokens(self) -> float:
+        """Billed input tokens saved compared with sending every prompt whole."""
+        return self.input_tokens - self.billed_input_tokens
+
+    def report(self) -> dict[str, Any]:
+        """Summarize the usage.
+
+        Returns:
+            dict: Calls, input, cached and billed tokens and the tokens saved
+        """
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "billed_input_tokens": round(self.billed_input_tokens),
+            "saved_tokens": round(self.saved_tokens),
+        }
+
+
+def min_cache_tokens(model_name: str) -> int:
+    """Return the smallest prefix, in tokens, worth caching for a model.
+
+    Args:
+        model_name: Name of the model, with or without the ``models/`` prefix
+
+    Returns:
+        int: GEMINI_CONTEXT_CACHE_MIN_TOKENS if set, else the API's minimum
+            for the model
+    """
+    if CONTEXT_CACHE_MIN_TOKENS > 0:
+        return CONTEXT_CACHE_MIN_TOKENS
+    name = model_name.removeprefix("models/")
+    matches = [prefix for prefix in MIN_CACHE_TOKENS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_MIN_CACHE_TOKENS
+    return MIN_CACHE_TOKENS[max(matches, key=len)]
+
+
+def worth_caching(prefix_tokens: int, uses: int, model_name: str) -> bool:
+    """Decide whether caching a prefix shared by ``uses`` calls pays off.
+
+    Sending it whole costs ``uses`` full uploads; caching costs one full
+    upload plus ``uses`` reads at the cached rate.
+
+    Args:
+        prefix_tokens: Size of the prefix
+        uses: Calls expected to share it
+        model_name: Name of the model the prefix is cached for
+
+    Returns:
+        bool: True if the prefix should be cached
+    """
+    return (
+        not CONTEXT_CACHE_DISABLED
+        and prefix_tokens >= min_cache_tokens(model_name)
+        and uses * (1 - CACHED_INPUT_RATIO) > 1
+    )
+
+
+class SharedPrefix:
+    """A prompt prefix shared by several generation calls.
+
+    The cached content is created on the first call that needs it, so a
+    generation served entirely from the response cache never creates one,
+    and it is deleted by :meth:`close` instead of being kept (and billed)
+    until its TTL expires. Use the prefix as a context manager.
+
+    Attributes:
+        text: The start of every prompt sent with this prefix
+        usage: Token usage of the calls made with it
+    """
+
+    def __init__(
+        self,
+        text: str,
+        uses: int,
+        create_cache: Optional[CacheFactory] = None,
+        usage: Optional[TokenUsage] = None,
+        model_name: str = "",
+    ) -> None:
+        """Describe the prefix of ``uses`` upcoming calls.
+
+        Args:
+            text: The shared start of the prompts
+            uses: Calls expected to share it
+            create_cache: Function registering the prefix upstream, or None
+                when the SDK cannot cache content
+            usage: Usage to add the calls to (default: a new one)
+            model_name: Name of the model the calls go to, which sets the
+                smallest prefix worth caching
+        """
+        self.text = text
+        self.usage = usage if usage is not None else TokenUsage()
+        worth_it = worth_caching(estimate_tokens(text), uses, model_name)
+        self._create_cache = create_cache if create_cache and worth_it else None
+        self._cache: Any = None
+        self._cached_model: Any = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "SharedPrefix":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def prompt(self, instruction: str) -> str:
+        """Return the whole prompt of a call: the prefix, then its instruction."""
+        return f"{self.text}\n\n{instruction}"
+
+    def cached_model(self) -> Any:
+        """Return a model answering on top of the cached prefix.
+
+        Creates the cached content on first use. Creation is attempted once;
+        if it fails, the calls fall back to whole prompts.
+
+        Returns:
+            Any: The model bound to the cached content, or None if the
+            whole prompt must be sent
+        """
+        with self._lock:
+            if self._create_cache is not None:
+                create, self._create_cache = self._create_cache, None
+                try:
+                    self._cache, self._cached_model = create(self.text)
+                    self.usage.add_cache_write(estimate_tokens(self.text))
+                except Exception as e:
+                    logger.warning(f"Could not cache the prompt prefix, sending whole prompts: {e}")
+            return self._cached_model
+
+    def discard(self) -> None:
+        """Stop using the cached content, e.g. after it expired upstream."""
+        with self._lock:
+            self._cached_model = None
+
+    def close(self) -> None:
+        """Delete the cached content, if any."""
+        with self._lock:
+            cache, self._cache, self._cached_model = self._cache, None, None
+        if cache is not None:
+            try:
+                cache.delete()
+            except Exception as e:
+                # It expires at its TTL anyway
+                logger.warning(f"Could not delete the cached prompt prefix: {e}")
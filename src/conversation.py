@@ -0,0 +1,348 @@
+"""Conversation engine for the prompt refinement chat.
+
+This module stores refinement conversations server-side and turns a stored
+transcript into a live Gemini chat session, sending exactly one upstream
+request per user turn, either as a single blocking call or as a stream of
+text chunks.
+
+The context sent with a turn is kept within a token budget: once the
+transcript outgrows it, the older messages are condensed into a rolling
+summary that is sent in their place.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Iterator, Mapping, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.database import release_connection
+from src.gemini_config import (
+    finish_chat_stream,
+    get_refinement_chat,
+    send_chat_message,
+    summarize_conversation,
+)
+from src.llm_client import estimate_tokens
+from src.models import Conversation, ConversationSummary, Message
+from src.settings import resolve_settings
+
+logger = logging.getLogger(__name__)
+
+# Estimated tokens of history a turn may send before older messages are
+# summarized, and how much recent history is kept verbatim when they are;
+# applied by configure()
+CONVERSATION_SETTINGS = {
+    "CONTEXT_TOKEN_BUDGET": 4000,
+    "CONTEXT_RECENT_TOKENS": 1500,
+}
+CONTEXT_TOKEN_BUDGET = CONVERSATION_SETTINGS["CONTEXT_TOKEN_BUDGET"]
+CONTEXT_RECENT_TOKENS = CONVERSATION_SETTINGS["CONTEXT_RECENT_TOKENS"]
+
+# Replies that carry no requirement once taken out of the conversation
+ACKNOWLEDGEMENTS = {
+    "yes", "yep", "ok", "okay", "sure", "thanks", "thank you", "great",
+    "perfect", "correct", "agreed", "sounds good", "looks good",
+}
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply CONVERSATION_SETTINGS from ``config``, the environment and defaults.
+
+    Args:
+        config: Application config, if any
+    """
+    global CONTEXT_TOKEN_BUDGET, CONTEXT_RECENT_TOKENS
+    settings = resolve_settings(CONVERSATION_SETTINGS, config)
+    CONTEXT_TOKEN_BUDGET = settings["CONTEXT_TOKEN_BUDGET"]
+    CONTEXT_RECENT_TOKENS = settings["CONTEXT_RECENT_TOKENS"]
+
+
+@dataclass
+class ChatContext:
+    """The history sent with a chat turn.
+
+    Attributes:
+        summary: Summary of the compacted older messages, if any
+        messages: The messages after the summary as ``{"role", "content"}``
+            dictionaries
+    """
+
+    summary: Optional[str]
+    messages: list[dict]
+
+    @property
+    def tokens(self) -> int:
+        """Estimated number of tokens of the context."""
+        return estimate_tokens(self.summary or "") + sum(
+            estimate_tokens(message["content"]) for message in self.messages
+        )
+
+
+def opening_message(project_name: str, project_description: str) -> str:
+    """Build the first user message of a new conversation."""
+    return f"I want to create a project called '{project_name}'. {project_description}"
+
+
+def create_conversation(
+    db: Session, project_name: str, project_description: str
+) -> Conversation:
+    """Start a new stored conversation.
+
+    Args:
+        db: Database session
+        project_name: Name of the project being refined
+        project_description: Initial description entered by the user
+
+    Returns:
+        Conversation: The persisted conversation
+    """
+    conversation = Conversation(
+        project_name=project_name,
+        project_description=project_description
+    )
+    db.add(conversation)
+    db.commit()
+    return conversation
+
+
+def load_conversation(
+    db: Session, conversation_id: Optional[int]
+) -> Optional[Conversation]:
+    """Fetch a conversation by id without loading its messages.
+
+    Args:
+        db: Database session
+        conversation_id: Id taken from the user's session, if any
+
+    Returns:
+        Optional[Conversation]: The conversation, or None if it does not exist
+    """
+    if conversation_id is None:
+        return None
+    return db.get(Conversation, conversation_id)
+
+
+def get_history(db: Session, conversation_id: int) -> list[dict]:
+    """Return the transcript of a conversation in send order.
+
+    Args:
+        db: Database session
+        conversation_id: The conversation to read
+
+    Returns:
+        list[dict]: Messages as ``{"role", "content"}`` dictionaries
+    """
+    rows = db.execute(
+        select(Message.role, Message.content)
+        .where(Message.conversation_id == conversation_id)
+        .order_by(Message.id)
+    )
+    return [{"role": role, "content": content} for role, content in rows]
+
+
+def append_messages(db: Session, conversation_id: int, messages: list[dict]) -> None:
+    """Append messages to a conversation as new rows.
+
+    Args:
+        db: Database session
+        conversation_id: The conversation to extend
+        messages: Messages as ``{"role", "content"}`` dictionaries
+    """
+    db.add_all(
+        Message(
+            conversation_id=conversation_id,
+            role=message["role"],
+            content=message["content"]
+        )
+        for message in messages
+    )
+    db.commit()
+
+
+def prepare_context(db: Session, conversation_id: int) -> ChatContext:
+    """Return the context for the next turn, compacting it if it is too long.
+
+    When the summary and the messages after it exceed CONTEXT_TOKEN_BUDGET,
+    everything but the most recent CONTEXT_RECENT_TOKENS worth of messages
+    is folded into the summary with one extra model call, so compaction
+    happens once every few turns rather than on every turn. If the summary
+    cannot be generated the full context is returned.
+
+    Args:
+        db: Database session
+        conversation_id: The conversation to read
+
+    Returns:
+        ChatContext: The summary and the messages to send verbatim
+    """
+    summary = db.get(ConversationSummary, conversation_id)
+    rows = db.execute(
+        select(Message.id, Message.role, Message.content)
+        .where(
+            Message.conversation_id == conversation_id,
+            Message.id > (summary.through_message_id if summary else 0),
+        )
+        .order_by(Message.id)
+    ).all()
+    context = ChatContext(
+        summary=summary.content if summary else None,
+        messages=[{"role": role, "content": content} for _, role, content in rows],
+    )
+    if context.tokens <= CONTEXT_TOKEN_BUDGET:
+        return context
+
+    # Keep the newest messages that fit the recent budget, starting the
+    # kept part with a user message so the roles still alternate
+    keep_from = len(rows)
+    kept_tokens = 0
+    for index in range(len(rows) - 1, -1, -1):
+        kept_tokens += estimate_tokens(rows[index].content)
+        if kept_tokens > CONTEXT_RECENT_TOKENS:
+            break
+        if rows[index].role == "user":
+            keep_from = index
+    if keep_from == 0:
+        return context
+
+    release_connection(db)
+    try:
+        content = summarize_conversation(context.summary, context.messages[:keep_from])
+    except Exception as e:
+        logger.warning(f"Conversation {conversation_id} could not be compacted: {e}")
+        return context
+
+    if summary is None:
+        summary = ConversationSummary(conversation_id=conversation_id)
+        db.add(summary)
+    summary.content = content
+    summary.through_message_id = rows[keep_from - 1].id
+    db.commit()
+    return ChatContext(summary=content, messages=context.messages[keep_from:])
+
+
+def _normalize_sentence(sentence: str) -> str:
+    """Normalize a sentence for duplicate detection."""
+    return " ".join(sentence.lower().split()).rstrip(".!?")
+
+
+def compile_refined_prompt(db: Session, conversation: Conversation) -> str:
+    """Build the refined prompt sent to generation from a conversation.
+
+    The user's requirements are taken from their messages with repeated
+    sentences and bare acknowledgements removed. Messages folded into the
+    rolling summary are represented by the summary, so the prompt stays
+    within the context budget however long the conversation was.
+
+    Args:
+        db: Database session
+        conversation: The approved conversation
+
+    Returns:
+        str: The refined prompt
+    """
+    summary = db.get(ConversationSummary, conversation.id)
+    contents = db.scalars(
+        select(Message.content)
+        .where(
+            Message.conversation_id == conversation.id,
+            Message.role == "user",
+            Message.id > (summary.through_message_id if summary else 0),
+        )
+        .order_by(Message.id)
+    )
+
+    refined_prompt = f"Project: {conversation.project_name}\n"
+    refined_prompt += f"Description: {conversation.project_description}\n\n"
+    if summary:
+        refined_prompt += f"Summary of the earlier conversation:\n{summary.content}\n\n"
+    refined_prompt += "Refined Requirements based on conversation:\n"
+
+    # Sentences already in the header or an earlier message are dropped
+    seen = {
+        _normalize_sentence(sentence)
+        for sentence in re.split(
+            r"(?<=[.!?])\s+",
+            opening_message(conversation.project_name, conversation.project_description or ""),
+        )
+    }
+    for content in contents:
+        sentences = []
+        for sentence in re.split(r"(?<=[.!?])\s+", content.strip()):
+            normalized = _normalize_sentence(sentence)
+            if not normalized or normalized in seen or normalized in ACKNOWLEDGEMENTS:
+                continue
+            seen.add(normalized)
+            sentences.append(" ".join(sentence.split()))
+        if sentences:
+            refined_prompt += f"\nUser requirement: {' '.join(sentences)}\n"
+
+    return refined_prompt
+
+
+def delete_conversation(db: Session, conversation: Conversation) -> None:
+    """Delete a conversation and all of its messages.
+
+    Args:
+        db: Database session
+        conversation: The conversation to remove
+    """
+    db.delete(conversation)
+    db.commit()
+
+
+def _history_text(chat_history: list[dict], summary: Optional[str] = None) -> str:
+    """Join the summary and messages, for estimating the size of a request."""
+    return "\n".join([summary or ""] + [message["content"] for message in chat_history])
+
+
+def send_turn(
+    chat_history: list[dict], user_message: str, summary: Optional[str] = None
+) -> str:
+    """Send a single user message in the context of an existing conversation.
+
+    The chat is rebuilt from the stored user and assistant messages, so the
+    model receives the whole conversation as history and only the new message
+    is sent. Each turn therefore costs exactly one upstream call regardless of
+    how long the conversation has become.
+
+    Args:
+        chat_history: Stored messages as ``{"role", "content"}`` dictionaries
+        user_message: The new message from the user
+        summary: Summary of messages compacted out of ``chat_history``
+
+    Returns:
+        str: The assistant's reply text
+    """
+    chat = get_refinement_chat(history=chat_history, summary=summary)
+    response = send_chat_message(
+        chat, user_message, context=_history_text(chat_history, summary)
+    )
+    return response.text
+
+
+def stream_turn(
+    chat_history: list[dict], user_message: str, summary: Optional[str] = None
+) -> Iterator[str]:
+    """Send a single user message and yield the reply as it is generated.
+
+    Args:
+        chat_history: Stored messages as ``{"role", "content"}`` dictionaries
+        user_message: The new message from the user
+        summary: Summary of messages compacted out of ``chat_history``
+
+    Yields:
+        str: Successive chunks of the assistant's reply text
+    """
+    chat = get_refinement_chat(history=chat_history, summary=summary)
+    response = send_chat_message(
+        chat, user_message, context=_history_text(chat_history, summary), stream=True
+    )
+    reply = []
+    for chunk in response:
+        if chunk.text:
+            reply.append(chunk.text)
+            yield chunk.text
+    finish_chat_stream("".join(reply))
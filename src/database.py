@@ -2,55 +2,331 @@
 
 This module handles database connection setup, session management,
 and provides utilities for database operations.
+
+The engine is built by the application factory from ``app.config`` (or on
+first use from the environment), never at import time. SQLite connections
+are tuned for concurrent web workers: WAL journaling lets readers proceed
+while a writer commits, and a busy timeout makes writers wait for the lock
+instead of failing with "database is locked". PostgreSQL connections are
+pooled with a configurable size, overflow, recycle time and pre-ping.
+Request handlers share one session per Flask application context, removed
+on teardown.
+
+With ``DATABASE_REPLICA_URL`` set, read-only pages can query a read replica
+through :func:`get_read_db`. A client that just wrote reads from the primary
+for ``REPLICA_STICKY_SECONDS`` so it sees its own changes despite
+replication lag.
+
+The schema is managed by the versioned migrations in ``src.migrations``.
 """
 
 import os
-from typing import Generator
+import time
+from typing import Any, Mapping, Optional
+
+from flask import Flask, Response, has_app_context, request, session
+from flask.globals import app_ctx
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+from src.migrations import upgrade
+from src.search import ensure_search_index
+from src.settings import resolve_settings
+
+# Database used when neither the app config nor DATABASE_URL names one
+DEFAULT_DATABASE_URL = "sqlite:///instance/app.db"
+
+# Engine settings and their defaults. Each can be overridden in app.config
+# or the environment, which is read when the engine is built (after
+# load_dotenv), not when this module is imported.
+ENGINE_SETTINGS = {
+    # SQLite tuning
+    "SQLITE_JOURNAL_MODE": "WAL",
+    "SQLITE_SYNCHRONOUS": "NORMAL",
+    "SQLITE_BUSY_TIMEOUT_MS": 15000,
+    "SQLITE_MMAP_SIZE": 256 * 1024 * 1024,
+    "SQLITE_CACHE_SIZE_KB": 20000,
+    # Connection pool tuning
+    "DB_POOL_SIZE": 10,
+    "DB_MAX_OVERFLOW": 20,
+    "DB_POOL_TIMEOUT": 30,
+    # Seconds after which a pooled connection is replaced (-1: never)
+    "DB_POOL_RECYCLE": -1,
+    # Test each connection on checkout, replacing ones the server dropped
+    "DB_POOL_PRE_PING": False,
+}
+
+# Seconds a client that wrote keeps reading from the primary
+DEFAULT_REPLICA_STICKY_SECONDS = 5.0
+
+# Session key holding the time until which the client reads from the primary
+_PRIMARY_UNTIL_KEY = "_db_primary_until"
+
+# The process-wide engines, built by configure_engine()
+engine: Optional[Engine] = None
+replica_engine: Optional[Engine] = None
+
+
+def engine_settings(config: Optional[Mapping[str, Any]] = None) -> dict[str, Any]:
+    """Resolve the engine settings from ``config``, the environment and defaults.
+
+    Args:
+        config: Application config, if any
+
+    Returns:
+        dict[str, Any]: Every ENGINE_SETTINGS key with its effective value
+    """
+    return resolve_settings(ENGINE_SETTINGS, config)
+
+
+def _engine_options(url: str, settings: dict[str, Any]) -> dict[str, Any]:
+    """Return ``create_engine`` keyword arguments suited to the database.
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import Session, sessionmaker
+    Args:
+        url: Database URL
+        settings: Resolved engine settings
 
-from src.models import Base
+    Returns:
+        dict[str, Any]: Pool and driver options
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory databases live in a single connection
+        return {}
+
+    options: dict[str, Any] = {
+        "pool_size": settings["DB_POOL_SIZE"],
+        "max_overflow": settings["DB_MAX_OVERFLOW"],
+        "pool_timeout": settings["DB_POOL_TIMEOUT"],
+        "pool_recycle": settings["DB_POOL_RECYCLE"],
+        "pool_pre_ping": settings["DB_POOL_PRE_PING"],
+    }
+    if parsed.get_backend_name() == "sqlite":
+        # Seconds the driver waits for a lock, matching busy_timeout
+        options["connect_args"] = {"timeout": settings["SQLITE_BUSY_TIMEOUT_MS"] / 1000}
+    return options
+
+
+def _sqlite_pragmas(settings: dict[str, Any]) -> Any:
+    """Build a connect listener applying performance and safety pragmas."""
+    def configure_connection(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA journal_mode={settings['SQLITE_JOURNAL_MODE']}")
+            cursor.execute(f"PRAGMA synchronous={settings['SQLITE_SYNCHRONOUS']}")
+            cursor.execute(f"PRAGMA busy_timeout={settings['SQLITE_BUSY_TIMEOUT_MS']}")
+            cursor.execute(f"PRAGMA mmap_size={settings['SQLITE_MMAP_SIZE']}")
+            cursor.execute(f"PRAGMA cache_size=-{settings['SQLITE_CACHE_SIZE_KB']}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA foreign_keys=ON")
+        finally:
+            cursor.close()
+
+    return configure_connection
 
-# Database configuration
-DATABASE_URL = os.getenv(
-    "DATABASE_URL", "sqlite:///instance/app.db"
-)  # Default to SQLite in instance folder
 
-# Create engine
-engine = create_engine(DATABASE_URL, echo=False)
+def _build_engine(url: str, settings: dict[str, Any]) -> Engine:
+    """Create an engine for ``url`` with the resolved settings."""
+    new_engine = create_engine(url, echo=False, **_engine_options(url, settings))
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine, "connect", _sqlite_pragmas(settings))
+    return new_engine
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def configure_engine(
+    url: Optional[str] = None,
+    config: Optional[Mapping[str, Any]] = None,
+    replica_url: Optional[str] = None,
+) -> Engine:
+    """Build the process-wide engines and bind the session factories to them.
 
-def init_db() -> None:
-    """Initialize the database by creating all tables.
+    Configuring the URLs already in use keeps the existing engines.
 
-    This function creates all tables defined in the models if they
-    don't already exist.
+    Args:
+        url: Database URL (default: DATABASE_URL from the environment)
+        config: Application config holding ENGINE_SETTINGS overrides
+        replica_url: URL of a read replica (default: DATABASE_REPLICA_URL
+            from the environment, if set)
+
+    Returns:
+        Engine: The primary engine now in use
     """
+    global engine, replica_engine
+    url = url or os.getenv("DATABASE_URL", DEFAULT_DATABASE_URL)
+    replica_url = replica_url or os.getenv("DATABASE_REPLICA_URL") or None
+    settings = engine_settings(config)
+
+    if engine is None or engine.url != make_url(url):
+        if engine is not None:
+            engine.dispose()
+        engine = _build_engine(url, settings)
+        SessionLocal.configure(bind=engine)
+
+    current_replica = replica_engine.url if replica_engine is not None else None
+    wanted_replica = make_url(replica_url) if replica_url else None
+    if current_replica != wanted_replica:
+        if replica_engine is not None:
+            replica_engine.dispose()
+        replica_engine = _build_engine(replica_url, settings) if replica_url else None
+    ReplicaSessionLocal.configure(bind=replica_engine or engine)
+    return engine
+
+
+def get_engine() -> Engine:
+    """Return the engine, building it from the environment if needed."""
+    return engine if engine is not None else configure_engine()
+
+
+class _LazySessionMaker(sessionmaker):
+    """Session factory that builds the engine on first use."""
+
+    def __call__(self, **local_kw: Any) -> Session:
+        if engine is None:
+            configure_engine()
+        return super().__call__(**local_kw)
+
+
+# Create session factories
+SessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
+ReplicaSessionLocal = _LazySessionMaker(autocommit=False, autoflush=False)
+
+
+def _app_context_id() -> int:
+    """Scope sessions to the current Flask application context."""
+    return id(app_ctx._get_current_object())
+
+
+# Sessions shared by everything that runs inside one application context
+db_session = scoped_session(SessionLocal, scopefunc=_app_context_id)
+read_db_session = scoped_session(ReplicaSessionLocal, scopefunc=_app_context_id)
+
+
+def init_app(app: Flask) -> None:
+    """Build the engines from the app config and register session cleanup.
+
+    Args:
+        app: The Flask application instance
+    """
+    configure_engine(
+        app.config["SQLALCHEMY_DATABASE_URI"],
+        app.config,
+        app.config.get("DATABASE_REPLICA_URL"),
+    )
+    app.config.setdefault("REPLICA_STICKY_SECONDS", DEFAULT_REPLICA_STICKY_SECONDS)
+
+    @app.after_request
+    def stick_to_primary(response: Response) -> Response:
+        """Send the reads following a successful write to the primary."""
+        if (
+            replica_engine is not None
+            and request.method not in ("GET", "HEAD", "OPTIONS")
+            and response.status_code < 400
+        ):
+            session[_PRIMARY_UNTIL_KEY] = (
+                time.time() + float(app.config["REPLICA_STICKY_SECONDS"])
+            )
+        return response
+
+    @app.teardown_appcontext
+    def remove_session(exception: Optional[BaseException] = None) -> None:
+        db_session.remove()
+        read_db_session.remove()
+
+
+def init_db(target: Optional[int] = None) -> list[str]:
+    """Create the database or bring its schema up to date.
+
+    Applies the pending migrations, then (re)creates the full-text search
+    index, which is derived from the tables rather than versioned.
+
+    Args:
+        target: Last migration version to apply (default: all)
+
+    Returns:
+        list[str]: Names of the migrations applied
+    """
+    engine = get_engine()
+
     # Ensure instance directory exists
-    instance_dir = os.path.dirname(DATABASE_URL.replace("sqlite:///", ""))
-    if instance_dir and not os.path.exists(instance_dir):
-        os.makedirs(instance_dir)
+    if engine.dialect.name == "sqlite" and engine.url.database:
+        instance_dir = os.path.dirname(engine.url.database)
+        if instance_dir and not os.path.exists(instance_dir):
+            os.makedirs(instance_dir)
 
-    # Create all tables
-    Base.metadata.create_all(bind=engine)
+    applied = upgrade(engine, target)
 
+    # Create the full-text search index and its delete trigger
+    ensure_search_index(engine)
+    return [migration.name for migration in applied]
 
-def get_db() -> Generator[Session, None, None]:
-    """Provide a database session for dependency injection.
 
-    Yields:
+def vacuum_db() -> None:
+    """Compact the database, giving pages freed by deletes back to the disk.
+
+    Worth running after a migration moved or dropped much data. SQLite
+    rewrites the whole file and blocks writers meanwhile.
+    """
+    with get_engine().connect() as connection:
+        connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("VACUUM"))
+
+
+def get_db() -> Session:
+    """Return the database session of the current application context.
+
+    The same session is returned for the whole request and is closed
+    automatically when the application context is torn down. Code running
+    outside an application context (background threads, streamed response
+    bodies) should open its own ``SessionLocal()`` instead.
+
+    Returns:
+        Session: A SQLAlchemy database session
+
+    Raises:
+        RuntimeError: If called outside an application context
+    """
+    if not has_app_context():
+        raise RuntimeError("get_db() requires an application context")
+    return db_session()
+
+
+def get_read_db() -> Session:
+    """Return a session for read-only queries of the current request.
+
+    The session uses the read replica when one is configured, unless the
+    client wrote within the last ``REPLICA_STICKY_SECONDS``; otherwise it is
+    the request's primary session from :func:`get_db`. Replicas may lag
+    behind the primary, so a row missing from the replica is not proof
+    that it does not exist.
+
+    Returns:
         Session: A SQLAlchemy database session
 
-    Note:
-        This function ensures that database sessions are properly
-        closed after use.
+    Raises:
+        RuntimeError: If called outside an application context
+    """
+    if not has_app_context():
+        raise RuntimeError("get_read_db() requires an application context")
+    if replica_engine is None or session.get(_PRIMARY_UNTIL_KEY, 0) > time.time():
+        return db_session()
+    return read_db_session()
+
+
+def release_connection(db: Session) -> None:
+    """Return the session's connection to the pool before a slow wait.
+
+    Call this before blocking on something other than the database, such as
+    a model API request, so that requests waiting on the upstream do not
+    each hold one of the pool's connections. Pending changes are committed;
+    loaded objects are not expired and stay readable, and the session opens
+    a new transaction the next time it is used.
+
+    Args:
+        db: Database session
     """
-    db = SessionLocal()
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
     try:
-        yield db
+        db.commit()
     finally:
-        db.close() 
\ No newline at end of file
+        db.expire_on_commit = expire_on_commit
@@ -2,17 +2,211 @@
 
 This module handles the setup and configuration of the Google Generative AI (Gemini) API.
 It loads the API key from environment variables and provides configured clients.
+
+The SDK pulls in gRPC and protobuf, so it is imported on the first model
+call rather than with this module; starting the app, running CLI commands
+and forking preloaded workers never pay for it.
+
+Newer SDK features are detected at run time: the refinement persona is
+passed as a system instruction where the SDK supports it, and the refined
+prompt shared by the generation stages is cached upstream (see
+``src.context_cache``) where it supports cached content. Older SDKs get the
+persona as the first chat turn and whole prompts.
 """
 
+import importlib.util
+import inspect
 import os
-from typing import Optional
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import timedelta
+from functools import lru_cache, partial
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Mapping, Optional
 import logging
 
-import google.generativeai as genai
+from src import context_cache
+from src.context_cache import SharedPrefix, TokenUsage
+from src.llm_client import (
+    CircuitBreaker,
+    LLMClient,
+    UpstreamUnavailableError,
+    estimate_tokens,
+)
+from src.metrics import (
+    LLM_TOKENS,
+    cached_input_tokens,
+    llm_span,
+    registry,
+    stage_span,
+    usage_tokens,
+)
+from src.response_cache import cached_generate
+from src.rules import (
+    RULES_FIELDS,
+    parse_json_object,
+    render_cursor_rules,
+    rules_fields_prompt,
+)
+from src.settings import resolve_settings
+
+if TYPE_CHECKING:
+    import google.generativeai as genai
 
 logger = logging.getLogger(__name__)
 
 
+class GenerationError(Exception):
+    """Raised when no project artifact could be generated."""
+
+    pass
+
+
+# How project data is generated: "staged" makes one call per artifact,
+# "single" requests every artifact in one JSON document
+GENERATION_MODES = ("staged", "single")
+
+# Generation and upstream client settings and their defaults, applied by
+# configure(): the seconds each generation stage may take before it is
+# abandoned, the generation mode and pool size, the upstream rate limits
+# (0 disables a limit), retries and circuit breaker
+GEMINI_SETTINGS = {
+    "GEMINI_STAGE_TIMEOUT": 120.0,
+    "GEMINI_GENERATION_MODE": "staged",
+    "GEMINI_GENERATION_WORKERS": 6,
+    "GEMINI_REQUESTS_PER_MINUTE": 60,
+    "GEMINI_TOKENS_PER_MINUTE": 1000000,
+    "GEMINI_MAX_RETRIES": 3,
+    "GEMINI_BACKOFF_BASE": 0.5,
+    "GEMINI_BACKOFF_MAX": 8.0,
+    "GEMINI_RATE_LIMIT_WAIT": 30.0,
+    "GEMINI_BREAKER_THRESHOLD": 5,
+    "GEMINI_BREAKER_RESET": 30.0,
+}
+STAGE_TIMEOUT_SECONDS = GEMINI_SETTINGS["GEMINI_STAGE_TIMEOUT"]
+GENERATION_MODE = GEMINI_SETTINGS["GEMINI_GENERATION_MODE"]
+GENERATION_WORKERS = GEMINI_SETTINGS["GEMINI_GENERATION_WORKERS"]
+
+# Persona of the hyper-critical prompt refinement expert
+REFINEMENT_INSTRUCTION = """You are a Prompt Refinement Expert for software project planning. Your role is to be extremely thorough and critical in helping users refine their project requirements.
+
+Your behavior:
+1. Ask clarifying questions about EVERY aspect of the project
+2. Point out ambiguities, missing information, and potential issues
+3. Suggest better ways to phrase requirements
+4. Push for specific technical details
+5. Question assumptions and vague statements
+6. Continue refining until the prompt is crystal clear and comprehensive
+
+Be professional but persistent. Do not accept vague or incomplete requirements. Your goal is to produce a prompt that any developer could use to build exactly what the user wants."""
+
+
+@lru_cache(maxsize=1)
+def _genai() -> ModuleType:
+    """Import the Gemini SDK and apply the API key on first use."""
+    import google.generativeai as genai
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if api_key:
+        genai.configure(api_key=api_key)
+    return genai
+
+
+def transient_errors() -> tuple[type[BaseException], ...]:
+    """Return the errors worth retrying.
+
+    These are rate limiting, overload, timeouts and dropped connections. The
+    SDK's exception module is only imported once the client first needs it.
+    """
+    from google.api_core import exceptions as google_exceptions
+
+    return (
+        google_exceptions.TooManyRequests,
+        google_exceptions.InternalServerError,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.DeadlineExceeded,
+        ConnectionError,
+        TimeoutError,
+    )
+
+
+def _build_llm_client(settings: dict[str, Any]) -> LLMClient:
+    """Create the upstream client with the resolved GEMINI_SETTINGS."""
+    return LLMClient(
+        requests_per_minute=settings["GEMINI_REQUESTS_PER_MINUTE"],
+        tokens_per_minute=settings["GEMINI_TOKENS_PER_MINUTE"],
+        max_retries=settings["GEMINI_MAX_RETRIES"],
+        backoff_base=settings["GEMINI_BACKOFF_BASE"],
+        backoff_max=settings["GEMINI_BACKOFF_MAX"],
+        rate_limit_wait=settings["GEMINI_RATE_LIMIT_WAIT"],
+        transient_errors=transient_errors,
+        breaker=CircuitBreaker(
+            settings["GEMINI_BREAKER_THRESHOLD"], settings["GEMINI_BREAKER_RESET"]
+        ),
+    )
+
+
+# Shared gate for every upstream call made by the process
+llm_client = _build_llm_client(GEMINI_SETTINGS)
+
+
+def _client_metrics() -> Iterator[str]:
+    """Expose the shared client's counters at ``/metrics``."""
+    stats = llm_client.stats()
+    for name, documentation in (
+        ("retries", "Upstream calls retried after a transient error."),
+        ("rejected", "Upstream calls rejected by the open circuit breaker."),
+        ("throttled", "Upstream calls that waited for rate limit capacity."),
+    ):
+        yield f"# HELP promptforge_llm_{name}_total {documentation}"
+        yield f"# TYPE promptforge_llm_{name}_total counter"
+        yield f"promptforge_llm_{name}_total {stats[name]}"
+    yield "# HELP promptforge_llm_breaker_open Whether the circuit breaker rejects calls."
+    yield "# TYPE promptforge_llm_breaker_open gauge"
+    yield f"promptforge_llm_breaker_open {int(stats['breaker'] != CircuitBreaker.CLOSED)}"
+
+
+registry.register_collector(_client_metrics)
+
+
+def _generation_pool(workers: int) -> ThreadPoolExecutor:
+    """Create the pool running the independent generation stages."""
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gemini-generation")
+
+
+# Shared pool for the independent generation stages
+_generation_executor = _generation_pool(GENERATION_WORKERS)
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply GEMINI_SETTINGS from ``config``, the environment and defaults.
+
+    The upstream client is replaced, so its rate limits and breaker start
+    afresh.
+
+    Args:
+        config: Application config, if any
+
+    Raises:
+        ValueError: If GEMINI_GENERATION_MODE is not one of GENERATION_MODES
+    """
+    global STAGE_TIMEOUT_SECONDS, GENERATION_MODE, GENERATION_WORKERS
+    global llm_client, _generation_executor
+    settings = resolve_settings(GEMINI_SETTINGS, config)
+    if settings["GEMINI_GENERATION_MODE"] not in GENERATION_MODES:
+        raise ValueError(
+            f"Unknown GEMINI_GENERATION_MODE: {settings['GEMINI_GENERATION_MODE']}"
+        )
+    STAGE_TIMEOUT_SECONDS = settings["GEMINI_STAGE_TIMEOUT"]
+    GENERATION_MODE = settings["GEMINI_GENERATION_MODE"]
+    llm_client = _build_llm_client(settings)
+    if settings["GEMINI_GENERATION_WORKERS"] != GENERATION_WORKERS:
+        GENERATION_WORKERS = settings["GEMINI_GENERATION_WORKERS"]
+        _generation_executor.shutdown(wait=False)
+        _generation_executor = _generation_pool(GENERATION_WORKERS)
+
+
 def configure_gemini() -> None:
     """Configure the Gemini API with the API key from environment variables.
     
@@ -33,144 +227,688 @@ def configure_gemini() -> None:
     if api_key == "test-key-placeholder":
         logger.warning("Using test API key - chat functionality will not work without a valid key")
     
-    genai.configure(api_key=api_key)
+    # Applied to the SDK when it is first imported
+    _genai.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def supports_system_instruction() -> bool:
+    """Whether the SDK accepts a system instruction for a model (0.5 and later)."""
+    return "system_instruction" in inspect.signature(_genai().GenerativeModel).parameters
+
 
+@lru_cache(maxsize=1)
+def supports_context_caching() -> bool:
+    """Whether the SDK can create cached content (0.7 and later)."""
+    return (
+        importlib.util.find_spec("google.generativeai.caching") is not None
+        and hasattr(_genai().GenerativeModel, "from_cached_content")
+    )
 
-def get_chat_model(model_name: str = "gemini-1.5-flash") -> genai.GenerativeModel:
+
+@lru_cache(maxsize=None)
+def get_chat_model(
+    model_name: str = "gemini-2.5-flash", system_instruction: Optional[str] = None
+) -> "genai.GenerativeModel":
     """Get a configured Gemini generative model for chat.
     
+    Models are created once per name and instruction and shared by every
+    request.
+    
     Args:
-        model_name: The name of the model to use (default: gemini-1.5-flash)
+        model_name: The name of the model to use (default: gemini-2.5-flash,
+            which caches content from 1024 tokens; 1.5 models need 32768)
+        system_instruction: Instruction given to the model ahead of every
+            conversation; only pass it if :func:`supports_system_instruction`
         
     Returns:
         genai.GenerativeModel: Configured generative model
     """
-    return genai.GenerativeModel(model_name)
+    if system_instruction is None:
+        return _genai().GenerativeModel(model_name)
+    return _genai().GenerativeModel(model_name, system_instruction=system_instruction)
+
+
+def create_cached_content(model: "genai.GenerativeModel", text: str) -> tuple[Any, Any]:
+    """Upload ``text`` as cached content for ``model``.
+
+    Args:
+        model: The model the content is cached for
+        text: The content
+
+    Returns:
+        tuple[Any, Any]: The cached content and a model answering on top of it
+    """
+    genai = _genai()
+    from google.generativeai import caching
 
+    cache = llm_client.call(
+        caching.CachedContent.create,
+        model=model.model_name,
+        contents=[text],
+        ttl=timedelta(seconds=context_cache.CONTEXT_CACHE_TTL_SECONDS),
+        estimated_tokens=estimate_tokens(text),
+    )
+    return cache, genai.GenerativeModel.from_cached_content(cached_content=cache)
 
-def get_refinement_chat() -> genai.ChatSession:
+
+def get_refinement_chat(
+    history: Optional[list[dict]] = None, summary: Optional[str] = None
+) -> "genai.ChatSession":
     """Get a chat session configured for prompt refinement.
     
+    Args:
+        history: Optional stored conversation as a list of
+            ``{"role": "user" | "assistant", "content": str}`` messages.
+            Both roles are seeded into the chat so the model sees the full
+            context without any earlier turns being re-sent.
+        summary: Optional summary of earlier messages that are no longer
+            part of ``history``
+    
     Returns:
         genai.ChatSession: Chat session with refinement expert persona
     """
-    model = get_chat_model()
+    # SDKs without system instructions get the persona as a model turn
+    if supports_system_instruction():
+        model = get_chat_model(system_instruction=REFINEMENT_INSTRUCTION)
+        opening: list[str] = []
+    else:
+        model = get_chat_model()
+        opening = [REFINEMENT_INSTRUCTION]
+    if summary:
+        opening.append(f"Summary of the conversation so far:\n{summary}")
     
-    # System instruction for the hyper-critical prompt refinement expert
-    system_instruction = """You are a Prompt Refinement Expert for software project planning. Your role is to be extremely thorough and critical in helping users refine their project requirements.
-
-Your behavior:
-1. Ask clarifying questions about EVERY aspect of the project
-2. Point out ambiguities, missing information, and potential issues
-3. Suggest better ways to phrase requirements
-4. Push for specific technical details
-5. Question assumptions and vague statements
-6. Continue refining until the prompt is crystal clear and comprehensive
-
-Be professional but persistent. Do not accept vague or incomplete requirements. Your goal is to produce a prompt that any developer could use to build exactly what the user wants."""
+    seeded_history = [{"role": "model", "parts": opening}] if opening else []
+    for message in history or []:
+        seeded_history.append({
+            "role": "user" if message["role"] == "user" else "model",
+            "parts": [message["content"]]
+        })
     
-    chat = model.start_chat(history=[
-        {
-            "role": "model",
-            "parts": [system_instruction]
-        }
-    ])
+    chat = model.start_chat(history=seeded_history)
     
     return chat
 
 
-def generate_project_data(refined_prompt: str) -> dict:
-    """Generate project data from the refined prompt.
-    
+def generate_content(
+    model: "genai.GenerativeModel",
+    prompt: str,
+    stage: str = "generate",
+    cached_prefix: Optional[str] = None,
+    usage: Optional[TokenUsage] = None,
+    **kwargs: Any,
+) -> str:
+    """Run one generation request through the shared client.
+
     Args:
-        refined_prompt: The final refined prompt from the chat session
-        
+        model: The model to call
+        prompt: The prompt text
+        stage: Name of the call in the metrics
+        cached_prefix: Text of the cached content ``model`` answers on top
+            of, which the prompt follows
+        usage: Token usage to add the call to
+        **kwargs: Extra ``generate_content`` options, e.g. ``generation_config``
+
     Returns:
-        dict: Generated project data containing frameworks, checklist, and cursor rules
+        str: The stripped reply text
+
+    Raises:
+        UpstreamUnavailableError: If the model API is rate limited or unhealthy
     """
-    model = get_chat_model()
-    
-    # Generate frameworks and languages
-    frameworks_prompt = f"""Based on this project prompt, suggest the most appropriate coding frameworks and languages:
+    prefix_tokens = estimate_tokens(cached_prefix or "")
+    estimated_input = prefix_tokens + estimate_tokens(prompt)
+    with llm_span(stage) as span:
+        response = llm_client.call(
+            model.generate_content, prompt, estimated_tokens=estimated_input, **kwargs
+        )
+        text = response.text.strip()
+        input_tokens, output_tokens = usage_tokens(response)
+        span["input_tokens"] = input_tokens or estimated_input
+        span["cached_tokens"] = cached_input_tokens(response) or prefix_tokens
+        span["output_tokens"] = output_tokens or estimate_tokens(text)
+    llm_client.charge_tokens(text)
+    if usage is not None:
+        usage.add_call(span["input_tokens"], span["cached_tokens"])
+    return text
+
 
-{refined_prompt}
+def send_chat_message(
+    chat: "genai.ChatSession", message: str, context: str = "", stream: bool = False
+) -> Any:
+    """Send a chat message through the shared client.
+
+    Args:
+        chat: The chat session
+        message: The new user message
+        context: Text of the history the message is sent with, used to
+            estimate the tokens of the request
+        stream: Return the streaming response
+
+    Returns:
+        Any: The chat response; pass the text of a stream to
+        :func:`finish_chat_stream` once it has been read
+
+    Raises:
+        UpstreamUnavailableError: If the model API is rate limited or unhealthy
+    """
+    with llm_span("chat") as span:
+        response = llm_client.call(
+            chat.send_message,
+            message,
+            estimated_tokens=estimate_tokens(context + message),
+            stream=stream,
+        )
+        input_tokens, output_tokens = usage_tokens(response)
+        span["input_tokens"] = input_tokens or estimate_tokens(context + message)
+        if not stream:
+            span["output_tokens"] = output_tokens or estimate_tokens(response.text)
+    if not stream:
+        llm_client.charge_tokens(response.text)
+    return response
+
+
+def finish_chat_stream(reply: str) -> None:
+    """Account for the reply of a streamed chat message once it is complete."""
+    llm_client.charge_tokens(reply)
+    LLM_TOKENS.inc(estimate_tokens(reply), stage="chat", direction="output")
+
+
+def summarize_conversation(
+    previous_summary: Optional[str], messages: list[dict]
+) -> str:
+    """Condense older refinement messages into a rolling summary.
+
+    Args:
+        previous_summary: The summary the messages follow, if any
+        messages: Messages as ``{"role", "content"}`` dictionaries
+
+    Returns:
+        str: The updated summary
+
+    Raises:
+        UpstreamUnavailableError: If the model API is rate limited or unhealthy
+    """
+    transcript = "\n".join(
+        f"{'User' if message['role'] == 'user' else 'Assistant'}: {message['content']}"
+        for message in messages
+    )
+    prompt = f"""Summarize this part of a conversation refining the requirements of a software project.
+Keep every requirement, decision, constraint and open question; drop greetings, repetition and explanations. Use at most 250 words.
+
+Summary of the conversation before this part:
+{previous_summary or "None"}
+
+Conversation:
+{transcript}"""
+    return generate_content(get_chat_model(), prompt, stage="summary")
+
+
+def _project_prefix(
+    model: "genai.GenerativeModel",
+    refined_prompt: str,
+    uses: int = 1,
+    usage: Optional[TokenUsage] = None,
+) -> SharedPrefix:
+    """Wrap the refined prompt as the prefix shared by generation calls.
+
+    Args:
+        model: The model the calls go to
+        refined_prompt: The project's refined prompt
+        uses: Calls expected to share the prefix
+        usage: Token usage to add the calls to
+
+    Returns:
+        SharedPrefix: The prefix, cached upstream when that pays off
+    """
+    create_cache = partial(create_cached_content, model) if supports_context_caching() else None
+    return SharedPrefix(
+        f"Project prompt:\n\n{refined_prompt}", uses, create_cache, usage, model.model_name
+    )
+
+
+def _frameworks_prompt() -> str:
+    """Build the instruction asking for suggested frameworks and languages."""
+    return """Based on the project prompt above, suggest the most appropriate coding frameworks and languages.
 
 Format your response as a simple list, like:
 Frontend: React, TypeScript, Tailwind CSS
 Backend: Python, FastAPI, SQLAlchemy
 Database: PostgreSQL
 etc."""
-    
-    frameworks_response = model.generate_content(frameworks_prompt)
-    frameworks_languages = frameworks_response.text.strip()
-    
-    # Generate checklist steps
-    checklist_prompt = f"""Create a detailed, granular development checklist for this project:
 
-{refined_prompt}
+
+def _checklist_prompt() -> str:
+    """Build the instruction asking for the development checklist."""
+    return """Create a detailed, granular development checklist for the project above.
 
 Format as numbered steps, each step should be specific and actionable. Include at least 10-15 steps covering:
 - Project setup
 - Core functionality implementation
 - Testing
 - Deployment preparation"""
+
+
+def _cached_stage(
+    stage: str,
+    model: "genai.GenerativeModel",
+    prompt: str,
+    generate: Callable[[str], str],
+    bypass_cache: bool = False,
+) -> str:
+    """Run a generation stage through the response cache, recording metrics."""
+    with stage_span(stage) as span:
+        misses = []
+
+        def tracked(text: str) -> str:
+            misses.append(text)
+            return generate(text)
+
+        result = cached_generate(model.model_name, prompt, tracked, bypass=bypass_cache)
+        span["cache_hit"] = not misses
+        return result
+
+
+def _generate_prefixed(
+    model: "genai.GenerativeModel",
+    prefix: SharedPrefix,
+    instruction: str,
+    stage: str,
+    **kwargs: Any,
+) -> str:
+    """Send a stage instruction after the shared prefix.
+
+    Only the instruction is sent when the prefix is cached upstream. The
+    whole prompt is sent otherwise, or when the cached content has gone
+    (e.g. expired), so the stage does not fail because of the cache.
+    """
+    cached_model = prefix.cached_model()
+    if cached_model is not None:
+        try:
+            return generate_content(
+                cached_model,
+                instruction,
+                stage=stage,
+                cached_prefix=prefix.text,
+                usage=prefix.usage,
+                **kwargs,
+            )
+        except UpstreamUnavailableError:
+            raise
+        except Exception as e:
+            logger.warning(f"Cached prompt prefix failed in '{stage}', sending whole prompts: {e}")
+            prefix.discard()
+    return generate_content(
+        model, prefix.prompt(instruction), stage=stage, usage=prefix.usage, **kwargs
+    )
+
+
+def _generate_cursor_rules(
+    model: "genai.GenerativeModel",
+    prefix: SharedPrefix,
+    frameworks_languages: str,
+    bypass_cache: bool = False,
+) -> str:
+    """Ask for the rules template fields as JSON and render the file locally.
+
+    Only replies that parse as a JSON object are cached, so a malformed
+    reply fails the stage instead of being served again.
+
+    Raises:
+        ValueError: If the reply, fresh or cached, is not a JSON object
+    """
+    instruction = rules_fields_prompt(frameworks_languages)
+
+    def generate(text: str) -> str:
+        reply = _generate_prefixed(model, prefix, instruction, "cursor_rules_content")
+        if parse_json_object(reply) is None:
+            raise ValueError("Model did not return the rules fields as JSON")
+        return reply
+
+    reply = _cached_stage(
+        "cursor_rules_content", model, prefix.prompt(instruction), generate, bypass_cache
+    )
+    fields = parse_json_object(reply)
+    if fields is None:
+        # Rendering empty fields would save a rules file of placeholders
+        raise ValueError("Cached rules fields are not JSON")
+    return render_cursor_rules(fields)
+
+
+def _generate_text(
+    model: "genai.GenerativeModel",
+    prefix: SharedPrefix,
+    instruction: str,
+    bypass_cache: bool = False,
+    stage: str = "generate",
+) -> str:
+    """Run a single generation request through the response cache."""
+    return _cached_stage(
+        stage,
+        model,
+        prefix.prompt(instruction),
+        lambda text: _generate_prefixed(model, prefix, instruction, stage),
+        bypass_cache,
+    )
+
+
+def _json_generation_config() -> Optional[dict]:
+    """Return a generation config enabling JSON mode, if the SDK supports it.
+
+    Older ``google-generativeai`` releases have no ``response_mime_type``; the
+    prompt alone then asks for JSON and the reply is validated either way.
+    """
+    parameters = inspect.signature(_genai().types.GenerationConfig).parameters
+    if "response_mime_type" in parameters:
+        return {"response_mime_type": "application/json"}
+    return None
+
+
+def _project_data_prompt() -> str:
+    """Build the instruction asking for every artifact in one JSON document."""
+    rules_keys = ", ".join(f'"{key}"' for key in RULES_FIELDS.values())
+    return f"""Plan the software project above.
+
+Reply with only a JSON object with these string keys:
+"frameworks_languages": the most appropriate frameworks and languages as a simple list, one line per layer, like "Backend: Python, FastAPI, SQLAlchemy".
+"checklist_steps": a detailed development checklist of at least 10-15 specific, actionable numbered steps covering project setup, core functionality, testing and deployment preparation, one step per line.
+{rules_keys}: the fields of the project's .cursor/rules file, each a single short line (at most 20 words)."""
+
+
+def _text_field(value: object, numbered: bool = False) -> Optional[str]:
+    """Validate a generated text artifact, joining list answers into lines.
+
+    Args:
+        value: The value read from the JSON document
+        numbered: Number the lines when the value is a list
+
+    Returns:
+        Optional[str]: The artifact text, or None if the value is unusable
+    """
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        items = [item.strip() for item in value if item.strip()]
+        if numbered:
+            items = [f"{index}. {item}" for index, item in enumerate(items, start=1)]
+        value = "\n".join(items)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    return value.strip()
+
+
+def _validate_project_data(document: dict) -> dict:
+    """Turn a single-call JSON document into the project data dict.
+
+    Returns:
+        dict: The three artifacts; an artifact that fails validation is None
+    """
+    rules_fields = {key: document.get(key) for key in RULES_FIELDS.values()}
+    rules_valid = all(
+        isinstance(value, (str, list)) for value in rules_fields.values()
+    )
+    return {
+        "frameworks_languages": _text_field(document.get("frameworks_languages")),
+        "checklist_steps": _text_field(document.get("checklist_steps"), numbered=True),
+        "cursor_rules_content": render_cursor_rules(rules_fields) if rules_valid else None,
+    }
+
+
+def _generate_single(
+    model: "genai.GenerativeModel",
+    prefix: SharedPrefix,
+    timeout: float,
+    bypass_cache: bool,
+) -> dict:
+    """Generate every artifact with one call, repairing invalid fields.
+
+    Fields missing from or invalid in the JSON document are regenerated
+    with their dedicated stage prompts, so a partly usable reply costs one
+    extra call per bad field rather than a full staged run.
+    """
+    generation_config = _json_generation_config()
+
+    def generate(text: str) -> str:
+        reply = _generate_prefixed(
+            model,
+            prefix,
+            _project_data_prompt(),
+            "project_data",
+            generation_config=generation_config,
+        )
+        if parse_json_object(reply) is None:
+            raise ValueError("Model did not return the project data as JSON")
+        return reply
+
+    single_future = _generation_executor.submit(
+        _cached_stage,
+        "project_data",
+        model,
+        prefix.prompt(_project_data_prompt()),
+        generate,
+        bypass_cache,
+    )
+    failures: dict[str, str] = {}
+    reply = _stage_result(
+        "project_data", single_future, time.monotonic() + timeout, failures
+    )
+    data = _validate_project_data(parse_json_object(reply or "") or {})
+
+    # Repair the invalid fields with their own stages; the rules stage
+    # waits for a repaired tech stack like it does in staged mode
+    started = time.monotonic()
+    repairs: dict[str, tuple[Future, float]] = {}
+    for stage, prompt in (
+        ("frameworks_languages", _frameworks_prompt),
+        ("checklist_steps", _checklist_prompt),
+    ):
+        if data[stage] is None:
+            repairs[stage] = (
+                _generation_executor.submit(
+                    _generate_text, model, prefix, prompt(), bypass_cache, stage
+                ),
+                started,
+            )
+    if "frameworks_languages" in repairs:
+        future, _ = repairs.pop("frameworks_languages")
+        data["frameworks_languages"] = _stage_result(
+            "frameworks_languages", future, started + timeout, failures
+        )
+    if data["cursor_rules_content"] is None:
+        repairs["cursor_rules_content"] = (
+            _generation_executor.submit(
+                _generate_cursor_rules,
+                model,
+                prefix,
+                data["frameworks_languages"] or "Not specified",
+                bypass_cache,
+            ),
+            time.monotonic(),
+        )
+    for stage, (future, stage_started) in repairs.items():
+        data[stage] = _stage_result(stage, future, stage_started + timeout, failures)
+
+    if all(value is None for value in data.values()):
+        raise GenerationError(
+            "; ".join(f"{stage}: {error}" for stage, error in failures.items())
+        )
+    return data
+
+
+def _stage_result(
+    stage: str, future: Future, deadline: float, failures: dict[str, str]
+) -> Optional[str]:
+    """Wait for a generation stage until its deadline.
+
+    Args:
+        stage: Name of the generated field, used for reporting
+        future: The running stage
+        deadline: ``time.monotonic()`` value after which the stage is abandoned
+        failures: Mapping of failed stages to their error, updated in place
+
+    Returns:
+        Optional[str]: The generated text, or None if the stage failed
+    """
+    try:
+        return future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except FutureTimeoutError:
+        future.cancel()
+        failures[stage] = "timed out"
+    except Exception as e:
+        failures[stage] = str(e)
+    logger.warning(f"Generation stage '{stage}' failed: {failures[stage]}")
+    return None
+
+
+def generate_project_data(
+    refined_prompt: str,
+    stage_timeout: Optional[float] = None,
+    bypass_cache: bool = False,
+    mode: Optional[str] = None,
+    usage: Optional[TokenUsage] = None,
+) -> dict:
+    """Generate project data from the refined prompt.
     
-    checklist_response = model.generate_content(checklist_prompt)
-    checklist_steps = checklist_response.text.strip()
-    
-    # Generate cursor rules content
-    cursor_rules_prompt = f"""Generate content for a .cursor/rules file for this project. Use this exact template and fill in the sections based on the project requirements:
-
-Project: {refined_prompt}
-Tech Stack: {frameworks_languages}
-
-TEMPLATE TO FILL:
-// --- PROJECT CONTEXT AND OBJECTIVES ---
-// PROJECT NAME: [Extract from prompt]
-// PROJECT TYPE: [Identify type]
-// PRIMARY GOAL: [Main objective]
-// KEY OUTCOME: [Expected result]
-// TARGET AUDIENCE/USERS: [Who will use this]
-// DEPLOYMENT ENVIRONMENT: [Where it will run]
-// NON-FUNCTIONAL REQUIREMENTS: [Performance, security, etc.]
-
-// --- ARCHITECTURAL AND DESIGN GUIDELINES ---
-// ARCHITECTURAL PATTERN: [Suggested pattern]
-// DESIGN PRINCIPLES: [Key principles]
-// DATA FLOW: [How data moves]
-// ERROR HANDLING: [Error strategy]
-// SECURITY: [Security considerations]
-// SCALABILITY: [Scalability approach]
-
-// --- TECHNOLOGY STACK AND CODING STANDARDS ---
-// PRIMARY LANGUAGE: [Main language]
-// FRAMEWORK(S): [List frameworks]
-// DATABASE(S): [Database choice]
-// PACKAGE MANAGER: [Package manager]
-// CODING STYLE: [Style guide]
-// NAMING CONVENTIONS: [Naming rules]
-// TYPE HINTING: [Type hint requirements]
-// COMMENTING/DOCSTRINGS: [Documentation standards]
-
-// --- DEVELOPMENT LIFECYCLE AND QA ---
-// TEST-DRIVEN DEVELOPMENT (TDD): [TDD approach]
-// UNIT TESTING: [Testing framework]
-// AUTOMATION: [What to automate]
-// VERSION CONTROL: [Git practices]
-// CODE REVIEW: [Review process]
-
-// --- AI INTERACTION GUIDELINES ---
-// CONTEXTUAL AWARENESS: [AI context rules]
-// ITERATIVE REFINEMENT: [How AI should help]
-// CLARIFICATION: [When to ask questions]
-// PROMPT CRITIQUE: [AI feedback approach]
-// ERROR HANDLING: [AI error assistance]"""
-    
-    cursor_rules_response = model.generate_content(cursor_rules_prompt)
-    cursor_rules_content = cursor_rules_response.text.strip()
+    In "staged" mode the frameworks and checklist stages run concurrently,
+    and the cursor rules stage starts as soon as the frameworks text is
+    ready, so the wall time is that of the longest dependency chain rather
+    than the sum of all three calls. In "single" mode every artifact is
+    requested in one JSON document and only the fields that fail validation
+    are regenerated with their own stage. The cursor rules are rendered
+    locally from the rules template, so the model only returns the
+    project-specific fields. A stage that fails or times out leaves its
+    field as None while the other artifacts are still returned.
+    
+    Every stage starts with the refined prompt; in "staged" mode a long one
+    is uploaded once as cached content and each stage only sends its own
+    instruction.
+    
+    Args:
+        refined_prompt: The final refined prompt from the chat session
+        stage_timeout: Seconds each stage may take (default: STAGE_TIMEOUT_SECONDS)
+        bypass_cache: Ignore cached responses and call the model for every stage
+        mode: One of GENERATION_MODES (default: GENERATION_MODE)
+        usage: Token usage to add the generation's calls to
+        
+    Returns:
+        dict: Generated project data containing frameworks, checklist, and cursor rules
+        
+    Raises:
+        ValueError: If the generation mode is unknown
+        GenerationError: If every stage failed
+    """
+    mode = mode or GENERATION_MODE
+    if mode not in GENERATION_MODES:
+        raise ValueError(f"Unknown generation mode: {mode}")
+    
+    model = get_chat_model()
+    timeout = STAGE_TIMEOUT_SECONDS if stage_timeout is None else stage_timeout
+    # The single call only shares its prefix with repairs, which are rare
+    uses = 1 if mode == "single" else 3
+    with _project_prefix(model, refined_prompt, uses, usage) as prefix:
+        if mode == "single":
+            data = _generate_single(model, prefix, timeout, bypass_cache)
+        else:
+            data = _generate_staged(model, prefix, timeout, bypass_cache)
+    
+    if prefix.usage.calls:
+        logger.info(
+            "Generation input tokens: {input_tokens} sent, {cached_tokens} cached, "
+            "{billed_input_tokens} billed, {saved_tokens} saved".format(**prefix.usage.report())
+        )
+    return data
+
+
+def _generate_staged(
+    model: "genai.GenerativeModel",
+    prefix: SharedPrefix,
+    timeout: float,
+    bypass_cache: bool,
+) -> dict:
+    """Generate each artifact with its own call, concurrently where possible."""
+    failures: dict[str, str] = {}
+    started = time.monotonic()
+    
+    # Frameworks and checklist only depend on the refined prompt
+    frameworks_future = _generation_executor.submit(
+        _generate_text,
+        model,
+        prefix,
+        _frameworks_prompt(),
+        bypass_cache,
+        "frameworks_languages",
+    )
+    checklist_future = _generation_executor.submit(
+        _generate_text,
+        model,
+        prefix,
+        _checklist_prompt(),
+        bypass_cache,
+        "checklist_steps",
+    )
+    
+    # Cursor rules need the tech stack, so start them once it is known
+    frameworks_languages = _stage_result(
+        "frameworks_languages", frameworks_future, started + timeout, failures
+    )
+    rules_started = time.monotonic()
+    cursor_rules_future = _generation_executor.submit(
+        _generate_cursor_rules,
+        model,
+        prefix,
+        frameworks_languages or "Not specified",
+        bypass_cache,
+    )
+    
+    checklist_steps = _stage_result(
+        "checklist_steps", checklist_future, started + timeout, failures
+    )
+    cursor_rules_content = _stage_result(
+        "cursor_rules_content", cursor_rules_future, rules_started + timeout, failures
+    )
+    
+    if len(failures) == 3:
+        raise GenerationError(
+            "; ".join(f"{stage}: {error}" for stage, error in failures.items())
+        )
     
     return {
         "frameworks_languages": frameworks_languages,
         "checklist_steps": checklist_steps,
         "cursor_rules_content": cursor_rules_content
-    } 
\ No newline at end of file
+    }
+
+
+def regenerate_artifact(
+    artifact: str,
+    refined_prompt: str,
+    frameworks_languages: Optional[str] = None,
+    bypass_cache: bool = False,
+) -> str:
+    """Generate a single project artifact with one model call.
+
+    Args:
+        artifact: One of "frameworks_languages", "checklist_steps" or
+            "cursor_rules_content"
+        refined_prompt: The project's refined prompt
+        frameworks_languages: The tech stack the cursor rules are based on
+        bypass_cache: Ignore a cached response and ask for a fresh one
+
+    Returns:
+        str: The generated artifact
+
+    Raises:
+        ValueError: If the artifact is unknown
+    """
+    model = get_chat_model()
+    prompts = {
+        "frameworks_languages": _frameworks_prompt,
+        "checklist_steps": _checklist_prompt,
+    }
+    if artifact != "cursor_rules_content" and artifact not in prompts:
+        raise ValueError(f"Unknown artifact: {artifact}")
+
+    # A single call, so the prefix is sent whole rather than cached
+    with _project_prefix(model, refined_prompt) as prefix:
+        if artifact == "cursor_rules_content":
+            return _generate_cursor_rules(
+                model, prefix, frameworks_languages or "Not specified", bypass_cache
+            )
+        return _generate_text(model, prefix, prompts[artifact](), bypass_cache, artifact)
@@ -0,0 +1,357 @@
+"""Background job queue for project generation.
+
+Jobs are rows in the ``generation_jobs`` table, so the queue needs nothing
+but the application database. They are executed either by a thread pool in
+the web process (``JOB_WORKER=thread``, the default) or by a separate worker
+process started with ``flask worker`` (``JOB_WORKER=external``).
+
+In thread mode, each web process sweeps the queue in the background from
+its first request on: jobs left pending or running by a previous process
+are picked up after a restart, and jobs whose thread died are requeued
+once stale.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Mapping, Optional
+
+from flask import Flask
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.database import SessionLocal, release_connection
+from src.gemini_config import generate_project_data
+from src.models import Conversation, GenerationJob, Project
+from src.settings import resolve_settings
+from src.similarity import index_project
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# Worker settings and their defaults, applied by configure()
+JOB_SETTINGS = {
+    "JOB_WORKER": "thread",
+    "JOB_WORKER_THREADS": 2,
+    "JOB_STALE_SECONDS": 900,
+    "JOB_SWEEP_SECONDS": 60.0,
+}
+JOB_WORKER = JOB_SETTINGS["JOB_WORKER"]
+JOB_WORKER_THREADS = JOB_SETTINGS["JOB_WORKER_THREADS"]
+JOB_STALE_SECONDS = JOB_SETTINGS["JOB_STALE_SECONDS"]
+JOB_SWEEP_SECONDS = JOB_SETTINGS["JOB_SWEEP_SECONDS"]
+
+
+def _job_pool(threads: int) -> ThreadPoolExecutor:
+    """Create the in-process pool running jobs in thread mode."""
+    return ThreadPoolExecutor(max_workers=threads, thread_name_prefix="generation-job")
+
+
+# In-process pool used when JOB_WORKER is "thread"
+_inline_executor = _job_pool(JOB_WORKER_THREADS)
+
+# Jobs submitted to the in-process pool and not claimed yet
+_submitted: set[int] = set()
+_submitted_lock = threading.Lock()
+
+# Process running the queue sweeper; a forked child starts its own
+_sweeper_pid: Optional[int] = None
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply JOB_SETTINGS from ``config``, the environment and their defaults.
+
+    Args:
+        config: Application config, if any
+    """
+    global JOB_WORKER, JOB_WORKER_THREADS, JOB_STALE_SECONDS, JOB_SWEEP_SECONDS
+    global _inline_executor
+    settings = resolve_settings(JOB_SETTINGS, config)
+    JOB_WORKER = settings["JOB_WORKER"]
+    JOB_STALE_SECONDS = settings["JOB_STALE_SECONDS"]
+    JOB_SWEEP_SECONDS = settings["JOB_SWEEP_SECONDS"]
+    if settings["JOB_WORKER_THREADS"] != JOB_WORKER_THREADS:
+        JOB_WORKER_THREADS = settings["JOB_WORKER_THREADS"]
+        _inline_executor.shutdown(wait=False)
+        _inline_executor = _job_pool(JOB_WORKER_THREADS)
+
+
+def enqueue_generation(
+    db: Session, conversation: Conversation, refined_prompt: str
+) -> GenerationJob:
+    """Queue the generation of a project from an approved conversation.
+
+    An unfinished job for the same conversation is returned instead of
+    queueing a duplicate.
+
+    Args:
+        db: Database session
+        conversation: The approved conversation
+        refined_prompt: The compiled refined prompt
+
+    Returns:
+        GenerationJob: The queued (or already queued) job
+    """
+    existing = db.scalar(
+        select(GenerationJob).where(
+            GenerationJob.conversation_id == conversation.id,
+            GenerationJob.status.in_([PENDING, RUNNING])
+        )
+    )
+    if existing:
+        return existing
+
+    job = GenerationJob(
+        project_name=conversation.project_name,
+        project_description=conversation.project_description,
+        refined_prompt=refined_prompt,
+        conversation_id=conversation.id
+    )
+    db.add(job)
+    db.commit()
+
+    if JOB_WORKER == "thread":
+        _submit(job.id)
+    return job
+
+
+def _submit(job_id: int) -> None:
+    """Hand a pending job to the in-process pool unless it is already queued."""
+    with _submitted_lock:
+        if job_id in _submitted:
+            return
+        _submitted.add(job_id)
+    _inline_executor.submit(_claim_and_run, job_id)
+
+
+def claim_job(db: Session, job_id: Optional[int] = None) -> Optional[int]:
+    """Atomically mark a pending job as running.
+
+    Args:
+        db: Database session
+        job_id: A specific job to claim, or None for the oldest pending job
+
+    Returns:
+        Optional[int]: Id of the claimed job, or None if nothing was claimed
+    """
+    while True:
+        candidate = job_id
+        if candidate is None:
+            candidate = db.scalar(
+                select(GenerationJob.id)
+                .where(GenerationJob.status == PENDING)
+                .order_by(GenerationJob.id)
+                .limit(1)
+            )
+            if candidate is None:
+                return None
+
+        claimed = db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == candidate, GenerationJob.status == PENDING)
+            .values(status=RUNNING, started_at=datetime.utcnow())
+        ).rowcount
+        db.commit()
+
+        if claimed:
+            return candidate
+        if job_id is not None:
+            # Another worker got the requested job first
+            return None
+
+
+def run_job(job_id: int) -> None:
+    """Generate the project of a claimed job and record the outcome.
+
+    Args:
+        job_id: Id of a job in the running state
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(GenerationJob, job_id)
+        release_connection(db)
+        try:
+            project_data = generate_project_data(job.refined_prompt)
+
+            project = Project(
+                name=job.project_name,
+                description=job.project_description,
+                refined_prompt=job.refined_prompt,
+                frameworks_languages=project_data["frameworks_languages"],
+                checklist_steps=project_data["checklist_steps"],
+                cursor_rules_content=project_data["cursor_rules_content"]
+            )
+            db.add(project)
+            db.flush()
+            index_project(db, project)
+
+            # The conversation is no longer needed once the project exists
+            if job.conversation_id is not None:
+                conversation = db.get(Conversation, job.conversation_id)
+                if conversation:
+                    db.delete(conversation)
+
+            job.project_id = project.id
+            job.status = SUCCEEDED
+        except IntegrityError:
+            db.rollback()
+            job.status = FAILED
+            job.error = f"Project '{job.project_name}' already exists."
+        except Exception as e:
+            db.rollback()
+            job.status = FAILED
+            job.error = f"Error generating project data: {str(e)}"
+            logger.exception(f"Generation job {job_id} failed")
+
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    finally:
+        db.close()
+
+
+def _claim_and_run(job_id: int) -> None:
+    """Run a specific job if no other worker has claimed it."""
+    with _submitted_lock:
+        _submitted.discard(job_id)
+    db = SessionLocal()
+    try:
+        claimed = claim_job(db, job_id)
+    finally:
+        db.close()
+    if claimed is not None:
+        run_job(claimed)
+
+
+def requeue_stale_jobs(db: Session) -> int:
+    """Return jobs left running by a crashed worker to the queue.
+
+    Args:
+        db: Database session
+
+    Returns:
+        int: Number of jobs requeued
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    requeued = db.execute(
+        update(GenerationJob)
+        .where(GenerationJob.status == RUNNING, GenerationJob.started_at < cutoff)
+        .values(status=PENDING, started_at=None)
+    ).rowcount
+    db.commit()
+    return requeued
+
+
+def resume_jobs(db: Session) -> int:
+    """Requeue stale jobs and submit every pending job to the in-process pool.
+
+    Args:
+        db: Database session
+
+    Returns:
+        int: Number of pending jobs submitted
+    """
+    requeued = requeue_stale_jobs(db)
+    if requeued:
+        logger.warning(f"Requeued {requeued} stale generation job(s)")
+
+    pending = db.scalars(
+        select(GenerationJob.id)
+        .where(GenerationJob.status == PENDING)
+        .order_by(GenerationJob.id)
+    ).all()
+    for job_id in pending:
+        _submit(job_id)
+    return len(pending)
+
+
+def _sweep_queue() -> None:
+    """Resume jobs now and every JOB_SWEEP_SECONDS, for the life of the process."""
+    while True:
+        db = SessionLocal()
+        try:
+            resume_jobs(db)
+        except Exception:
+            logger.exception("Could not resume generation jobs")
+        finally:
+            db.close()
+        time.sleep(JOB_SWEEP_SECONDS)
+
+
+def start_queue_sweeper() -> None:
+    """Start the queue sweeper of the current process, once."""
+    global _sweeper_pid
+    with _submitted_lock:
+        if _sweeper_pid == os.getpid():
+            return
+        _sweeper_pid = os.getpid()
+    threading.Thread(
+        target=_sweep_queue, name="generation-job-sweeper", daemon=True
+    ).start()
+
+
+def init_app(app: Flask) -> None:
+    """Run the job queue in the web processes when JOB_WORKER is "thread".
+
+    The sweeper starts with the first request rather than here, because a
+    preloaded app is created in the gunicorn master, whose threads do not
+    survive the fork into the workers.
+
+    Args:
+        app: Flask application instance
+    """
+    if JOB_WORKER == "thread":
+        app.before_request(start_queue_sweeper)
+
+
+def run_worker(
+    concurrency: int = 2,
+    poll_interval: float = 1.0,
+    stop_event: Optional[threading.Event] = None,
+) -> None:
+    """Process queued jobs until ``stop_event`` is set.
+
+    Args:
+        concurrency: Number of jobs to run at the same time
+        poll_interval: Seconds to wait before polling an empty queue again
+        stop_event: Event that ends the loop when set (runs forever if None)
+    """
+    stop_event = stop_event or threading.Event()
+    slots = threading.Semaphore(concurrency)
+
+    db = SessionLocal()
+    try:
+        requeued = requeue_stale_jobs(db)
+    finally:
+        db.close()
+    if requeued:
+        logger.warning(f"Requeued {requeued} stale generation job(s)")
+
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="generation-worker"
+    ) as pool:
+        while not stop_event.is_set():
+            if not slots.acquire(timeout=poll_interval):
+                continue
+
+            db = SessionLocal()
+            try:
+                job_id = claim_job(db)
+            finally:
+                db.close()
+
+            if job_id is None:
+                slots.release()
+                stop_event.wait(poll_interval)
+                continue
+
+            future = pool.submit(run_job, job_id)
+            future.add_done_callback(lambda _: slots.release())
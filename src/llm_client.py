@@ -0,0 +1,309 @@
+"""Rate limiting, retries and circuit breaking for upstream model calls.
+
+:class:`LLMClient` wraps every call to the model API. Before a call it
+waits for room in two token buckets, one for requests and one for tokens per
+minute; transient errors are retried with jittered exponential backoff; and
+after repeated failures a circuit breaker rejects calls immediately until
+the upstream has had time to recover. Nothing here depends on the Gemini
+SDK, so the client can be exercised with any callable.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+class UpstreamUnavailableError(Exception):
+    """Raised when the model API is rate limited or unhealthy.
+
+    The message is meant to be shown to users as is.
+    """
+
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in ``text`` without calling the API.
+
+    Args:
+        text: Any prompt or reply text
+
+    Returns:
+        int: Approximate token count
+    """
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously over time.
+
+    Attributes:
+        capacity: Maximum number of tokens the bucket holds
+        refill_per_second: Tokens added per second
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update (lock held)."""
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.refill_per_second
+        )
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Take ``amount`` tokens, waiting for them to accrue if needed.
+
+        Requests larger than the capacity wait for a full bucket instead of
+        waiting forever.
+
+        Args:
+            amount: Number of tokens to take
+            timeout: Longest time to wait in seconds (None waits indefinitely)
+
+        Returns:
+            bool: True if the tokens were taken, False on timeout
+        """
+        amount = min(amount, self.capacity)
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return True
+                wait = (amount - self._tokens) / self.refill_per_second
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self._sleep(wait)
+
+    def charge(self, amount: float) -> None:
+        """Take ``amount`` tokens without waiting, possibly going into debt.
+
+        Used to account for usage only known after a call, such as the
+        number of tokens in a reply.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+
+
+class CircuitBreaker:
+    """Fail fast after repeated upstream failures.
+
+    The breaker opens after ``failure_threshold`` consecutive failures and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single trial
+    call through (half-open); success closes it again, failure reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a call may be attempted now."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_running = False
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful call."""
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        """Count a failed call, opening the breaker at the threshold."""
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Model API circuit breaker opened")
+                self.state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class LLMClient:
+    """Shared gate for upstream model calls.
+
+    Args:
+        requests_per_minute: Request rate limit (0 disables it)
+        tokens_per_minute: Token rate limit (0 disables it)
+        max_retries: Retries of a call after a transient error
+        backoff_base: First backoff ceiling in seconds, doubled per retry
+        backoff_max: Largest backoff ceiling in seconds
+        rate_limit_wait: Longest time a call waits for rate limit capacity
+        transient_errors: Exception types worth retrying, or a callable
+            returning them on first use so SDK exception modules can be
+            imported lazily
+        breaker: Circuit breaker shared by every call
+        sleep: Sleep function, replaceable in tests
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        tokens_per_minute: int = 1_000_000,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        rate_limit_wait: float = 30.0,
+        transient_errors: Union[
+            tuple[type[BaseException], ...], Callable[[], tuple[type[BaseException], ...]]
+        ] = (ConnectionError, TimeoutError),
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.request_bucket = (
+            TokenBucket(requests_per_minute, requests_per_minute / 60, sleep=sleep)
+            if requests_per_minute else None
+        )
+        self.token_bucket = (
+            TokenBucket(tokens_per_minute, tokens_per_minute / 60, sleep=sleep)
+            if tokens_per_minute else None
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_limit_wait = rate_limit_wait
+        self._transient_errors = transient_errors
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        self._stats = {"calls": 0, "retries": 0, "rejected": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def transient_errors(self) -> tuple[type[BaseException], ...]:
+        """Exception types worth retrying."""
+        if callable(self._transient_errors):
+            self._transient_errors = self._transient_errors()
+        return self._transient_errors
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def stats(self) -> dict:
+        """Return call, retry, rejection and throttling counts."""
+        with self._stats_lock:
+            return {**self._stats, "breaker": self.breaker.state}
+
+    def _wait_for_capacity(self, estimated_tokens: int) -> None:
+        """Block until both rate limits allow another call."""
+        for bucket, amount in (
+            (self.request_bucket, 1),
+            (self.token_bucket, estimated_tokens),
+        ):
+            if bucket is None or not amount:
+                continue
+            if not bucket.acquire(amount, timeout=0):
+                self._count("throttled")
+                if not bucket.acquire(amount, timeout=self.rate_limit_wait):
+                    raise UpstreamUnavailableError(
+                        "The model API rate limit has been reached. Please try again shortly."
+                    )
+
+    def backoff(self, attempt: int) -> float:
+        """Return a full-jitter delay for retry number ``attempt`` (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def call(
+        self, fn: Callable[..., Any], *args: Any, estimated_tokens: int = 0, **kwargs: Any
+    ) -> Any:
+        """Call ``fn`` under the rate limits, retries and circuit breaker.
+
+        Args:
+            fn: The upstream call, e.g. ``model.generate_content``
+            *args: Positional arguments for ``fn``
+            estimated_tokens: Tokens the call is expected to consume
+            **kwargs: Keyword arguments for ``fn``
+
+        Returns:
+            Any: Whatever ``fn`` returns
+
+        Raises:
+            UpstreamUnavailableError: If the breaker is open, the rate limit
+                wait timed out or every retry failed with a transient error
+        """
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise UpstreamUnavailableError(
+                    "The model API is temporarily unavailable. Please try again in a minute."
+                )
+            self._wait_for_capacity(estimated_tokens)
+            self._count("calls")
+            try:
+                result = fn(*args, **kwargs)
+            except self.transient_errors as e:
+                self.breaker.record_failure()
+                if attempt == self.max_retries:
+                    raise UpstreamUnavailableError(
+                        "The model API is busy. Please try again shortly."
+                    ) from e
+                self._count("retries")
+                delay = self.backoff(attempt)
+                logger.info(f"Transient model API error ({e}); retrying in {delay:.2f}s")
+                self._sleep(delay)
+            except Exception:
+                # The upstream answered, so it counts as healthy
+                self.breaker.record_success()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def charge_tokens(self, text: str) -> None:
+        """Account for the tokens of a reply against the token rate limit."""
+        if self.token_bucket is not None:
+            self.token_bucket.charge(estimate_tokens(text))
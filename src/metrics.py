@@ -0,0 +1,485 @@
+"""Request, model call and database instrumentation.
+
+Metrics are kept in process memory and exposed in the Prometheus text format
+at ``/metrics``. Under a multi-process server each worker reports its own
+numbers, so scrape the workers individually or sum them in Prometheus.
+The endpoint is only served with ``METRICS_ENABLED`` set, and only to the
+addresses in ``METRICS_ALLOWED_IPS`` (loopback by default), since query and
+model call telemetry should not be public.
+
+Instrumented:
+    - every request (duration by endpoint, method and status), with a
+      sampled log of slow requests
+    - every upstream model call and generation stage (latency, tokens and
+      response cache hits)
+    - every SQL statement (count and duration), via SQLAlchemy events
+    - template rendering, via Flask's template signals
+"""
+
+import bisect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+from typing import Any, Callable, Iterator, Mapping, Optional, Union
+
+from flask import (
+    Flask,
+    abort,
+    Response,
+    before_render_template,
+    g,
+    has_app_context,
+    request,
+    template_rendered,
+)
+from jinja2 import Template
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExecutionContext
+
+from src.settings import resolve_settings
+
+logger = logging.getLogger(__name__)
+slow_request_logger = logging.getLogger("promptforge.slow_requests")
+
+# Requests slower than SLOW_REQUEST_SECONDS are candidates for the slow log,
+# and a SLOW_REQUEST_SAMPLE_RATE share of them is actually logged.
+# /metrics is served when METRICS_ENABLED, to the comma-separated addresses
+# or networks of METRICS_ALLOWED_IPS. Applied by configure().
+METRICS_SETTINGS = {
+    "SLOW_REQUEST_SECONDS": 1.0,
+    "SLOW_REQUEST_SAMPLE_RATE": 1.0,
+    "METRICS_ENABLED": True,
+    "METRICS_ALLOWED_IPS": "127.0.0.1,::1",
+}
+SLOW_REQUEST_SECONDS = METRICS_SETTINGS["SLOW_REQUEST_SECONDS"]
+SLOW_REQUEST_SAMPLE_RATE = METRICS_SETTINGS["SLOW_REQUEST_SAMPLE_RATE"]
+METRICS_ENABLED = METRICS_SETTINGS["METRICS_ENABLED"]
+
+
+def _networks(addresses: str) -> list[Union[IPv4Network, IPv6Network]]:
+    """Parse a comma-separated list of addresses and networks."""
+    return [
+        ip_network(address.strip(), strict=False)
+        for address in addresses.split(",")
+        if address.strip()
+    ]
+
+
+METRICS_ALLOWED_NETWORKS = _networks(METRICS_SETTINGS["METRICS_ALLOWED_IPS"])
+
+# Histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply METRICS_SETTINGS from ``config``, the environment and defaults.
+
+    Args:
+        config: Application config, if any
+    """
+    global SLOW_REQUEST_SECONDS, SLOW_REQUEST_SAMPLE_RATE
+    global METRICS_ENABLED, METRICS_ALLOWED_NETWORKS
+    settings = resolve_settings(METRICS_SETTINGS, config)
+    SLOW_REQUEST_SECONDS = settings["SLOW_REQUEST_SECONDS"]
+    SLOW_REQUEST_SAMPLE_RATE = settings["SLOW_REQUEST_SAMPLE_RATE"]
+    METRICS_ENABLED = settings["METRICS_ENABLED"]
+    METRICS_ALLOWED_NETWORKS = _networks(settings["METRICS_ALLOWED_IPS"])
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    """Render ``{name="value",...}`` for a sample, or "" without labels."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Add ``amount`` to the series identified by ``labels``."""
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current value of a series (0 if it does not exist)."""
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        """Yield the exposition lines of every series."""
+        with self._lock:
+            values = dict(self._values)
+        for key, value in sorted(values.items()):
+            yield f"{self.name}{_format_labels(self.labels, key)} {value:g}"
+
+
+class Histogram:
+    """Cumulative histogram with optional labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation in the series identified by ``labels``."""
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels: str) -> int:
+        """Return the number of observations of a series."""
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            return series[2] if series else 0
+
+    def samples(self) -> Iterator[str]:
+        """Yield the bucket, sum and count lines of every series."""
+        with self._lock:
+            series = {
+                key: (list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            }
+        for key, (counts, total, count) in sorted(series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labels, key, f'le="{bound:g}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labels, key)} {total:g}"
+            yield f"{self.name}_count{_format_labels(self.labels, key)} {count}"
+
+
+class Registry:
+    """Collection of metrics rendered together at ``/metrics``."""
+
+    def __init__(self) -> None:
+        self._metrics: list = []
+        self._collectors: list[Callable[[], Iterator[str]]] = []
+
+    def register(self, metric: Any) -> Any:
+        """Add a metric and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterator[str]]) -> None:
+        """Add a callable yielding complete exposition lines at scrape time."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        for collector in self._collectors:
+            lines.extend(collector())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "promptforge_http_requests_total", "HTTP requests handled.",
+    ("method", "endpoint", "status"),
+))
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "promptforge_http_request_duration_seconds",
+    "Time to produce a response (streamed bodies excluded).",
+    ("method", "endpoint"),
+))
+LLM_REQUESTS = registry.register(Counter(
+    "promptforge_llm_requests_total", "Upstream model calls.", ("stage", "outcome"),
+))
+LLM_REQUEST_SECONDS = registry.register(Histogram(
+    "promptforge_llm_request_duration_seconds",
+    "Latency of upstream model calls, retries included.", ("stage",),
+))
+LLM_TOKENS = registry.register(Counter(
+    "promptforge_llm_tokens_total",
+    "Tokens sent to and received from the model; cached tokens are part of the input.",
+    ("stage", "direction"),
+))
+LLM_STAGE_SECONDS = registry.register(Histogram(
+    "promptforge_llm_stage_duration_seconds",
+    "Latency of generation stages, response cache lookups included.", ("stage",),
+))
+LLM_CACHE = registry.register(Counter(
+    "promptforge_llm_cache_total", "Response cache lookups by generation stages.",
+    ("stage", "result"),
+))
+DB_QUERIES = registry.register(Counter(
+    "promptforge_db_queries_total", "SQL statements executed.", ("statement",),
+))
+DB_QUERY_SECONDS = registry.register(Histogram(
+    "promptforge_db_query_duration_seconds", "Duration of SQL statements.",
+    ("statement",), buckets=QUERY_BUCKETS,
+))
+TEMPLATE_RENDER_SECONDS = registry.register(Histogram(
+    "promptforge_template_render_duration_seconds", "Duration of template rendering.",
+    ("template",),
+))
+
+
+def _request_totals() -> Optional[dict]:
+    """Return the per-request accumulators, if a request is being handled."""
+    if not has_app_context():
+        return None
+    return g.get("_metrics")
+
+
+@contextmanager
+def llm_span(stage: str) -> Iterator[dict]:
+    """Time one upstream model call.
+
+    The caller stores the token counts of the call in the yielded dict under
+    ``input_tokens``, ``output_tokens`` and, for calls reading cached
+    content, ``cached_tokens``.
+
+    Args:
+        stage: Name of the generation stage or "chat"
+
+    Yields:
+        dict: Mutable span data
+    """
+    span: dict = {}
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield span
+        outcome = "ok"
+    finally:
+        elapsed = time.perf_counter() - started
+        LLM_REQUESTS.inc(stage=stage, outcome=outcome)
+        LLM_REQUEST_SECONDS.observe(elapsed, stage=stage)
+        for direction in ("input", "cached", "output"):
+            if span.get(f"{direction}_tokens"):
+                LLM_TOKENS.inc(span[f"{direction}_tokens"], stage=stage, direction=direction)
+        totals = _request_totals()
+        if totals is not None:
+            totals["llm_calls"] += 1
+            totals["llm_seconds"] += elapsed
+
+
+@contextmanager
+def stage_span(stage: str) -> Iterator[dict]:
+    """Time a generation stage and record whether the response cache hit.
+
+    The caller sets ``cache_hit`` in the yielded dict.
+
+    Args:
+        stage: Name of the generated field
+
+    Yields:
+        dict: Mutable span data
+    """
+    span: dict = {"cache_hit": False}
+    started = time.perf_counter()
+    try:
+        yield span
+    finally:
+        LLM_STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+        LLM_CACHE.inc(stage=stage, result="hit" if span["cache_hit"] else "miss")
+
+
+def usage_tokens(response: Any) -> tuple[Optional[int], Optional[int]]:
+    """Read the prompt and reply token counts from a model response.
+
+    Returns:
+        tuple[Optional[int], Optional[int]]: Input and output tokens, or None
+        where the SDK does not report ``usage_metadata``
+    """
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None, None
+    return (
+        getattr(usage, "prompt_token_count", None),
+        getattr(usage, "candidates_token_count", None),
+    )
+
+
+def cached_input_tokens(response: Any) -> Optional[int]:
+    """Read the number of prompt tokens served from cached content.
+
+    Returns:
+        Optional[int]: Cached tokens, or None where the SDK does not report them
+    """
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "cached_content_token_count", None)
+
+
+def _statement_kind(statement: str) -> str:
+    """Classify a SQL statement by its first keyword."""
+    keyword = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    return keyword if keyword in ("select", "insert", "update", "delete") else "other"
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    """Push the start time of a statement; listens to ``before_cursor_execute``."""
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Optional[ExecutionContext],
+    executemany: bool,
+) -> None:
+    """Record a finished statement and add it to the request totals."""
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    kind = _statement_kind(statement)
+    DB_QUERIES.inc(statement=kind)
+    DB_QUERY_SECONDS.observe(elapsed, statement=kind)
+    totals = _request_totals()
+    if totals is not None:
+        totals["queries"] += 1
+        totals["query_seconds"] += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Record the count and duration of every statement run on ``engine``."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_render(sender: Flask, template: Template, context: dict, **extra: Any) -> None:
+    """Note when a template starts rendering; receives ``before_render_template``."""
+    g.setdefault("_template_started", []).append(time.perf_counter())
+
+
+def _after_render(sender: Flask, template: Template, context: dict, **extra: Any) -> None:
+    """Record a template's render time; receives ``template_rendered``."""
+    started = g.get("_template_started")
+    if started:
+        TEMPLATE_RENDER_SECONDS.observe(
+            time.perf_counter() - started.pop(), template=template.name or "string"
+        )
+
+
+def _start_request() -> None:
+    """Start the clock and the query and model call totals of a request."""
+    g._metrics = {
+        "started": time.perf_counter(),
+        "queries": 0,
+        "query_seconds": 0.0,
+        "llm_calls": 0,
+        "llm_seconds": 0.0,
+    }
+
+
+def _finish_request(response: Response) -> Response:
+    """Record a request's duration and log it if it was slow.
+
+    Args:
+        response: The response about to be sent
+
+    Returns:
+        Response: The same response, unchanged
+    """
+    totals = g.pop("_metrics", None)
+    if totals is None:
+        return response
+    elapsed = time.perf_counter() - totals["started"]
+    endpoint = request.endpoint or "unmatched"
+    HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=response.status_code)
+    HTTP_REQUEST_SECONDS.observe(elapsed, method=request.method, endpoint=endpoint)
+
+    if elapsed >= SLOW_REQUEST_SECONDS and random.random() < SLOW_REQUEST_SAMPLE_RATE:
+        slow_request_logger.warning(
+            f"Slow request {request.method} {request.path} ({endpoint}) "
+            f"status={response.status_code} total={elapsed:.3f}s "
+            f"queries={totals['queries']} query_time={totals['query_seconds']:.3f}s "
+            f"llm_calls={totals['llm_calls']} llm_time={totals['llm_seconds']:.3f}s"
+        )
+    return response
+
+
+def _metrics_allowed() -> bool:
+    """Whether the client may read ``/metrics``.
+
+    Requests relayed by a proxy are refused: behind one, every client
+    would appear to come from the proxy's local address.
+    """
+    if request.headers.get("X-Forwarded-For") or not request.remote_addr:
+        return False
+    try:
+        client = ip_address(request.remote_addr)
+    except ValueError:
+        return False
+    return any(client in network for network in METRICS_ALLOWED_NETWORKS)
+
+
+def metrics_view() -> Response:
+    """Serve every metric in the Prometheus text format to allowed clients."""
+    if not _metrics_allowed():
+        abort(404)
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app: Flask, engine: Engine) -> None:
+    """Instrument an application and expose ``/metrics`` if enabled.
+
+    Args:
+        app: The Flask application
+        engine: The engine whose statements are recorded
+    """
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    instrument_engine(engine)
+    if METRICS_ENABLED:
+        app.add_url_rule("/metrics", "metrics", metrics_view)
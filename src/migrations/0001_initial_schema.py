@@ -0,0 +1,239 @@
+"""Create the schema as of the first versioned release.
+
+Databases created before versioning already hold some or all of these
+tables and are adopted as they are: missing tables and indexes are added,
+and project texts still stored inline are moved to the artifacts table.
+The conversion is a frozen copy working on the tables below, so later
+changes to the models or ``src.storage`` do not alter this migration.
+"""
+
+import hashlib
+import zlib
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    Connection,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    Text,
+    inspect,
+    select,
+    text,
+)
+
+# Project texts older releases stored as columns of ``projects``
+INLINE_TEXT_FIELDS = ("refined_prompt", "checklist_steps", "cursor_rules_content")
+
+# zlib level of the stored texts
+COMPRESSION_LEVEL = 9
+
+# Projects converted per batch
+CONVERSION_BATCH_SIZE = 500
+
+metadata = MetaData()
+
+artifacts = Table(
+    "artifacts",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("content", LargeBinary, nullable=False),
+    Column("size", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+
+Table(
+    "projects",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(255), nullable=False, unique=True),
+    Column("description", Text),
+    Column("refined_prompt_id", String(64), ForeignKey("artifacts.id")),
+    Column("frameworks_languages", Text),
+    Column("checklist_steps_id", String(64), ForeignKey("artifacts.id")),
+    Column("cursor_rules_content_id", String(64), ForeignKey("artifacts.id")),
+    Column("created_at", DateTime, nullable=False, index=True),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+Table(
+    "project_signatures",
+    metadata,
+    Column(
+        "project_id", Integer, ForeignKey("projects.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("minhash", LargeBinary, nullable=False),
+)
+
+Table(
+    "project_lsh_buckets",
+    metadata,
+    Column("bucket", BigInteger, primary_key=True, autoincrement=False),
+    Column(
+        "project_id", Integer, ForeignKey("projects.id", ondelete="CASCADE"),
+        primary_key=True, index=True,
+    ),
+)
+
+Table(
+    "response_cache",
+    metadata,
+    Column("key", String(64), primary_key=True),
+    Column("model_name", String(255), nullable=False),
+    Column("response_text", Text, nullable=False),
+    Column("hit_count", Integer, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("last_accessed_at", DateTime, nullable=False, index=True),
+)
+
+Table(
+    "conversations",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("project_name", String(255), nullable=False),
+    Column("project_description", Text),
+    Column("created_at", DateTime, nullable=False),
+)
+
+Table(
+    "messages",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column(
+        "conversation_id", Integer, ForeignKey("conversations.id", ondelete="CASCADE"),
+        nullable=False, index=True,
+    ),
+    Column("role", String(16), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+)
+
+Table(
+    "conversation_summaries",
+    metadata,
+    Column(
+        "conversation_id", Integer, ForeignKey("conversations.id", ondelete="CASCADE"),
+        primary_key=True,
+    ),
+    Column("content", Text, nullable=False),
+    Column("through_message_id", Integer, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+Table(
+    "generation_jobs",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("status", String(16), nullable=False, index=True),
+    Column("project_name", String(255), nullable=False),
+    Column("project_description", Text),
+    Column("refined_prompt", Text, nullable=False),
+    Column("conversation_id", Integer),
+    Column("project_id", Integer, ForeignKey("projects.id", ondelete="SET NULL")),
+    Column("error", Text),
+    Column("created_at", DateTime, nullable=False),
+    Column("started_at", DateTime),
+    Column("finished_at", DateTime),
+)
+
+
+def upgrade(connection: Connection) -> None:
+    """Create the missing tables and indexes and convert inline texts.
+
+    Args:
+        connection: Connection to the database, in a transaction
+    """
+    metadata.create_all(connection, checkfirst=True)
+
+    # Tables created by older releases may lack indexes added since
+    for table in metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+    _convert_inline_texts(connection)
+
+
+def _artifact_key(content: str) -> str:
+    """Return the id of the artifact holding ``content``."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def _store_texts(connection: Connection, contents: list[str]) -> None:
+    """Insert the artifacts holding ``contents`` that are not stored yet."""
+    rows = {_artifact_key(content): content for content in contents if content is not None}
+    if not rows:
+        return
+    existing = set(connection.scalars(
+        select(artifacts.c.id).where(artifacts.c.id.in_(rows))
+    ))
+    now = datetime.utcnow()
+    missing = [
+        {
+            "id": key,
+            "content": zlib.compress(content.encode("utf-8"), COMPRESSION_LEVEL),
+            "size": len(content.encode("utf-8")),
+            "created_at": now,
+        }
+        for key, content in rows.items()
+        if key not in existing
+    ]
+    if missing:
+        connection.execute(artifacts.insert(), missing)
+
+
+def _convert_inline_texts(connection: Connection) -> None:
+    """Move project texts stored inline into the artifacts table.
+
+    Reference columns are added, the texts are copied in batches walked by
+    id and the old columns are dropped.
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns("projects")}
+    legacy = [field for field in INLINE_TEXT_FIELDS if field in columns]
+    if not legacy:
+        return
+
+    # The search index of those releases reads the columns about to be
+    # dropped; the application recreates it after the migrations
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS projects_fts"))
+        for trigger in ("ai", "ad", "au"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS projects_fts_{trigger}"))
+
+    for field in INLINE_TEXT_FIELDS:
+        if f"{field}_id" not in columns:
+            connection.execute(text(
+                f"ALTER TABLE projects ADD COLUMN {field}_id VARCHAR(64) "
+                f"REFERENCES artifacts(id)"
+            ))
+
+    assignments = ", ".join(f"{field}_id = :{field}_id" for field in legacy)
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            text(
+                f"SELECT id, {', '.join(legacy)} FROM projects "
+                f"WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": CONVERSION_BATCH_SIZE}
+        ).mappings().all()
+        if not rows:
+            break
+        _store_texts(connection, [row[field] for row in rows for field in legacy])
+        connection.execute(text(f"UPDATE projects SET {assignments} WHERE id = :id"), [
+            {"id": row["id"], **{
+                f"{field}_id": None if row[field] is None else _artifact_key(row[field])
+                for field in legacy
+            }}
+            for row in rows
+        ])
+        last_id = rows[-1]["id"]
+
+    for field in legacy:
+        connection.execute(text(f"ALTER TABLE projects DROP COLUMN {field}"))
@@ -0,0 +1,240 @@
+"""Versioned schema migrations.
+
+Each module of this package named ``NNNN_description.py`` is one migration:
+its four-digit prefix is the version and its ``upgrade(connection)``
+function changes the schema from the previous version. The versions applied
+to a database are recorded in the ``schema_migrations`` table, and
+:func:`upgrade` applies the missing ones in order, each in its own
+transaction. Migrations only move forward; undoing one is a new migration.
+
+A migration describes the schema at its own version with Core constructs
+instead of importing the models, so it keeps working after the models have
+moved on. :func:`schema_differences` compares the
+database with the models and lists what a missing migration would have to
+change.
+"""
+
+import importlib
+import os
+import pkgutil
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterator, Optional, Union
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    Engine,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    inspect,
+    select,
+    text,
+)
+
+from src.models import Base
+
+# Table recording the applied migrations
+MIGRATIONS_TABLE = "schema_migrations"
+
+# Key of the PostgreSQL advisory lock serializing concurrent upgrades
+ADVISORY_LOCK_KEY = 7_301_984_254
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+_metadata = MetaData()
+schema_migrations = Table(
+    MIGRATIONS_TABLE,
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass
+class Migration:
+    """A migration module of this package.
+
+    Attributes:
+        version: Number of the migration, from the module name
+        name: Module name, e.g. ``0001_initial_schema``
+        upgrade: Function applying the migration to a connection
+    """
+
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def discover() -> list[Migration]:
+    """Return every migration of this package, ordered by version.
+
+    Returns:
+        list[Migration]: The known migrations
+
+    Raises:
+        RuntimeError: If two migrations share a version
+    """
+    migrations: dict[int, Migration] = {}
+    for module in pkgutil.iter_modules([os.path.dirname(__file__)]):
+        match = _MODULE_NAME.match(module.name)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise RuntimeError(
+                f"Migrations {migrations[version].name} and {module.name} "
+                f"share version {version}"
+            )
+        loaded = importlib.import_module(f"{__name__}.{module.name}")
+        migrations[version] = Migration(version, module.name, loaded.upgrade)
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def applied_versions(bind: Union[Engine, Connection]) -> dict[int, datetime]:
+    """Return the versions recorded as applied to a database.
+
+    Args:
+        bind: Engine of the database, or a connection to it
+
+    Returns:
+        dict[int, datetime]: When each applied version was applied
+    """
+    if isinstance(bind, Engine):
+        with bind.connect() as connection:
+            return applied_versions(connection)
+    if not inspect(bind).has_table(MIGRATIONS_TABLE):
+        return {}
+    return dict(
+        bind.execute(select(schema_migrations.c.version, schema_migrations.c.applied_at))
+        .tuples()
+        .all()
+    )
+
+
+def pending_migrations(engine: Engine, target: Optional[int] = None) -> list[Migration]:
+    """Return the migrations not applied yet, up to ``target``.
+
+    Args:
+        engine: Engine of the database
+        target: Last version to include (default: all)
+
+    Returns:
+        list[Migration]: Migrations to apply, in order
+    """
+    applied = applied_versions(engine)
+    return [
+        migration
+        for migration in discover()
+        if migration.version not in applied
+        and (target is None or migration.version <= target)
+    ]
+
+
+@contextmanager
+def _transaction(engine: Engine) -> Iterator[Connection]:
+    """Open a transaction holding the migration lock.
+
+    PostgreSQL takes an advisory lock held until the transaction ends, so
+    upgrades started at the same time (e.g. by several deploys) run one
+    after the other. The SQLite driver commits on its own before DDL, so
+    there the transaction is begun and ended explicitly; ``BEGIN IMMEDIATE``
+    also takes the database write lock up front.
+    """
+    with engine.connect() as connection:
+        if connection.dialect.name != "sqlite":
+            with connection.begin():
+                if connection.dialect.name == "postgresql":
+                    connection.execute(
+                        text("SELECT pg_advisory_xact_lock(:key)"),
+                        {"key": ADVISORY_LOCK_KEY},
+                    )
+                yield connection
+            return
+
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.exec_driver_sql("ROLLBACK")
+            raise
+        connection.exec_driver_sql("COMMIT")
+
+
+def upgrade(engine: Engine, target: Optional[int] = None) -> list[Migration]:
+    """Apply the pending migrations, up to ``target``.
+
+    Each migration commits together with the record of it, so a failing
+    migration leaves the database at the previous version.
+
+    Args:
+        engine: Engine of the database
+        target: Last version to apply (default: all)
+
+    Returns:
+        list[Migration]: The migrations applied
+    """
+    applied = []
+    for migration in pending_migrations(engine, target):
+        with _transaction(engine) as connection:
+            schema_migrations.create(connection, checkfirst=True)
+            # Another process may have applied it while we waited for the lock
+            if migration.version in applied_versions(connection):
+                continue
+            migration.upgrade(connection)
+            connection.execute(
+                insert(schema_migrations).values(
+                    version=migration.version,
+                    name=migration.name,
+                    applied_at=datetime.utcnow(),
+                )
+            )
+        applied.append(migration)
+    return applied
+
+
+def schema_differences(engine: Engine) -> list[str]:
+    """Compare the database schema with the models.
+
+    Tables, columns and indexes of the models missing from the database are
+    reported, as well as columns the database has and the models do not.
+    Tables outside the models, like the search index, are ignored.
+
+    Args:
+        engine: Engine of the database
+
+    Returns:
+        list[str]: One line per difference, empty if the schema matches
+    """
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    differences = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            differences.append(f"missing table {table.name}")
+            continue
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        differences.extend(
+            f"missing column {table.name}.{column.name}"
+            for column in table.columns
+            if column.name not in columns
+        )
+        differences.extend(
+            f"unexpected column {table.name}.{name}"
+            for name in sorted(columns - set(table.columns.keys()))
+        )
+        indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        differences.extend(
+            f"missing index {index.name}"
+            for index in sorted(table.indexes, key=lambda index: index.name)
+            if index.name not in indexes
+        )
+    return differences
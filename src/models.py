@@ -5,11 +5,43 @@ All models follow the project's architectural guidelines for modularity
 and maintainability.
 """
 
+import hashlib
+import zlib
 from datetime import datetime
-from typing import Optional
+from typing import Any, Iterable, Optional, Union
 
-from sqlalchemy import DateTime, Integer, String, Text, create_engine
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy import (
+    BigInteger,
+    Connection,
+    DateTime,
+    ForeignKey,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+    create_engine,
+    event,
+    insert,
+    select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    Session,
+    mapped_column,
+    object_session,
+    relationship,
+)
+from sqlalchemy.orm.exc import DetachedInstanceError
+from sqlalchemy.types import TypeDecorator
+
+# Project fields kept out of row in the artifacts table
+ARTIFACT_FIELDS = ("refined_prompt", "checklist_steps", "cursor_rules_content")
+
+# zlib level used for artifacts; they are written once and read many times
+COMPRESSION_LEVEL = 9
 
 
 class Base(DeclarativeBase):
@@ -18,6 +50,145 @@ class Base(DeclarativeBase):
     pass
 
 
+def compress_text(value: str) -> bytes:
+    """Compress text for storage in an artifact."""
+    return zlib.compress(value.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def decompress_text(data: Optional[bytes]) -> Optional[str]:
+    """Decompress the stored form of an artifact's text."""
+    if data is None:
+        return None
+    return zlib.decompress(data).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text stored zlib-compressed in a binary column."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect: Any) -> Optional[bytes]:
+        return None if value is None else compress_text(value)
+
+    def process_result_value(self, value: Optional[bytes], dialect: Any) -> Optional[str]:
+        return decompress_text(value)
+
+
+class Artifact(Base):
+    """Model representing a large generated text, stored once and compressed.
+
+    Artifacts are content-addressed: the id is a hash of the text, so
+    projects with identical prompts, checklists or rules share one row.
+
+    Attributes:
+        id: SHA-256 hex digest of the text
+        content: The text, compressed in the database
+        size: Length of the uncompressed text in bytes
+        created_at: Timestamp when the text was first stored
+    """
+
+    __tablename__ = "artifacts"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    content: Mapped[str] = mapped_column(CompressedText, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    @staticmethod
+    def key(content: str) -> str:
+        """Return the id of the artifact holding ``content``."""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def __repr__(self) -> str:
+        """String representation of the Artifact model."""
+        return f"<Artifact(id='{self.id[:12]}', size={self.size})>"
+
+
+def store_artifacts(db: Union[Session, Connection], contents: Iterable[str]) -> None:
+    """Insert the artifacts holding ``contents`` that are not stored yet.
+
+    Args:
+        db: Database session or connection
+        contents: Texts to store; duplicates are stored once
+    """
+    rows = {
+        Artifact.key(content): content for content in contents if content is not None
+    }
+    if not rows:
+        return
+    values = [
+        {"id": key, "content": content, "size": len(content.encode("utf-8"))}
+        for key, content in rows.items()
+    ]
+
+    bind = db.get_bind() if isinstance(db, Session) else db
+    dialect = bind.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        module = sqlite if dialect == "sqlite" else postgresql
+        db.execute(module.insert(Artifact).on_conflict_do_nothing(), values)
+        return
+
+    # Other databases: skip the keys already stored
+    existing = set(db.scalars(select(Artifact.id).where(Artifact.id.in_(rows))))
+    missing = [row for row in values if row["id"] not in existing]
+    if missing:
+        db.execute(insert(Artifact), missing)
+
+
+def _stored_text(field: str) -> hybrid_property:
+    """Expose an artifact reference column as the text it points to.
+
+    Reading the attribute loads and decompresses the artifact on first
+    access, together with the project's other artifacts not loaded yet, as
+    pages showing one text usually show all of them. Assigning text stores
+    its hash and queues the artifact for the next flush. On the class, the
+    attribute is a correlated subquery that can be selected like a column.
+    """
+    column = f"{field}_id"
+
+    def fget(self: "Project") -> Optional[str]:
+        key = getattr(self, column)
+        if key is None:
+            return None
+        texts = vars(self).setdefault("_artifact_texts", {})
+        if key not in texts:
+            db = object_session(self)
+            if db is None:
+                raise DetachedInstanceError(
+                    f"Cannot load '{field}' of a project that is not in a session"
+                )
+            keys = {getattr(self, f"{name}_id") for name in ARTIFACT_FIELDS} - {None}
+            texts.update(db.execute(
+                select(Artifact.id, Artifact.content)
+                .where(Artifact.id.in_(keys - texts.keys()))
+            ).all())
+        return texts.get(key)
+
+    def fset(self: "Project", value: Optional[str]) -> None:
+        if value is None:
+            setattr(self, column, None)
+            return
+        key = Artifact.key(value)
+        vars(self).setdefault("_artifact_texts", {})[key] = value
+        vars(self).setdefault("_unsaved_artifacts", {})[key] = value
+        setattr(self, column, key)
+
+    def expr(cls: type) -> Any:
+        return (
+            select(Artifact.content)
+            .where(Artifact.id == getattr(cls, column))
+            .scalar_subquery()
+            .label(field)
+        )
+
+    # The hybrid takes its attribute name from the getter
+    fget.__name__ = field
+    return hybrid_property(fget, fset, expr=expr)
+
+
 class Project(Base):
     """Model representing a project created in PromptForge.
 
@@ -33,6 +204,9 @@ class Project(Base):
         frameworks_languages: Suggested frameworks and languages (stored as text)
         checklist_steps: Granular development steps (stored as text)
         cursor_rules_content: Content for the project's .cursor/rules file
+        refined_prompt_id, checklist_steps_id, cursor_rules_content_id:
+            Artifacts holding the three large texts above, which are loaded
+            and decompressed on first access
         created_at: Timestamp when the project was created
         updated_at: Timestamp when the project was last updated
     """
@@ -42,17 +216,256 @@ class Project(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False, unique=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    refined_prompt: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    refined_prompt_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("artifacts.id"), nullable=True
+    )
     frameworks_languages: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    checklist_steps: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    cursor_rules_content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    checklist_steps_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("artifacts.id"), nullable=True
+    )
+    cursor_rules_content_id: Mapped[Optional[str]] = mapped_column(
+        ForeignKey("artifacts.id"), nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow, nullable=False
+        DateTime, default=datetime.utcnow, nullable=False, index=True
     )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
 
+    # Large generated texts, stored out of row in the artifacts table
+    refined_prompt = _stored_text("refined_prompt")
+    checklist_steps = _stored_text("checklist_steps")
+    cursor_rules_content = _stored_text("cursor_rules_content")
+
     def __repr__(self) -> str:
         """String representation of the Project model."""
-        return f"<Project(id={self.id}, name='{self.name}')>" 
\ No newline at end of file
+        return f"<Project(id={self.id}, name='{self.name}')>" 
+
+
+@event.listens_for(Session, "before_flush")
+def _flush_artifacts(db: Session, flush_context: Any, instances: Any) -> None:
+    """Store the artifacts assigned to projects before the projects are written."""
+    contents = []
+    for obj in (*db.new, *db.dirty):
+        if isinstance(obj, Project):
+            contents.extend(vars(obj).pop("_unsaved_artifacts", {}).values())
+    store_artifacts(db, contents)
+
+
+class ProjectSignature(Base):
+    """Model representing the MinHash signature of a project.
+
+    Attributes:
+        project_id: The signed project
+        minhash: The signature's hash values, packed as little-endian uint64
+    """
+
+    __tablename__ = "project_signatures"
+
+    project_id: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True
+    )
+    minhash: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation of the ProjectSignature model."""
+        return f"<ProjectSignature(project_id={self.project_id})>"
+
+
+class ProjectBucket(Base):
+    """Model representing one LSH band bucket a project falls into.
+
+    Attributes:
+        bucket: Hash of one band of the project's signature
+        project_id: The project in the bucket
+    """
+
+    __tablename__ = "project_lsh_buckets"
+
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    project_id: Mapped[int] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+
+    def __repr__(self) -> str:
+        """String representation of the ProjectBucket model."""
+        return f"<ProjectBucket(bucket={self.bucket}, project_id={self.project_id})>"
+
+
+class ResponseCacheEntry(Base):
+    """Model representing a cached Gemini generation response.
+
+    Entries are content-addressed: the key is a hash of the model name and
+    the normalized prompt, so identical requests share one entry.
+
+    Attributes:
+        key: SHA-256 hex digest of the model name and normalized prompt
+        model_name: Name of the model that produced the response
+        response_text: The generated text
+        hit_count: Number of times the entry has been served from cache
+        created_at: Timestamp when the entry was stored
+        last_accessed_at: Timestamp of the last hit, used for LRU eviction
+    """
+
+    __tablename__ = "response_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    response_text: Mapped[str] = mapped_column(Text, nullable=False)
+    hit_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    last_accessed_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        """String representation of the ResponseCacheEntry model."""
+        return f"<ResponseCacheEntry(key='{self.key[:12]}', model='{self.model_name}')>"
+
+
+class Conversation(Base):
+    """Model representing an in-progress prompt refinement chat.
+
+    Only the conversation id is kept in the user's session cookie; the
+    transcript itself lives in the ``messages`` table.
+
+    Attributes:
+        id: Unique identifier for the conversation
+        project_name: Name of the project being refined
+        project_description: Initial description entered by the user
+        created_at: Timestamp when the conversation was started
+        messages: Messages of the conversation in the order they were sent
+        summary: Rolling summary of compacted older messages, if any
+    """
+
+    __tablename__ = "conversations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    project_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    project_description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    messages: Mapped[list["Message"]] = relationship(
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+        order_by="Message.id",
+    )
+    summary: Mapped[Optional["ConversationSummary"]] = relationship(
+        back_populates="conversation",
+        cascade="all, delete-orphan",
+    )
+
+    def __repr__(self) -> str:
+        """String representation of the Conversation model."""
+        return f"<Conversation(id={self.id}, project_name='{self.project_name}')>"
+
+
+class Message(Base):
+    """Model representing a single chat message of a conversation.
+
+    Attributes:
+        id: Unique identifier, also giving the message order
+        conversation_id: The conversation the message belongs to
+        role: Either "user" or "assistant"
+        content: The message text
+        created_at: Timestamp when the message was stored
+    """
+
+    __tablename__ = "messages"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    role: Mapped[str] = mapped_column(String(16), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+
+    conversation: Mapped[Conversation] = relationship(back_populates="messages")
+
+    def __repr__(self) -> str:
+        """String representation of the Message model."""
+        return f"<Message(id={self.id}, role='{self.role}')>"
+
+
+class ConversationSummary(Base):
+    """Model representing the rolling summary of a long conversation.
+
+    Once a conversation outgrows its context budget, its older messages are
+    condensed into this summary, which is sent in their place.
+
+    Attributes:
+        conversation_id: The summarized conversation
+        content: The summary text
+        through_message_id: Id of the last message folded into the summary
+        updated_at: Timestamp of the last compaction
+    """
+
+    __tablename__ = "conversation_summaries"
+
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True
+    )
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    through_message_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+    )
+
+    conversation: Mapped[Conversation] = relationship(back_populates="summary")
+
+    def __repr__(self) -> str:
+        """String representation of the ConversationSummary model."""
+        return f"<ConversationSummary(conversation_id={self.conversation_id})>"
+
+
+class GenerationJob(Base):
+    """Model representing a queued project generation.
+
+    Approving a refined prompt enqueues a job; a worker picks it up, runs the
+    generation stages and creates the project.
+
+    Attributes:
+        id: Unique identifier for the job
+        status: One of "pending", "running", "succeeded" or "failed"
+        project_name: Name of the project to create
+        project_description: Description of the project to create
+        refined_prompt: The approved refined prompt
+        conversation_id: Conversation the prompt came from, removed on success
+        project_id: The created project once the job has succeeded
+        error: Error message of a failed job
+        created_at: Timestamp when the job was enqueued
+        started_at: Timestamp when a worker claimed the job
+        finished_at: Timestamp when the job succeeded or failed
+    """
+
+    __tablename__ = "generation_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[str] = mapped_column(
+        String(16), default="pending", nullable=False, index=True
+    )
+    project_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    project_description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    refined_prompt: Mapped[str] = mapped_column(Text, nullable=False)
+    conversation_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    project_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("projects.id", ondelete="SET NULL"), nullable=True
+    )
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, nullable=False
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        """String representation of the GenerationJob model."""
+        return f"<GenerationJob(id={self.id}, status='{self.status}')>"
@@ -0,0 +1,163 @@
+"""In-memory cache of rendered pages with precompressed variants.
+
+Pages are cached per project together with the ``updated_at`` they were
+rendered from, so an edited project simply misses the cache. Each page is
+compressed once when it is stored and the cache is bounded by the total
+size of the stored bodies, evicting the least recently used pages first.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Mapping, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+from src.settings import resolve_settings
+
+# Content encodings the cached variants can be served in, best first
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# Cache settings and their defaults, applied by configure()
+RENDER_CACHE_SETTINGS = {"RENDER_CACHE_MAX_BYTES": 32 * 1024 * 1024}
+RENDER_CACHE_MAX_BYTES = RENDER_CACHE_SETTINGS["RENDER_CACHE_MAX_BYTES"]
+
+
+@dataclass
+class CachedPage:
+    """A rendered page and its compressed variants.
+
+    Attributes:
+        updated_at: ``updated_at`` of the row the page was rendered from
+        body: The rendered HTML as UTF-8 bytes
+        gzip_body: The gzip-compressed body
+        brotli_body: The brotli-compressed body, if brotli is installed
+    """
+
+    updated_at: datetime
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes]
+
+    @property
+    def size(self) -> int:
+        """Total number of bytes held by the entry."""
+        return len(self.body) + len(self.gzip_body) + len(self.brotli_body or b"")
+
+    def variant(self, encoding: Optional[str]) -> bytes:
+        """Return the body for a content encoding (None for identity)."""
+        if encoding == "br" and self.brotli_body is not None:
+            return self.brotli_body
+        if encoding == "gzip":
+            return self.gzip_body
+        return self.body
+
+
+def page_etag(key: object, updated_at: datetime, encoding: Optional[str] = None) -> str:
+    """Build the strong entity tag of a page version.
+
+    Args:
+        key: Identifier of the cached resource
+        updated_at: Last modification time of the resource (naive UTC)
+        encoding: Content encoding of the variant (None for identity)
+
+    Returns:
+        str: The entity tag without quotes
+    """
+    timestamp = updated_at.replace(tzinfo=timezone.utc).timestamp()
+    version = f"{key}-{int(timestamp * 1_000_000):x}"
+    return f"{version}-{encoding}" if encoding else version
+
+
+class RenderCache:
+    """Thread-safe LRU cache of rendered pages bounded by size in bytes."""
+
+    def __init__(self, max_bytes: int = RENDER_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._pages: OrderedDict[object, CachedPage] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: object, updated_at: datetime) -> Optional[CachedPage]:
+        """Return the cached page if it was rendered from ``updated_at``.
+
+        Args:
+            key: Identifier of the page
+            updated_at: Current modification time of the underlying row
+
+        Returns:
+            Optional[CachedPage]: The cached page, or None on a miss
+        """
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None or page.updated_at != updated_at:
+                return None
+            self._pages.move_to_end(key)
+            return page
+
+    def put(self, key: object, updated_at: datetime, html: str) -> CachedPage:
+        """Compress and store a rendered page, replacing older versions.
+
+        Args:
+            key: Identifier of the page
+            updated_at: Modification time of the row the page was rendered from
+            html: The rendered page
+
+        Returns:
+            CachedPage: The stored entry
+        """
+        body = html.encode("utf-8")
+        page = CachedPage(
+            updated_at=updated_at,
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9),
+            brotli_body=brotli.compress(body, quality=11) if brotli else None,
+        )
+        if page.size > self.max_bytes:
+            return page
+
+        with self._lock:
+            previous = self._pages.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._pages[key] = page
+            self._size += page.size
+            while self._size > self.max_bytes:
+                _, evicted = self._pages.popitem(last=False)
+                self._size -= evicted.size
+        return page
+
+    def invalidate(self, key: object) -> None:
+        """Drop the cached page for ``key`` if present."""
+        with self._lock:
+            page = self._pages.pop(key, None)
+            if page is not None:
+                self._size -= page.size
+
+    def clear(self) -> None:
+        """Drop every cached page."""
+        with self._lock:
+            self._pages.clear()
+            self._size = 0
+
+
+# Rendered project detail pages, keyed by project id
+project_pages = RenderCache()
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply RENDER_CACHE_SETTINGS from ``config``, the environment and defaults.
+
+    Args:
+        config: Application config, if any
+    """
+    global RENDER_CACHE_MAX_BYTES
+    settings = resolve_settings(RENDER_CACHE_SETTINGS, config)
+    RENDER_CACHE_MAX_BYTES = settings["RENDER_CACHE_MAX_BYTES"]
+    # Pages over the new bound are evicted by the next store
+    project_pages.max_bytes = RENDER_CACHE_MAX_BYTES
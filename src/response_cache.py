@@ -0,0 +1,224 @@
+"""Persistent, content-addressed cache for Gemini generation responses.
+
+Responses are stored in the ``response_cache`` table, keyed by the model name
+and a hash of the normalized prompt. The cache is bounded both by age (TTL)
+and by entry count, evicting the least recently used entries first.
+"""
+
+import hashlib
+import logging
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Callable, Mapping, Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.database import SessionLocal
+from src.models import ResponseCacheEntry
+from src.settings import resolve_settings
+
+logger = logging.getLogger(__name__)
+
+# Cache settings and their defaults, applied by configure()
+CACHE_SETTINGS = {
+    "GEMINI_CACHE_DISABLED": False,
+    "GEMINI_CACHE_MAX_ENTRIES": 1000,
+    "GEMINI_CACHE_TTL": 7 * 24 * 3600,
+}
+CACHE_DISABLED = CACHE_SETTINGS["GEMINI_CACHE_DISABLED"]
+CACHE_MAX_ENTRIES = CACHE_SETTINGS["GEMINI_CACHE_MAX_ENTRIES"]
+CACHE_TTL_SECONDS = CACHE_SETTINGS["GEMINI_CACHE_TTL"]
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply CACHE_SETTINGS from ``config``, the environment and their defaults.
+
+    Args:
+        config: Application config, if any
+    """
+    global CACHE_DISABLED, CACHE_MAX_ENTRIES, CACHE_TTL_SECONDS
+    settings = resolve_settings(CACHE_SETTINGS, config)
+    CACHE_DISABLED = settings["GEMINI_CACHE_DISABLED"]
+    CACHE_MAX_ENTRIES = settings["GEMINI_CACHE_MAX_ENTRIES"]
+    CACHE_TTL_SECONDS = settings["GEMINI_CACHE_TTL"]
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so trivially different copies share a cache key.
+
+    Args:
+        prompt: The raw prompt text
+
+    Returns:
+        str: The prompt with Unicode normalized and whitespace collapsed
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", prompt)).strip()
+
+
+def cache_key(model_name: str, prompt: str) -> str:
+    """Compute the content address of a generation request.
+
+    Args:
+        model_name: Name of the model that will answer the prompt
+        prompt: The raw prompt text
+
+    Returns:
+        str: SHA-256 hex digest identifying the request
+    """
+    payload = f"{model_name}\0{normalize_prompt(prompt)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_cached(model_name: str, prompt: str) -> Optional[str]:
+    """Look up a cached response, refreshing its LRU position on a hit.
+
+    Args:
+        model_name: Name of the model that would answer the prompt
+        prompt: The raw prompt text
+
+    Returns:
+        Optional[str]: The cached response text, or None on a miss
+    """
+    key = cache_key(model_name, prompt)
+    db = SessionLocal()
+    try:
+        entry = db.get(ResponseCacheEntry, key)
+        now = datetime.utcnow()
+        if entry and entry.created_at < now - timedelta(seconds=CACHE_TTL_SECONDS):
+            db.delete(entry)
+            db.commit()
+            entry = None
+        if entry is None:
+            return None
+
+        entry.hit_count += 1
+        entry.last_accessed_at = now
+        text = entry.response_text
+        db.commit()
+        return text
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Response cache lookup failed: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def store(model_name: str, prompt: str, response_text: str) -> None:
+    """Store a response and evict expired and least recently used entries.
+
+    Args:
+        model_name: Name of the model that answered the prompt
+        prompt: The raw prompt text
+        response_text: The generated text
+    """
+    key = cache_key(model_name, prompt)
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        db.merge(ResponseCacheEntry(
+            key=key,
+            model_name=model_name,
+            response_text=response_text,
+            hit_count=0,
+            created_at=now,
+            last_accessed_at=now,
+        ))
+
+        # Drop expired entries, then trim to the size bound by LRU order
+        db.execute(delete(ResponseCacheEntry).where(
+            ResponseCacheEntry.created_at < now - timedelta(seconds=CACHE_TTL_SECONDS)
+        ))
+        excess = db.scalar(select(func.count()).select_from(ResponseCacheEntry))
+        excess = (excess or 0) - CACHE_MAX_ENTRIES
+        if excess > 0:
+            stale_keys = select(ResponseCacheEntry.key).order_by(
+                ResponseCacheEntry.last_accessed_at
+            ).limit(excess)
+            db.execute(delete(ResponseCacheEntry).where(
+                ResponseCacheEntry.key.in_(stale_keys)
+            ))
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        logger.warning(f"Response cache store failed: {e}")
+    finally:
+        db.close()
+
+
+def cached_generate(
+    model_name: str,
+    prompt: str,
+    generate: Callable[[str], str],
+    bypass: bool = False,
+) -> str:
+    """Return a cached response for ``prompt`` or generate and cache one.
+
+    Args:
+        model_name: Name of the model that answers the prompt
+        prompt: The raw prompt text
+        generate: Function performing the upstream call on a miss
+        bypass: Skip the lookup and always call upstream (the fresh
+            response still replaces the cached one)
+
+    Returns:
+        str: The response text
+    """
+    if CACHE_DISABLED:
+        return generate(prompt)
+
+    if not bypass:
+        cached = get_cached(model_name, prompt)
+        if cached is not None:
+            return cached
+
+    response_text = generate(prompt)
+    store(model_name, prompt, response_text)
+    return response_text
+
+
+def cache_stats() -> dict:
+    """Summarize the cache from the stored entries.
+
+    The numbers come from the database, so every process reports the same
+    ones. Each entry was stored after one upstream call, and its
+    ``hit_count`` counts the calls it saved since. Entries that were evicted
+    or replaced take their counts with them.
+
+    Returns:
+        dict: ``entries``, ``hits`` and ``hit_rate`` (hits per lookup
+            answered by the stored entries, None when empty)
+    """
+    db = SessionLocal()
+    try:
+        entries, hits = db.execute(
+            select(func.count(), func.coalesce(func.sum(ResponseCacheEntry.hit_count), 0))
+        ).one()
+    except SQLAlchemyError as e:
+        logger.warning(f"Response cache statistics failed: {e}")
+        entries, hits = 0, 0
+    finally:
+        db.close()
+    lookups = entries + hits
+    return {
+        "entries": entries,
+        "hits": hits,
+        "hit_rate": round(hits / lookups, 3) if lookups else None,
+    }
+
+
+def clear_cache() -> int:
+    """Delete every cached response.
+
+    Returns:
+        int: Number of entries removed
+    """
+    db = SessionLocal()
+    try:
+        removed = db.execute(delete(ResponseCacheEntry)).rowcount
+        db.commit()
+        return removed
+    finally:
+        db.close()
@@ -4,16 +4,49 @@ This module defines all web routes and their corresponding handlers
 for the PromptForge application.
 """
 
-from typing import Union
+from datetime import datetime, timezone
+from typing import Iterator, Optional, Union
 import json
+import logging
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, session
+from flask import (
+    Blueprint,
+    current_app,
+    jsonify,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    session,
+)
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
 from werkzeug.wrappers import Response
 
-from src.database import get_db
-from src.models import Project
-from src.gemini_config import get_refinement_chat, generate_project_data
+from src.database import SessionLocal, get_db, get_read_db, release_connection
+from src.models import Conversation, GenerationJob, Project
+from src.conversation import (
+    append_messages,
+    compile_refined_prompt,
+    create_conversation,
+    delete_conversation,
+    get_history,
+    load_conversation,
+    opening_message,
+    prepare_context,
+    send_turn,
+    stream_turn,
+)
+from src.archive import export_filename, export_ndjson, export_zip
+from src.artifacts import ArtifactError, update_project
+from src.render_cache import SUPPORTED_ENCODINGS, page_etag, project_pages
+from src.search import search_projects
+from src.similarity import SimilarProject, clone_project, find_similar
+from src.jobs import FAILED, SUCCEEDED, enqueue_generation
+from src.llm_client import UpstreamUnavailableError
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint for routes
 main = Blueprint("main", __name__)
@@ -29,42 +62,167 @@ def index() -> str:
     return render_template("index.html")
 
 
+def _encode_cursor(created_at: datetime, project_id: int) -> str:
+    """Encode the position of a listed project as a pagination cursor."""
+    return f"{created_at.isoformat()}_{project_id}"
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[tuple[datetime, int]]:
+    """Decode a pagination cursor, ignoring malformed values.
+
+    Args:
+        cursor: Cursor from the ``after`` query parameter
+
+    Returns:
+        Optional[tuple[datetime, int]]: The ``created_at`` and ``id`` of the
+        last project on the previous page, or None
+    """
+    if not cursor:
+        return None
+    try:
+        created_at, project_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(project_id)
+    except ValueError:
+        return None
+
+
 @main.route("/projects")
 def projects() -> str:
-    """Display a list of all projects.
+    """Display a page of projects, newest first.
+
+    Pages are addressed by a keyset cursor on ``(created_at, id)`` so every
+    page costs the same index range scan, and only the listed columns are
+    loaded (the description is truncated in SQL).
 
     Returns:
         str: Rendered HTML template with projects list
     """
-    # Get database session
-    db_gen = get_db()
-    db: Session = next(db_gen)
+    page_size = current_app.config["PROJECTS_PER_PAGE"]
+    cursor = _decode_cursor(request.args.get("after"))
 
-    try:
-        # Query all projects
-        projects = db.query(Project).order_by(Project.created_at.desc()).all()
-        return render_template("projects.html", projects=projects)
-    finally:
-        # Ensure session is closed
+    db = get_read_db()
+
+    query = select(
+        Project.id,
+        Project.name,
+        func.substr(Project.description, 1, 101).label("description"),
+        Project.created_at
+    )
+    if cursor:
+        created_at, project_id = cursor
+        query = query.where(or_(
+            Project.created_at < created_at,
+            and_(Project.created_at == created_at, Project.id < project_id)
+        ))
+    query = query.order_by(Project.created_at.desc(), Project.id.desc())
+
+    # Fetch one extra row to know whether another page follows
+    rows = db.execute(query.limit(page_size + 1)).all()
+    projects = rows[:page_size]
+    next_cursor = None
+    if len(rows) > page_size:
+        last = projects[-1]
+        next_cursor = _encode_cursor(last.created_at, last.id)
+
+    return render_template(
+        "projects.html",
+        projects=projects,
+        next_cursor=next_cursor,
+        is_first_page=cursor is None
+    )
+
+
+@main.route("/projects/search")
+def search() -> str:
+    """Search projects by name, description, prompt, stack and checklist.
+
+    Returns:
+        str: Rendered HTML template with ranked, highlighted results
+    """
+    query = request.args.get("q", "").strip()
+    results = []
+
+    if query:
+        results = search_projects(
+            get_db(), query, limit=current_app.config["PROJECTS_PER_PAGE"]
+        )
+
+    return render_template("search.html", query=query, results=results)
+
+
+@main.route("/projects/export")
+def export_projects() -> Response:
+    """Download every project as NDJSON or as a zip of project folders.
+
+    The archive is streamed in batches, so memory use does not depend on
+    the number of projects.
+
+    Returns:
+        Response: Streaming download
+    """
+    export_format = "zip" if request.args.get("format") == "zip" else "ndjson"
+
+    def generate() -> Iterator[bytes]:
+        # The request's session is gone once the body streams; use a new one
+        db = SessionLocal()
         try:
-            next(db_gen)
-        except StopIteration:
-            pass
+            if export_format == "zip":
+                yield from export_zip(db)
+            else:
+                for line in export_ndjson(db):
+                    yield line.encode("utf-8")
+        finally:
+            db.close()
+
+    mimetype = "application/zip" if export_format == "zip" else "application/x-ndjson"
+    return Response(
+        generate(),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename={export_filename(export_format)}"
+        }
+    )
+
+
+def _render_chat(
+    db: Session,
+    conversation: Optional[Conversation],
+    message: Optional[str] = None,
+    similar_projects: Optional[list[SimilarProject]] = None,
+) -> str:
+    """Render the create project page for the given conversation.
+
+    Args:
+        db: Database session
+        conversation: The active conversation, or None to show the start form
+        message: Optional message to display above the form
+        similar_projects: Existing projects offered for reuse on approval
+
+    Returns:
+        str: Rendered HTML template
+    """
+    return render_template(
+        "create_project.html",
+        message=message,
+        chat_history=get_history(db, conversation.id) if conversation else [],
+        chat_active=conversation is not None,
+        similar_projects=similar_projects or []
+    )
 
 
 @main.route("/create_project", methods=["GET", "POST"])
 def create_project() -> Union[str, Response]:
     """Handle project creation with Gemini chat refinement.
 
+    The conversation is stored server-side; the session cookie only holds
+    its id.
+
     Returns:
         Union[str, Response]: Rendered template or redirect response
     """
-    # Initialize chat session in Flask session if not exists
-    if "chat_history" not in session:
-        session["chat_history"] = []
-        session["chat_active"] = False
-        session["project_name"] = ""
-        session["project_description"] = ""
+    db = get_db()
+
+    conversation = load_conversation(db, session.get("conversation_id"))
     
     if request.method == "POST":
         action = request.form.get("action")
@@ -75,193 +233,468 @@ def create_project() -> Union[str, Response]:
             description = request.form.get("description", "").strip()
             
             if not name:
-                return render_template(
-                    "create_project.html",
-                    message="Project name is required.",
-                    chat_history=session.get("chat_history", [])
-                )
-            
-            # Store project info in session
-            session["project_name"] = name
-            session["project_description"] = description
-            session["chat_active"] = True
-            session["chat_history"] = []
+                return _render_chat(db, None, "Project name is required.")
             
             # Initial message to Gemini
-            initial_prompt = f"I want to create a project called '{name}'. {description}"
+            initial_prompt = opening_message(name, description)
+            
+            # Don't hold a pooled connection while waiting on the model
+            release_connection(db)
             
             try:
-                # Get chat model and send initial message
-                chat = get_refinement_chat()
-                response = chat.send_message(initial_prompt)
-                
-                # Update chat history
-                session["chat_history"].append({
-                    "role": "user",
-                    "content": initial_prompt
-                })
-                session["chat_history"].append({
-                    "role": "assistant",
-                    "content": response.text
-                })
-                session.modified = True
-                
+                # Start a fresh conversation with the initial message
+                reply = send_turn([], initial_prompt)
             except Exception as e:
-                return render_template(
-                    "create_project.html",
-                    message=f"Error starting chat: {str(e)}",
-                    chat_history=session.get("chat_history", [])
-                )
+                return _render_chat(db, None, _chat_error("starting chat", e))
+            
+            # Replace any abandoned conversation with the new one
+            if conversation:
+                delete_conversation(db, conversation)
+            conversation = create_conversation(db, name, description)
+            append_messages(db, conversation.id, [
+                {"role": "user", "content": initial_prompt},
+                {"role": "assistant", "content": reply}
+            ])
+            session["conversation_id"] = conversation.id
         
         # Send chat message
         elif action == "send_message":
             user_message = request.form.get("message", "").strip()
             
-            if user_message and session.get("chat_active"):
+            if user_message and conversation:
                 try:
-                    # Recreate chat with history
-                    chat = get_refinement_chat()
-                    
-                    # Send all previous messages to maintain context
-                    for msg in session["chat_history"]:
-                        if msg["role"] == "user":
-                            chat.send_message(msg["content"])
-                    
-                    # Send new message
-                    response = chat.send_message(user_message)
-                    
-                    # Update chat history
-                    session["chat_history"].append({
-                        "role": "user",
-                        "content": user_message
-                    })
-                    session["chat_history"].append({
-                        "role": "assistant", 
-                        "content": response.text
-                    })
-                    session.modified = True
-                    
+                    # Seed the chat with the stored history and send only
+                    # the new message (one upstream call per turn)
+                    context = prepare_context(db, conversation.id)
+                    release_connection(db)
+                    reply = send_turn(context.messages, user_message, context.summary)
                 except Exception as e:
-                    return render_template(
-                        "create_project.html",
-                        message=f"Error sending message: {str(e)}",
-                        chat_history=session.get("chat_history", [])
+                    return _render_chat(
+                        db, conversation, _chat_error("sending message", e)
                     )
+                
+                # Append the new turn without rewriting the transcript
+                append_messages(db, conversation.id, [
+                    {"role": "user", "content": user_message},
+                    {"role": "assistant", "content": reply}
+                ])
         
         # Approve prompt and generate project data
         elif action == "approve_prompt":
-            if not session.get("chat_active") or not session.get("chat_history"):
-                return render_template(
-                    "create_project.html",
-                    message="No active chat session to approve.",
-                    chat_history=session.get("chat_history", [])
+            chat_history = get_history(db, conversation.id) if conversation else []
+            if not chat_history:
+                return _render_chat(
+                    db, conversation, "No active chat session to approve."
                 )
             
-            try:
-                # Compile refined prompt from chat history
-                refined_prompt = f"Project: {session['project_name']}\n"
-                refined_prompt += f"Description: {session['project_description']}\n\n"
-                refined_prompt += "Refined Requirements based on conversation:\n"
-                
-                # Extract key points from chat history
-                for msg in session["chat_history"]:
-                    if msg["role"] == "user":
-                        refined_prompt += f"\nUser requirement: {msg['content']}\n"
-                
-                # Generate project data
-                project_data = generate_project_data(refined_prompt)
-                
-                # Get database session
-                db_gen = get_db()
-                db: Session = next(db_gen)
-                
-                try:
-                    # Check if project name already exists
-                    existing = db.query(Project).filter(
-                        Project.name == session["project_name"]
-                    ).first()
-                    
-                    if existing:
-                        return render_template(
-                            "create_project.html",
-                            message=f"Project '{session['project_name']}' already exists.",
-                            chat_history=session.get("chat_history", [])
-                        )
-                    
-                    # Create new project
-                    new_project = Project(
-                        name=session["project_name"],
-                        description=session["project_description"],
-                        refined_prompt=refined_prompt,
-                        frameworks_languages=project_data["frameworks_languages"],
-                        checklist_steps=project_data["checklist_steps"],
-                        cursor_rules_content=project_data["cursor_rules_content"]
-                    )
-                    
-                    db.add(new_project)
-                    db.commit()
-                    
-                    # Clear session
-                    session.pop("chat_history", None)
-                    session.pop("chat_active", None)
-                    session.pop("project_name", None)
-                    session.pop("project_description", None)
-                    
-                    return redirect(url_for("main.project_detail", project_id=new_project.id))
-                    
-                except Exception as e:
-                    db.rollback()
-                    return render_template(
-                        "create_project.html",
-                        message=f"Error creating project: {str(e)}",
-                        chat_history=session.get("chat_history", [])
+            # Compile a deduplicated refined prompt from the user's messages
+            refined_prompt = compile_refined_prompt(db, conversation)
+            
+            # Check if project name already exists
+            existing = db.query(Project).filter(
+                Project.name == conversation.project_name
+            ).first()
+            name_taken = f"Project '{conversation.project_name}' already exists."
+            
+            if existing:
+                return _render_chat(db, conversation, name_taken)
+            
+            # Reuse the artifacts of a similar project instead of generating
+            clone_from = request.form.get("clone_from", type=int)
+            if clone_from:
+                source = db.get(Project, clone_from)
+                if source is None:
+                    return _render_chat(
+                        db, conversation, "The selected project no longer exists."
                     )
-                finally:
-                    try:
-                        next(db_gen)
-                    except StopIteration:
-                        pass
-                        
-            except Exception as e:
-                return render_template(
-                    "create_project.html",
-                    message=f"Error generating project data: {str(e)}",
-                    chat_history=session.get("chat_history", [])
+                project = clone_project(db, conversation, refined_prompt, source)
+                if project is None:
+                    # Another request created a project with the name meanwhile
+                    return _render_chat(db, conversation, name_taken)
+                return redirect(url_for("main.project_detail", project_id=project.id))
+            
+            # Offer close matches before paying for a full generation
+            if not request.form.get("generate"):
+                similar = find_similar(
+                    db, conversation.project_description, refined_prompt
                 )
-
+                if similar:
+                    return _render_chat(db, conversation, similar_projects=similar)
+            
+            # Generate the project in the background and poll for it
+            job = enqueue_generation(db, conversation, refined_prompt)
+            
+            return redirect(url_for("main.job_status", job_id=job.id))
+    
     # GET request - show the form
-    return render_template(
-        "create_project.html",
-        chat_history=session.get("chat_history", []),
-        chat_active=session.get("chat_active", False)
+    return _render_chat(db, conversation)
+
+
+def _chat_error(action: str, error: Exception) -> str:
+    """Turn a failed model call into a message that is safe to show users.
+
+    Args:
+        action: What was being done, e.g. "sending message"
+        error: The exception raised by the model call
+
+    Returns:
+        str: The message to display
+    """
+    if isinstance(error, UpstreamUnavailableError):
+        return str(error)
+    logger.exception(f"Error {action}")
+    return f"Error {action}. Please try again."
+
+
+def _chat_turn_message(
+    conversation: Optional[Conversation],
+) -> tuple[str, Optional[tuple[Response, int]]]:
+    """Read and validate the user message of a JSON or streamed chat turn.
+
+    Args:
+        conversation: The active conversation, if any
+
+    Returns:
+        tuple: The stripped message, and an error response if it is invalid
+    """
+    payload = request.get_json(silent=True) or request.form
+    user_message = (payload.get("message") or "").strip()
+    
+    if conversation is None:
+        return user_message, (jsonify(error="No active chat session."), 400)
+    if not user_message:
+        return user_message, (jsonify(error="Message is required."), 400)
+    return user_message, None
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format a server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@main.route("/create_project/turn", methods=["POST"])
+def chat_turn() -> Union[Response, tuple[Response, int]]:
+    """Send one chat message and return only the new messages as JSON.
+
+    Returns:
+        Union[Response, tuple[Response, int]]: The user and assistant
+        messages, or an error payload
+    """
+    db = get_db()
+
+    conversation = load_conversation(db, session.get("conversation_id"))
+    user_message, error = _chat_turn_message(conversation)
+    if error:
+        return error
+    
+    try:
+        context = prepare_context(db, conversation.id)
+        release_connection(db)
+        reply = send_turn(context.messages, user_message, context.summary)
+    except Exception as e:
+        status = 503 if isinstance(e, UpstreamUnavailableError) else 502
+        return jsonify(error=_chat_error("sending message", e)), status
+    
+    messages = [
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": reply}
+    ]
+    append_messages(db, conversation.id, messages)
+    
+    return jsonify(messages=messages)
+
+
+@main.route("/create_project/stream", methods=["POST"])
+def stream_message() -> Union[Response, tuple[Response, int]]:
+    """Send one chat message and stream the reply as server-sent events.
+
+    Emits ``token`` events with reply chunks as they arrive, followed by a
+    single ``done`` event with the full reply or an ``error`` event. The
+    turn is appended to the stored conversation once the reply is complete.
+
+    Returns:
+        Union[Response, tuple[Response, int]]: Event stream or error payload
+    """
+    db = get_db()
+
+    conversation = load_conversation(db, session.get("conversation_id"))
+    user_message, error = _chat_turn_message(conversation)
+    if error:
+        return error
+    
+    conversation_id = conversation.id
+    context = prepare_context(db, conversation_id)
+    
+    def generate() -> Iterator[str]:
+        chunks: list[str] = []
+        try:
+            for text in stream_turn(context.messages, user_message, context.summary):
+                chunks.append(text)
+                yield _sse("token", {"text": text})
+        except Exception as e:
+            yield _sse("error", {"message": _chat_error("sending message", e)})
+            return
+        
+        reply = "".join(chunks)
+        
+        # The request's session is gone once the body streams; use a new one
+        db = SessionLocal()
+        try:
+            append_messages(db, conversation_id, [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": reply}
+            ])
+        finally:
+            db.close()
+        yield _sse("done", {"content": reply})
+    
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
+def _job_payload(job: GenerationJob) -> dict:
+    """Serialize a generation job for the status endpoint."""
+    payload = {"id": job.id, "status": job.status, "error": job.error}
+    if job.status == SUCCEEDED and job.project_id is not None:
+        payload["project_url"] = url_for("main.project_detail", project_id=job.project_id)
+    return payload
+
+
+@main.route("/jobs/<int:job_id>")
+def job_status(job_id: int) -> Union[str, Response, tuple[str, int]]:
+    """Show the progress of a generation job.
+
+    Redirects to the project once the job has succeeded.
+
+    Args:
+        job_id: The ID of the job to display
+
+    Returns:
+        Union[str, Response, tuple[str, int]]: Status page, redirect or 404
+    """
+    db = get_db()
+
+    job = db.get(GenerationJob, job_id)
+
+    if not job:
+        return render_template("404.html"), 404
+
+    if job.status == SUCCEEDED and job.project_id is not None:
+        return redirect(url_for("main.project_detail", project_id=job.project_id))
+
+    return render_template("job_status.html", job=job, failed=job.status == FAILED)
+
+
+@main.route("/jobs/<int:job_id>/status")
+def job_status_json(job_id: int) -> Union[Response, tuple[Response, int]]:
+    """Return the status of a generation job as JSON for polling.
+
+    Args:
+        job_id: The ID of the job to report
+
+    Returns:
+        Union[Response, tuple[Response, int]]: Job status or 404 error
+    """
+    db = get_db()
+
+    job = db.get(GenerationJob, job_id)
+
+    if not job:
+        return jsonify(error="Job not found."), 404
+
+    return jsonify(_job_payload(job))
+
+
+def _preferred_encoding() -> Optional[str]:
+    """Pick the best precompressed variant the client accepts."""
+    for encoding in SUPPORTED_ENCODINGS:
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def _not_modified(project_id: int, updated_at: datetime) -> bool:
+    """Check the request's validators against the current project version.
+
+    Args:
+        project_id: The ID of the requested project
+        updated_at: The project's current modification time
+
+    Returns:
+        bool: True if the client's copy is still current
+    """
+    if request.if_none_match:
+        return any(
+            request.if_none_match.contains(page_etag(project_id, updated_at, encoding))
+            for encoding in (None, *SUPPORTED_ENCODINGS)
+        )
+    if request.if_modified_since:
+        last_modified = updated_at.replace(tzinfo=timezone.utc, microsecond=0)
+        return last_modified <= request.if_modified_since
+    return False
+
+
 @main.route("/project/<int:project_id>")
-def project_detail(project_id: int) -> Union[str, tuple[str, int]]:
+def project_detail(project_id: int) -> Union[Response, tuple[str, int]]:
     """Display details of a specific project.
 
+    Rendered pages are cached per project version and served precompressed.
+    Conditional requests are answered with 304 from the modification time
+    alone, without loading the row or rendering the template.
+
     Args:
         project_id: The ID of the project to display
 
     Returns:
-        Union[str, tuple[str, int]]: Rendered template or 404 error
+        Union[Response, tuple[str, int]]: Page or 304 response, or 404 error
     """
-    # Get database session
-    db_gen = get_db()
-    db: Session = next(db_gen)
+    db = get_read_db()
 
-    try:
-        # Query for the specific project
-        project = db.query(Project).filter(Project.id == project_id).first()
+    # Only the modification time is needed to validate caches
+    query = select(Project.updated_at).where(Project.id == project_id)
+    updated_at = db.scalar(query)
+
+    # A lagging replica may not have the project yet
+    if updated_at is None and db is not get_db():
+        db = get_db()
+        updated_at = db.scalar(query)
+
+    if updated_at is None:
+        return render_template("404.html"), 404
+
+    encoding = _preferred_encoding()
+
+    if _not_modified(project_id, updated_at):
+        response = Response(status=304)
+    else:
+        page = project_pages.get(project_id, updated_at)
+        if page is None:
+            project = db.get(Project, project_id)
+            page = project_pages.put(
+                project_id,
+                updated_at,
+                render_template("project_detail.html", project=project)
+            )
+        response = Response(page.variant(encoding), mimetype="text/html")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+
+    response.set_etag(page_etag(project_id, updated_at, encoding))
+    response.last_modified = updated_at.replace(tzinfo=timezone.utc)
+    response.cache_control.no_cache = True
+    response.vary.add("Accept-Encoding")
+    return response
 
-        if not project:
+
+def _wants_json() -> bool:
+    """Whether the client expects a JSON reply rather than a page.
+
+    The project page's script posts JSON; a plain form submission, made
+    without JavaScript or when the script cannot run, gets a page instead.
+    """
+    if request.is_json:
+        return True
+    best = request.accept_mimetypes.best_match(["application/json", "text/html"])
+    return best == "application/json"
+
+
+def _update_error(
+    project: Project, message: str, status: int
+) -> Union[tuple[Response, int], tuple[str, int]]:
+    """Report a failed update as JSON, or on the project page for forms."""
+    if _wants_json():
+        return jsonify(error=message), status
+    # Rendered for this response only; cached pages never show the error
+    return render_template("project_detail.html", project=project, error=message), status
+
+
+def _update_project(
+    project_id: int,
+    edits: Optional[dict[str, str]] = None,
+    regenerate: tuple[str, ...] = (),
+) -> Union[Response, tuple[Response, int], tuple[str, int]]:
+    """Update a project's artifacts and report the result.
+
+    JSON requests get the changed fields and their new values; form
+    submissions are redirected back to the project page.
+
+    Args:
+        project_id: The project to update
+        edits: New values for editable fields
+        regenerate: Artifacts to regenerate
+
+    Returns:
+        Union[Response, tuple[Response, int], tuple[str, int]]: The JSON
+        result or a redirect, or an error payload or page
+    """
+    db = get_db()
+
+    project = db.get(Project, project_id)
+    if project is None:
+        if not _wants_json():
             return render_template("404.html"), 404
+        return jsonify(error="Project not found."), 404
 
-        return render_template("project_detail.html", project=project)
-    finally:
-        # Ensure session is closed
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass 
\ No newline at end of file
+    if edits and not all(edits.values()):
+        return _update_error(project, "Content is required.", 400)
+    
+    try:
+        changed = update_project(db, project, edits, regenerate)
+    except ArtifactError as e:
+        return _update_error(project, str(e), 400)
+    except Exception as e:
+        status = 503 if isinstance(e, UpstreamUnavailableError) else 502
+        return _update_error(project, _chat_error("regenerating project", e), status)
+
+    if not _wants_json():
+        return redirect(url_for("main.project_detail", project_id=project_id), code=303)
+    return jsonify(
+        changed=changed,
+        fields={field: getattr(project, field) for field in changed},
+        updated_at=project.updated_at.isoformat(),
+    )
+
+
+@main.route("/project/<int:project_id>/regenerate/<artifact>", methods=["POST"])
+def regenerate_project_artifact(
+    project_id: int, artifact: str
+) -> Union[Response, tuple[Response, int], tuple[str, int]]:
+    """Regenerate one artifact of a project from its stored inputs.
+
+    Artifacts derived from the regenerated one are regenerated too if it
+    changed, e.g. the cursor rules after a new tech stack.
+
+    Args:
+        project_id: The project to update
+        artifact: The artifact to regenerate
+
+    Returns:
+        Union[Response, tuple[Response, int], tuple[str, int]]: JSON result
+        or redirect, or error payload or page
+    """
+    return _update_project(project_id, regenerate=(artifact,))
+
+
+@main.route("/project/<int:project_id>/edit/<field>", methods=["POST"])
+def edit_project_field(
+    project_id: int, field: str
+) -> Union[Response, tuple[Response, int], tuple[str, int]]:
+    """Replace the refined prompt or tech stack of a project.
+
+    Only the artifacts derived from the edited field are regenerated:
+    editing the tech stack costs a single call for the cursor rules.
+
+    Args:
+        project_id: The project to update
+        field: The field to replace
+
+    Returns:
+        Union[Response, tuple[Response, int], tuple[str, int]]: JSON result
+        or redirect, or error payload or page
+    """
+    payload = request.get_json(silent=True) or request.form
+    content = (payload.get("content") or "").strip()
+    return _update_project(project_id, edits={field: content})
@@ -0,0 +1,125 @@
+"""Local rendering of the ``.cursor/rules`` file.
+
+Instead of asking the model to reproduce the whole rules template, the model
+only returns a compact JSON object with the project-specific fields and the
+file is rendered locally from ``templates/cursor-rules-template.txt``. The
+template is compiled once per process.
+"""
+
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+from jinja2 import Environment, StrictUndefined, Template
+
+# Path of the shared rules template
+RULES_TEMPLATE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "templates",
+    "cursor-rules-template.txt",
+)
+
+# Template placeholders and the JSON keys the model fills them with
+RULES_FIELDS = {
+    "PROJECT_NAME_PLACEHOLDER": "project_name",
+    "PROJECT_TYPE_PLACEHOLDER": "project_type",
+    "PRIMARY_GOAL_PLACEHOLDER": "primary_goal",
+    "KEY_OUTCOME_PLACEHOLDER": "key_outcome",
+    "TARGET_AUDIENCE_PLACEHOLDER": "target_audience",
+    "DEPLOYMENT_ENVIRONMENT_PLACEHOLDER": "deployment_environment",
+    "NON_FUNCTIONAL_REQUIREMENTS_PLACEHOLDER": "non_functional_requirements",
+    "ARCHITECTURAL_PATTERN_PLACEHOLDER": "architectural_pattern",
+    "DATA_FLOW_DESCRIPTION_PLACEHOLDER": "data_flow",
+    "PRIMARY_LANGUAGE_PLACEHOLDER": "primary_language",
+    "FRAMEWORK_PLACEHOLDER": "frameworks",
+    "DATABASE_PLACEHOLDER": "databases",
+    "ORM_ODM_PLACEHOLDER": "orm_odm",
+    "PACKAGE_MANAGER_PLACEHOLDER": "package_manager",
+}
+
+# Value rendered for fields the model left empty
+MISSING_VALUE = "Not specified"
+
+_PLACEHOLDER = re.compile(r"\{\{\s*([A-Z_]+_PLACEHOLDER)\s*\}\}(\s*\(e\.g\.,[^)]*\))?")
+
+
+@lru_cache(maxsize=1)
+def read_rules_template() -> str:
+    """Return the raw rules template text."""
+    with open(RULES_TEMPLATE_PATH, encoding="utf-8") as template_file:
+        return template_file.read()
+
+
+@lru_cache(maxsize=1)
+def _compiled_template() -> Template:
+    """Compile the rules template, dropping the "(e.g., ...)" filling hints."""
+    def to_variable(match: re.Match) -> str:
+        return "{{ " + RULES_FIELDS[match.group(1)] + " }}"
+
+    source = _PLACEHOLDER.sub(to_variable, read_rules_template())
+    environment = Environment(
+        autoescape=False, keep_trailing_newline=True, undefined=StrictUndefined
+    )
+    return environment.from_string(source)
+
+
+def rules_fields_prompt(frameworks_languages: str) -> str:
+    """Build the instruction asking for the template fields as JSON.
+
+    The instruction follows the project's refined prompt, which is sent
+    (or cached) ahead of it.
+
+    Args:
+        frameworks_languages: The suggested tech stack
+
+    Returns:
+        str: Instruction requesting a single JSON object
+    """
+    keys = ", ".join(f'"{key}"' for key in RULES_FIELDS.values())
+    return f"""Fill in the project-specific fields of a .cursor/rules file for the project above.
+
+Tech Stack: {frameworks_languages}
+
+Reply with only a JSON object with these string keys: {keys}.
+Each value must be a single short line (at most 20 words)."""
+
+
+def parse_json_object(text: str) -> Optional[dict]:
+    """Parse a JSON object from a model reply, tolerating code fences.
+
+    Args:
+        text: The raw model reply
+
+    Returns:
+        Optional[dict]: The parsed object, or None if there is none
+    """
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if not match:
+        return None
+    try:
+        value = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+    return value if isinstance(value, dict) else None
+
+
+def render_cursor_rules(fields: dict) -> str:
+    """Render the rules file from the model's field values.
+
+    Args:
+        fields: Mapping of RULES_FIELDS keys to values; missing or empty
+            values are rendered as MISSING_VALUE
+
+    Returns:
+        str: Content of the project's ``.cursor/rules`` file
+    """
+    values = {}
+    for key in RULES_FIELDS.values():
+        value = fields.get(key)
+        if isinstance(value, list):
+            value = ", ".join(str(item) for item in value)
+        value = " ".join(str(value or "").split())
+        values[key] = value or MISSING_VALUE
+    return _compiled_template().render(**values).strip()
@@ -0,0 +1,369 @@
+"""Full-text search over projects.
+
+On SQLite, projects are indexed in a contentless FTS5 virtual table: it
+stores only the index, not a copy of the texts, which stay compressed in
+the ``artifacts`` table. The application feeds it with the decompressed
+texts: projects written through the ORM are indexed after each flush and
+bulk inserts call :func:`update_search_index`. Highlights and snippets are
+cut in Python from the texts of the few projects returned.
+
+A contentless table cannot delete a document without its original text,
+so each project points to its current document through a small mapping
+table and reindexing a project adds a new document. Documents no longer
+mapped are ignored by searches and dropped by ``flask search --rebuild``.
+A trigger on plain columns unmaps deleted projects, so any connection,
+such as the sqlite3 shell or a backup script, can still write to
+``projects``; rows it inserts or edits are indexed by the next rebuild.
+Other databases fall back to a case-insensitive ``LIKE`` scan of the
+columns stored in the ``projects`` row.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Optional, Union
+
+from markupsafe import Markup, escape
+from sqlalchemy import (
+    Connection,
+    Engine,
+    column,
+    delete,
+    event,
+    insert,
+    inspect,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from src.models import ARTIFACT_FIELDS, Project
+
+FTS_TABLE = "projects_fts"
+
+# Table mapping each project to its current document in the FTS table
+FTS_DOCS_TABLE = "projects_fts_docs"
+
+# Indexed columns and their bm25 weights (matches in the name rank highest)
+FTS_COLUMNS = {
+    "name": 10.0,
+    "description": 5.0,
+    "refined_prompt": 1.0,
+    "frameworks_languages": 3.0,
+    "checklist_steps": 1.0,
+}
+
+# Projects (re)indexed per statement
+INDEX_BATCH_SIZE = 500
+
+# Words in a result snippet
+SNIPPET_WORDS = 24
+
+# Objects of earlier versions of the index, dropped when found
+_LEGACY_CONTENT_VIEW = "projects_fts_content"
+_LEGACY_TRIGGERS = ("ai", "au", "ad")
+
+_fts = table(FTS_TABLE, column("rowid"), *(column(name) for name in FTS_COLUMNS))
+_docs = table(FTS_DOCS_TABLE, column("docid"), column("project_id"))
+
+# Project attributes whose change requires reindexing the project
+_INDEXED_ATTRIBUTES = tuple(
+    f"{name}_id" if name in ARTIFACT_FIELDS else name for name in FTS_COLUMNS
+)
+
+
+@dataclass
+class SearchResult:
+    """A ranked search hit.
+
+    Attributes:
+        id: Project id
+        name: Project name with matched terms highlighted
+        snippet: Best-matching excerpt with matched terms highlighted
+        created_at: Timestamp when the project was created
+    """
+
+    id: int
+    name: Markup
+    snippet: Markup
+    created_at: datetime
+
+
+def _ddl() -> list[str]:
+    """Return the statements creating the FTS table, its mapping and trigger."""
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{', '.join(FTS_COLUMNS)}, content='', tokenize='porter unicode61')",
+        # AUTOINCREMENT keeps the ids of unmapped documents from being reused
+        f"CREATE TABLE IF NOT EXISTS {FTS_DOCS_TABLE} ("
+        f"docid INTEGER PRIMARY KEY AUTOINCREMENT, "
+        f"project_id INTEGER NOT NULL UNIQUE)",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_DOCS_TABLE}_ad AFTER DELETE ON projects "
+        f"BEGIN DELETE FROM {FTS_DOCS_TABLE} WHERE project_id = old.id; END",
+    ]
+
+
+def update_search_index(db: Union[Session, Connection], project_ids: Iterable[int]) -> None:
+    """Index the current texts of projects under new documents.
+
+    Args:
+        db: Database session or connection
+        project_ids: Projects to (re)index
+    """
+    bind = db.get_bind() if isinstance(db, Session) else db
+    ids = sorted(set(project_ids))
+    if not ids or bind.dialect.name != "sqlite":
+        return
+
+    for offset in range(0, len(ids), INDEX_BATCH_SIZE):
+        batch = ids[offset:offset + INDEX_BATCH_SIZE]
+        rows = db.execute(
+            select(Project.id, *(getattr(Project, name) for name in FTS_COLUMNS))
+            .where(Project.id.in_(batch))
+        ).mappings().all()
+        db.execute(delete(_docs).where(_docs.c.project_id.in_(batch)))
+        if not rows:
+            continue
+        db.execute(insert(_docs), [{"project_id": row["id"]} for row in rows])
+        docids = dict(db.execute(
+            select(_docs.c.project_id, _docs.c.docid).where(_docs.c.project_id.in_(batch))
+        ).all())
+        db.execute(insert(_fts), [
+            {"rowid": docids[row["id"]], **{name: row[name] for name in FTS_COLUMNS}}
+            for row in rows
+        ])
+
+
+@event.listens_for(Session, "after_flush")
+def _index_flushed_projects(db: Session, flush_context: Any) -> None:
+    """Reindex the projects inserted or edited by a flush."""
+    project_ids = [obj.id for obj in db.new if isinstance(obj, Project)]
+    for obj in db.dirty:
+        if isinstance(obj, Project):
+            attributes = inspect(obj).attrs
+            if any(attributes[name].history.has_changes() for name in _INDEXED_ATTRIBUTES):
+                project_ids.append(obj.id)
+    if project_ids:
+        update_search_index(db.connection(), project_ids)
+
+
+def ensure_search_index(engine: Engine) -> None:
+    """Create the FTS table, mapping and trigger, indexing existing rows if new.
+
+    An index left by an earlier version, which kept its own copy of the
+    texts or read them from the ``projects`` table, is dropped and rebuilt.
+
+    Args:
+        engine: Engine of the application database
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as connection:
+        definition = connection.scalar(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        )
+        if definition is not None and "content=''" not in definition:
+            drop_search_index(connection)
+            definition = None
+        for statement in _ddl():
+            connection.execute(text(statement))
+        if definition is None:
+            _rebuild(connection)
+
+
+def _rebuild(connection: Connection) -> None:
+    """Index every project, in batches walked by id."""
+    last_id = 0
+    while True:
+        project_ids = connection.scalars(
+            select(Project.id)
+            .where(Project.id > last_id)
+            .order_by(Project.id)
+            .limit(INDEX_BATCH_SIZE)
+        ).all()
+        if not project_ids:
+            break
+        update_search_index(connection, project_ids)
+        last_id = project_ids[-1]
+
+
+def drop_search_index(connection: Connection) -> None:
+    """Drop the FTS table, its mapping and triggers, including older versions'."""
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    connection.execute(text(f"DROP TABLE IF EXISTS {FTS_DOCS_TABLE}"))
+    connection.execute(text(f"DROP VIEW IF EXISTS {_LEGACY_CONTENT_VIEW}"))
+    connection.execute(text(f"DROP TRIGGER IF EXISTS {FTS_DOCS_TABLE}_ad"))
+    for trigger in _LEGACY_TRIGGERS:
+        connection.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}"))
+
+
+def rebuild_search_index(engine: Engine) -> None:
+    """Drop and rebuild the search index from the ``projects`` table.
+
+    Indexes the projects written by connections outside the application
+    and drops the documents of projects reindexed since the last rebuild.
+
+    Args:
+        engine: Engine of the application database
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    with engine.begin() as connection:
+        drop_search_index(connection)
+    ensure_search_index(engine)
+
+
+def _terms(query: str) -> list[str]:
+    """Split free text into search terms."""
+    return re.findall(r"\w+", query)
+
+
+def _match_expression(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query of prefix-matched terms.
+
+    Args:
+        query: Text typed by the user
+
+    Returns:
+        Optional[str]: The MATCH expression, or None if it has no terms
+    """
+    terms = _terms(query)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _highlighted(value: Optional[str], pattern: re.Pattern) -> Markup:
+    """Escape text and wrap the words matching ``pattern`` in ``<mark>``."""
+    value = value or ""
+    parts = []
+    position = 0
+    for match in pattern.finditer(value):
+        parts.append(escape(value[position:match.start()]))
+        parts.append(Markup("<mark>%s</mark>") % match.group())
+        position = match.end()
+    parts.append(escape(value[position:]))
+    return Markup("").join(parts)
+
+
+def _snippet(texts: dict[str, Optional[str]], pattern: re.Pattern) -> Markup:
+    """Cut the excerpt around the first match of the best-weighted text.
+
+    Args:
+        texts: Indexed texts of a project, by column
+        pattern: Pattern matching the search terms
+
+    Returns:
+        Markup: Excerpt of ``SNIPPET_WORDS`` words with matches highlighted,
+            or the start of the description if only the name matches
+    """
+    columns = sorted(
+        (name for name in FTS_COLUMNS if name != "name"),
+        key=FTS_COLUMNS.get,
+        reverse=True
+    )
+    for name in columns:
+        words = (texts[name] or "").split()
+        found = next(
+            (index for index, word in enumerate(words) if pattern.search(word)), None
+        )
+        if found is None:
+            continue
+        start = max(0, min(found - SNIPPET_WORDS // 4, len(words) - SNIPPET_WORDS))
+        end = start + SNIPPET_WORDS
+        excerpt = _highlighted(" ".join(words[start:end]), pattern)
+        return (
+            Markup("…" if start else "") + excerpt + Markup("…" if end < len(words) else "")
+        )
+    words = (texts["description"] or "").split()
+    return Markup(escape(" ".join(words[:SNIPPET_WORDS])))
+
+
+def search_projects(db: Session, query: str, limit: int = 20) -> list[SearchResult]:
+    """Search projects, best matches first.
+
+    Args:
+        db: Database session
+        query: Text typed by the user
+        limit: Maximum number of results
+
+    Returns:
+        list[SearchResult]: Ranked results with highlighted matches
+    """
+    match = _match_expression(query)
+    if match is None:
+        return []
+
+    if db.get_bind().dialect.name != "sqlite":
+        return _like_search(db, query, limit)
+
+    weights = ", ".join(str(weight) for weight in FTS_COLUMNS.values())
+    project_ids = db.scalars(
+        text(
+            f"SELECT d.project_id FROM {FTS_TABLE} "
+            f"JOIN {FTS_DOCS_TABLE} AS d ON d.docid = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH :match "
+            f"ORDER BY bm25({FTS_TABLE}, {weights}) "
+            f"LIMIT :limit"
+        ),
+        {"match": match, "limit": limit}
+    ).all()
+    if not project_ids:
+        return []
+
+    rows = {
+        row.id: row
+        for row in db.execute(
+            select(
+                Project.id,
+                Project.created_at,
+                *(getattr(Project, name) for name in FTS_COLUMNS)
+            ).where(Project.id.in_(project_ids))
+        )
+    }
+    pattern = re.compile(
+        r"\b(?:%s)\w*" % "|".join(re.escape(term) for term in _terms(query)), re.IGNORECASE
+    )
+    return [
+        SearchResult(
+            id=project_id,
+            name=_highlighted(rows[project_id].name, pattern),
+            snippet=_snippet(rows[project_id]._asdict(), pattern),
+            created_at=rows[project_id].created_at
+        )
+        for project_id in project_ids
+        if project_id in rows
+    ]
+
+
+def _like_search(db: Session, query: str, limit: int) -> list[SearchResult]:
+    """Fallback search for databases without FTS5.
+
+    Compressed artifacts cannot be matched in SQL, so only the columns
+    stored in the ``projects`` row are searched.
+    """
+    pattern = f"%{query.strip()}%"
+    rows = db.execute(
+        select(Project.id, Project.name, Project.description, Project.created_at)
+        .where(or_(*(
+            getattr(Project, column).ilike(pattern)
+            for column in FTS_COLUMNS
+            if column not in ARTIFACT_FIELDS
+        )))
+        .order_by(Project.created_at.desc())
+        .limit(limit)
+    )
+    return [
+        SearchResult(
+            id=row.id,
+            name=Markup(escape(row.name)),
+            snippet=Markup(escape((row.description or "")[:200])),
+            created_at=row.created_at
+        )
+        for row in rows
+    ]
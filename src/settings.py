@@ -0,0 +1,39 @@
+"""Settings read from the app config and the environment.
+
+Modules declare their tunables in a table of setting names and defaults,
+hold them in module constants and apply them in a ``configure(config)``
+function. ``create_app()`` calls every ``configure`` once ``.env`` is
+loaded, so values from the app config, ``.env`` or the environment all
+take effect however early a module was imported. Until then the constants
+hold their defaults.
+"""
+
+import os
+from typing import Any, Mapping, Optional
+
+
+def resolve_settings(
+    defaults: Mapping[str, Any], config: Optional[Mapping[str, Any]] = None
+) -> dict[str, Any]:
+    """Resolve settings from ``config``, the environment and their defaults.
+
+    Args:
+        defaults: Setting names and default values
+        config: Application config, if any
+
+    Returns:
+        dict[str, Any]: Every setting of ``defaults`` with its effective value,
+            converted to the type of its default
+    """
+    config = config or {}
+    return {
+        key: coerce_setting(config.get(key, os.getenv(key, default)), default)
+        for key, default in defaults.items()
+    }
+
+
+def coerce_setting(value: Any, default: Any) -> Any:
+    """Convert a config or environment value to the type of its default."""
+    if isinstance(default, bool) and isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return type(default)(value)
@@ -0,0 +1,320 @@
+"""Near-duplicate project detection with MinHash and locality-sensitive hashing.
+
+Each project's description and refined prompt are split into word
+shingles and summarized by a MinHash signature, whose agreement with
+another signature estimates the Jaccard similarity of the two shingle sets.
+The signature is cut into bands and every band is hashed into a bucket
+stored in ``project_lsh_buckets``; projects sharing a bucket with a query
+are the only candidates compared, so a lookup reads a handful of index
+entries instead of scanning every project.
+
+Signatures are written when a project is inserted or its refined prompt
+changes. ``flask similarity --backfill`` indexes projects created before
+the index existed.
+"""
+
+import hashlib
+import random
+import re
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Any, Iterable, Mapping, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.models import Conversation, Project, ProjectBucket, ProjectSignature
+from src.settings import resolve_settings
+
+# Signature layout: BANDS * ROWS_PER_BAND hash functions. Two projects become
+# candidates with probability 1 - (1 - s**ROWS_PER_BAND)**BANDS for a
+# similarity s, which is about 50% at s = 0.5 and over 99% at s = 0.8.
+BANDS = 16
+ROWS_PER_BAND = 4
+NUM_PERM = BANDS * ROWS_PER_BAND
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Estimated similarity at which projects are suggested for reuse, and how
+# many are suggested; applied by configure()
+SIMILARITY_SETTINGS = {
+    "SIMILARITY_THRESHOLD": 0.5,
+    "SIMILAR_PROJECTS_LIMIT": 3,
+}
+SIMILARITY_THRESHOLD = SIMILARITY_SETTINGS["SIMILARITY_THRESHOLD"]
+SIMILAR_PROJECTS_LIMIT = SIMILARITY_SETTINGS["SIMILAR_PROJECTS_LIMIT"]
+
+# Most candidates compared exactly per lookup, best bucket overlap first
+MAX_CANDIDATES = 50
+
+# Universal hash functions (a * x + b) mod a Mersenne prime, fixed by seed
+# so signatures stay comparable across processes and restarts
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)
+]
+_SIGNATURE_FORMAT = f"<{NUM_PERM}Q"
+
+# Labels every refined prompt contains; they would make all projects look alike
+_BOILERPLATE = re.compile(
+    r"^(Project|Description|Summary of the earlier conversation|"
+    r"Refined Requirements based on conversation|User requirement):",
+    re.MULTILINE,
+)
+
+
+def configure(config: Optional[Mapping[str, Any]] = None) -> None:
+    """Apply SIMILARITY_SETTINGS from ``config``, the environment and defaults.
+
+    Args:
+        config: Application config, if any
+    """
+    global SIMILARITY_THRESHOLD, SIMILAR_PROJECTS_LIMIT
+    settings = resolve_settings(SIMILARITY_SETTINGS, config)
+    SIMILARITY_THRESHOLD = settings["SIMILARITY_THRESHOLD"]
+    SIMILAR_PROJECTS_LIMIT = settings["SIMILAR_PROJECTS_LIMIT"]
+
+
+@dataclass
+class SimilarProject:
+    """An existing project close to a new one.
+
+    Attributes:
+        id: The project's id
+        name: The project's name
+        similarity: Estimated Jaccard similarity, between 0 and 1
+    """
+
+    id: int
+    name: str
+    similarity: float
+
+
+def project_text(description: Optional[str], refined_prompt: Optional[str]) -> str:
+    """Join the fields a project's signature is computed from."""
+    return f"{description or ''}\n{refined_prompt or ''}"
+
+
+def shingles(text: str) -> set[int]:
+    """Return the hashed word shingles of ``text``.
+
+    Args:
+        text: Any text
+
+    Returns:
+        set[int]: 32-bit hashes of every SHINGLE_SIZE-word sequence
+    """
+    words = re.findall(r"\w+", _BOILERPLATE.sub(" ", text).lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [
+            " ".join(words[index:index + SHINGLE_SIZE])
+            for index in range(len(words) - SHINGLE_SIZE + 1)
+        ]
+    return {zlib.crc32(gram.encode("utf-8")) for gram in grams}
+
+
+def signature(text: str) -> Optional[list[int]]:
+    """Compute the MinHash signature of ``text``.
+
+    Returns:
+        Optional[list[int]]: NUM_PERM minimum hash values, or None for text
+        without words
+    """
+    values = shingles(text)
+    if not values:
+        return None
+    return [min((a * value + b) % _PRIME for value in values) for a, b in _PERMUTATIONS]
+
+
+def bucket_keys(minhash: list[int]) -> list[int]:
+    """Hash each band of a signature into a signed 64-bit bucket key."""
+    keys = []
+    for band in range(BANDS):
+        rows = minhash[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            struct.pack(f"<I{ROWS_PER_BAND}Q", band, *rows), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def estimate_similarity(first: list[int], second: list[int]) -> float:
+    """Estimate the Jaccard similarity of two signatures."""
+    return sum(a == b for a, b in zip(first, second)) / NUM_PERM
+
+
+def index_projects(
+    db: Session, rows: Iterable[tuple[int, Optional[str], Optional[str]]]
+) -> int:
+    """Store the signatures and buckets of projects, replacing old entries.
+
+    The caller commits.
+
+    Args:
+        db: Database session
+        rows: ``(id, description, refined_prompt)`` of each project
+
+    Returns:
+        int: Number of projects indexed
+    """
+    signatures = []
+    buckets = []
+    project_ids = []
+    for project_id, description, refined_prompt in rows:
+        project_ids.append(project_id)
+        minhash = signature(project_text(description, refined_prompt))
+        if minhash is None:
+            continue
+        signatures.append({
+            "project_id": project_id,
+            "minhash": struct.pack(_SIGNATURE_FORMAT, *minhash),
+        })
+        buckets.extend(
+            {"bucket": key, "project_id": project_id} for key in set(bucket_keys(minhash))
+        )
+
+    if project_ids:
+        db.execute(delete(ProjectBucket).where(ProjectBucket.project_id.in_(project_ids)))
+        db.execute(
+            delete(ProjectSignature).where(ProjectSignature.project_id.in_(project_ids))
+        )
+    if signatures:
+        db.execute(insert(ProjectSignature), signatures)
+        db.execute(insert(ProjectBucket), buckets)
+    return len(signatures)
+
+
+def index_project(db: Session, project: Project) -> None:
+    """Store the signature of a single project (the caller commits)."""
+    index_projects(db, [(project.id, project.description, project.refined_prompt)])
+
+
+def find_similar(
+    db: Session,
+    description: Optional[str],
+    refined_prompt: Optional[str],
+    limit: Optional[int] = None,
+    threshold: Optional[float] = None,
+) -> list[SimilarProject]:
+    """Find the existing projects most similar to a description and prompt.
+
+    Args:
+        db: Database session
+        description: Description of the new project
+        refined_prompt: Refined prompt of the new project
+        limit: Most projects to return (default: SIMILAR_PROJECTS_LIMIT)
+        threshold: Lowest estimated similarity to return (default:
+            SIMILARITY_THRESHOLD)
+
+    Returns:
+        list[SimilarProject]: Matches, most similar first
+    """
+    limit = SIMILAR_PROJECTS_LIMIT if limit is None else limit
+    threshold = SIMILARITY_THRESHOLD if threshold is None else threshold
+    minhash = signature(project_text(description, refined_prompt))
+    if minhash is None:
+        return []
+
+    # Candidates share at least one band bucket with the query
+    shared = func.count().label("shared")
+    candidate_ids = db.scalars(
+        select(ProjectBucket.project_id)
+        .where(ProjectBucket.bucket.in_(bucket_keys(minhash)))
+        .group_by(ProjectBucket.project_id)
+        .order_by(shared.desc())
+        .limit(MAX_CANDIDATES)
+    ).all()
+    if not candidate_ids:
+        return []
+
+    matches = []
+    for project_id, name, packed in db.execute(
+        select(Project.id, Project.name, ProjectSignature.minhash)
+        .join(ProjectSignature, ProjectSignature.project_id == Project.id)
+        .where(Project.id.in_(candidate_ids))
+    ):
+        similarity = estimate_similarity(
+            minhash, list(struct.unpack(_SIGNATURE_FORMAT, packed))
+        )
+        if similarity >= threshold:
+            matches.append(SimilarProject(id=project_id, name=name, similarity=similarity))
+    matches.sort(key=lambda match: match.similarity, reverse=True)
+    return matches[:limit]
+
+
+def backfill_signatures(db: Session, rebuild: bool = False, batch_size: int = 1000) -> int:
+    """Index the projects that have no signature yet.
+
+    Args:
+        db: Database session
+        rebuild: Drop the whole index first and index every project
+        batch_size: Projects indexed per transaction
+
+    Returns:
+        int: Number of projects indexed
+    """
+    if rebuild:
+        db.execute(delete(ProjectBucket))
+        db.execute(delete(ProjectSignature))
+        db.commit()
+
+    indexed = 0
+    last_id = 0
+    while True:
+        # Walk the projects by id so each batch is an index range scan
+        rows = db.execute(
+            select(Project.id, Project.description, Project.refined_prompt)
+            .outerjoin(ProjectSignature, ProjectSignature.project_id == Project.id)
+            .where(Project.id > last_id, ProjectSignature.project_id.is_(None))
+            .order_by(Project.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return indexed
+        indexed += index_projects(db, rows)
+        db.commit()
+        last_id = rows[-1][0]
+
+
+def clone_project(
+    db: Session, conversation: Conversation, refined_prompt: str, source: Project
+) -> Optional[Project]:
+    """Create a conversation's project with the artifacts of a similar one.
+
+    No model call is made; the new project can be refined afterwards with
+    per-artifact regeneration.
+
+    Args:
+        db: Database session
+        conversation: The approved conversation, deleted once the project exists
+        refined_prompt: The compiled refined prompt of the conversation
+        source: The project whose artifacts are copied
+
+    Returns:
+        Optional[Project]: The new project, or None if a project with its name
+            was created meanwhile (the session is rolled back)
+    """
+    project = Project(
+        name=conversation.project_name,
+        description=conversation.project_description,
+        refined_prompt=refined_prompt,
+        frameworks_languages=source.frameworks_languages,
+        checklist_steps=source.checklist_steps,
+        cursor_rules_content=source.cursor_rules_content,
+    )
+    try:
+        db.add(project)
+        db.flush()
+        index_project(db, project)
+        db.delete(conversation)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return project
@@ -0,0 +1,88 @@
+"""Out-of-row storage of large project texts.
+
+A project's refined prompt, checklist and Cursor rules live in the
+``artifacts`` table, compressed and keyed by a hash of their text, and the
+``projects`` row only holds the three keys. Listing and scanning projects
+then reads small rows, identical texts (cloned or regenerated projects) are
+stored once, and each text is only decompressed when it is read.
+
+Databases created before the artifacts table kept the texts inline; the
+initial schema migration moves them out of row, so ``flask db --upgrade``
+converts them. :func:`prune_artifacts` removes texts no project refers to
+anymore.
+"""
+
+from typing import Optional
+
+from sqlalchemy import delete, func, select, union
+from sqlalchemy.orm import Session
+
+from src.models import ARTIFACT_FIELDS, Artifact, Project, store_artifacts
+
+
+def store_project_texts(db: Session, rows: list[dict]) -> list[dict]:
+    """Store the artifacts of project rows meant for a bulk ``insert(Project)``.
+
+    Args:
+        db: Database session
+        rows: Column values keyed by name, with the texts under their field names
+
+    Returns:
+        list[dict]: The rows with each text replaced by its artifact id
+    """
+    store_artifacts(db, (row.get(field) for row in rows for field in ARTIFACT_FIELDS))
+    converted = []
+    for row in rows:
+        values = {key: value for key, value in row.items() if key not in ARTIFACT_FIELDS}
+        for field in ARTIFACT_FIELDS:
+            content = row.get(field)
+            values[f"{field}_id"] = None if content is None else Artifact.key(content)
+        converted.append(values)
+    return converted
+
+
+def prune_artifacts(db: Session) -> int:
+    """Delete the artifacts no project refers to.
+
+    Artifacts are left behind when a project is deleted or one of its texts
+    is replaced, since another project may share them.
+
+    Args:
+        db: Database session
+
+    Returns:
+        int: Number of artifacts deleted
+    """
+    referenced = union(*(
+        select(getattr(Project, f"{field}_id")).where(
+            getattr(Project, f"{field}_id").is_not(None)
+        )
+        for field in ARTIFACT_FIELDS
+    ))
+    removed = db.execute(delete(Artifact).where(Artifact.id.not_in(referenced))).rowcount
+    db.commit()
+    return removed
+
+
+def storage_stats(db: Session) -> dict[str, Optional[object]]:
+    """Summarize the artifacts table.
+
+    Args:
+        db: Database session
+
+    Returns:
+        dict: Artifact count, text and stored sizes, and the compression ratio
+    """
+    count, text_bytes, stored_bytes = db.execute(
+        select(
+            func.count(),
+            func.coalesce(func.sum(Artifact.size), 0),
+            func.coalesce(func.sum(func.length(Artifact.__table__.c.content)), 0),
+        )
+    ).one()
+    return {
+        "artifacts": count,
+        "text_bytes": text_bytes,
+        "stored_bytes": stored_bytes,
+        "compression_ratio": round(text_bytes / stored_bytes, 2) if stored_bytes else None,
+    }
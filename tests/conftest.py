@@ -0,0 +1,69 @@
+"""Shared fixtures: the app on a throwaway SQLite database and a fake model."""
+
+import os
+import tempfile
+import time
+from typing import Callable, Iterator
+
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+import pytest  # noqa: E402
+from flask import Flask  # noqa: E402
+from flask.testing import FlaskClient  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from benchmarks.fake_genai import FakeModel, patched_model  # noqa: E402
+from src.app import create_app  # noqa: E402
+from src.database import SessionLocal, init_db  # noqa: E402
+from src.jobs import FAILED, SUCCEEDED  # noqa: E402
+from src.models import Base  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def app() -> Flask:
+    """Create the schema once and the app bound to it."""
+    init_db()
+    # The suite makes more model calls a minute than the default limits allow
+    return create_app({
+        "TESTING": True, "GEMINI_REQUESTS_PER_MINUTE": 0, "GEMINI_TOKENS_PER_MINUTE": 0,
+    })
+
+
+@pytest.fixture
+def client(app: Flask) -> FlaskClient:
+    """Test client of the app."""
+    return app.test_client()
+
+
+@pytest.fixture
+def db(app: Flask) -> Iterator[Session]:
+    """Session on the test database, emptied after each test."""
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    for table in reversed(Base.metadata.sorted_tables):
+        session.execute(table.delete())
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def fake_model() -> Iterator[FakeModel]:
+    """Answer every model call with an instant fake reply."""
+    with patched_model(FakeModel()) as model:
+        yield model
+
+
+@pytest.fixture
+def wait_for_job(client: FlaskClient) -> Callable[[int], dict]:
+    """Poll a generation job until it succeeds or fails."""
+    def wait(job_id: int, timeout: float = 10.0) -> dict:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            payload = client.get(f"/jobs/{job_id}/status").get_json()
+            if payload["status"] in (SUCCEEDED, FAILED):
+                return payload
+            time.sleep(0.02)
+        raise AssertionError(f"Job {job_id} did not finish within {timeout}s")
+
+    return wait
@@ -0,0 +1,73 @@
+"""Tests for bulk project import."""
+
+import pytest
+from sqlalchemy import func, select
+
+from src.archive import ImportConflictError, import_records
+from src.models import Project, ProjectSignature
+from src.similarity import backfill_signatures
+
+
+@pytest.fixture
+def existing(db) -> Project:
+    project = Project(name="Alpha", description="Original description")
+    db.add(project)
+    db.commit()
+    return project
+
+
+def _records() -> list[dict]:
+    return [
+        {"name": "Alpha", "description": "Imported description"},
+        {"name": "Beta", "description": "A new project"},
+    ]
+
+
+def _descriptions(db) -> dict[str, str]:
+    return dict(db.execute(select(Project.name, Project.description)).all())
+
+
+def test_skip_keeps_existing_project(db, existing):
+    counts = import_records(db, _records(), on_conflict="skip")
+
+    assert counts == {"imported": 1, "skipped": 1, "renamed": 0, "replaced": 0}
+    assert _descriptions(db) == {"Alpha": "Original description", "Beta": "A new project"}
+
+
+def test_rename_imports_under_a_free_name(db, existing):
+    counts = import_records(db, _records(), on_conflict="rename")
+
+    assert counts["renamed"] == 1
+    assert _descriptions(db) == {
+        "Alpha": "Original description",
+        "Alpha (2)": "Imported description",
+        "Beta": "A new project",
+    }
+
+
+def test_replace_overwrites_existing_project(db, existing):
+    counts = import_records(db, _records(), on_conflict="replace")
+
+    assert counts["replaced"] == 1
+    assert _descriptions(db) == {"Alpha": "Imported description", "Beta": "A new project"}
+
+
+def test_replace_keeps_last_duplicate_of_a_batch(db):
+    records = [{"name": "Gamma", "description": "first"}, {"name": "Gamma", "description": "second"}]
+    import_records(db, records, on_conflict="replace")
+
+    assert _descriptions(db) == {"Gamma": "second"}
+
+
+def test_fail_rolls_back_the_import(db, existing):
+    with pytest.raises(ImportConflictError):
+        import_records(db, _records(), on_conflict="fail")
+
+    assert _descriptions(db) == {"Alpha": "Original description"}
+
+
+def test_import_without_index_is_backfilled_later(db):
+    import_records(db, _records(), index=False)
+    assert db.scalar(select(func.count()).select_from(ProjectSignature)) == 0
+
+    assert backfill_signatures(db) == 2
@@ -0,0 +1,71 @@
+"""Tests for fingerprinted, precompressed static assets."""
+
+import gzip
+import re
+
+import pytest
+from flask import Flask, url_for
+
+from src.assets import ASSET_MAX_AGE, build_assets, init_app, minify_css
+
+STYLE = "body {\n    color: #333;  /* text */\n}\n" * 20
+
+
+@pytest.fixture
+def static_app(tmp_path) -> Flask:
+    """App serving a static folder of its own."""
+    (tmp_path / "style.css").write_text(STYLE)
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path="/static")
+    init_app(app)
+    return app
+
+
+def _style_url(app: Flask) -> str:
+    with app.test_request_context():
+        return url_for("static", filename="style.css")
+
+
+def test_unbuilt_assets_are_served_as_they_are(static_app):
+    assert _style_url(static_app) == "/static/style.css"
+
+    response = static_app.test_client().get("/static/style.css")
+
+    assert response.get_data(as_text=True) == STYLE
+    assert "immutable" not in response.headers.get("Cache-Control", "")
+
+
+def test_built_asset_has_a_fingerprinted_url(static_app):
+    build_assets(static_app.static_folder)
+    init_app(static_app)
+    url = _style_url(static_app)
+
+    assert re.fullmatch(r"/static/dist/style\.[0-9a-f]{12}\.css", url)
+
+    with open(f"{static_app.static_folder}/style.css", "a") as style:
+        style.write("p {margin: 0}")
+    build_assets(static_app.static_folder)
+    init_app(static_app)
+    # A changed file gets a new URL
+    assert _style_url(static_app) != url
+
+
+def test_built_asset_is_cached_forever_and_precompressed(static_app):
+    build_assets(static_app.static_folder)
+    init_app(static_app)
+    client = static_app.test_client()
+    url = _style_url(static_app)
+
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+
+    for response in (compressed, plain):
+        assert response.status_code == 200
+        assert response.cache_control.public
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == ASSET_MAX_AGE
+        assert "Accept-Encoding" in response.vary
+        assert response.mimetype == "text/css"
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data).decode() == minify_css(STYLE)
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_data(as_text=True) == minify_css(STYLE)
@@ -0,0 +1,138 @@
+"""Tests for the prompt refinement chat."""
+
+from unittest import mock
+
+from sqlalchemy import select
+
+from src import conversation
+from src.conversation import get_history, prepare_context
+from src.models import Conversation
+
+
+def _start_chat(client) -> None:
+    client.post("/create_project", data={
+        "action": "start_chat", "name": "Chat", "description": "A refined project.",
+    })
+
+
+def _send(client, message: str) -> None:
+    client.post("/create_project", data={"action": "send_message", "message": message})
+
+
+def test_each_turn_costs_one_upstream_call(client, db, fake_model):
+    _start_chat(client)
+    seeded = []
+    start_chat = fake_model.start_chat
+
+    def recording_start_chat(history=None):
+        seeded.append(list(history or []))
+        return start_chat(history)
+
+    with mock.patch.object(fake_model, "start_chat", side_effect=recording_start_chat):
+        for turn in range(5):
+            calls = fake_model.calls
+            _send(client, f"Requirement {turn}.")
+            assert fake_model.calls == calls + 1
+
+    # Earlier turns travel as seeded history, not as extra calls
+    assert [len(seeded[turn + 1]) - len(seeded[turn]) for turn in range(4)] == [2] * 4
+    assert {"role": "user", "parts": ["Requirement 3."]} in seeded[-1]
+
+
+def _stream(client, message: str) -> str:
+    response = client.post("/create_project/stream", json={"message": message})
+    assert response.mimetype == "text/event-stream"
+    return response.get_data(as_text=True)
+
+
+def _history(db) -> list[dict]:
+    conversation = db.scalar(select(Conversation))
+    return get_history(db, conversation.id)
+
+
+def test_streamed_reply_is_stored_once_complete(client, db, fake_model):
+    _start_chat(client)
+    fake_model.reply = "A streamed reply."
+
+    body = _stream(client, "Stream it.")
+
+    assert body.count("event: token") == 3
+    assert 'event: done\ndata: {"content": "A streamed reply."}' in body
+    assert _history(db)[-2:] == [
+        {"role": "user", "content": "Stream it."},
+        {"role": "assistant", "content": "A streamed reply."},
+    ]
+
+
+def test_failed_stream_stores_nothing(client, db, fake_model):
+    _start_chat(client)
+    stored = _history(db)
+    # End the read transaction so the check below sees new rows
+    db.commit()
+
+    def fail(prompt: str) -> str:
+        raise ValueError("stream failed")
+
+    fake_model.responder = fail
+    body = _stream(client, "Stream it.")
+
+    assert "event: error" in body
+    assert "event: done" not in body
+    assert _history(db) == stored
+
+
+def test_history_is_reloaded_from_the_database(app, client, db, fake_model):
+    _start_chat(client)
+    _send(client, "Use Flask.")
+    with client.session_transaction() as cookie:
+        # The cookie only points at the stored conversation
+        assert list(cookie) == ["conversation_id"]
+        conversation_id = cookie["conversation_id"]
+
+    other = app.test_client()
+    with other.session_transaction() as cookie:
+        cookie["conversation_id"] = conversation_id
+    with mock.patch.object(fake_model, "start_chat", wraps=fake_model.start_chat) as start_chat:
+        _send(other, "Add a REST API.")
+
+    assert {"role": "user", "parts": ["Use Flask."]} in start_chat.call_args.kwargs["history"]
+    assert [message["content"] for message in _history(db)[-4:]] == [
+        "Use Flask.", "Fake reply.", "Add a REST API.", "Fake reply.",
+    ]
+    assert "Add a REST API." in client.get("/create_project").get_data(as_text=True)
+
+
+def test_compaction_keeps_the_context_within_budget(client, db, fake_model, monkeypatch):
+    monkeypatch.setattr(conversation, "CONTEXT_TOKEN_BUDGET", 300)
+    monkeypatch.setattr(conversation, "CONTEXT_RECENT_TOKENS", 120)
+    summaries = []
+
+    def respond(prompt: str) -> str:
+        if prompt.startswith("Summarize"):
+            summaries.append(prompt)
+            return f"Summary {len(summaries)}."
+        return "A long reply asking about the requirements. " * 5
+
+    fake_model.responder = respond
+    contexts = []
+
+    def recording_prepare_context(db, conversation_id):
+        contexts.append(prepare_context(db, conversation_id))
+        return contexts[-1]
+
+    _start_chat(client)
+    with mock.patch("src.routes.prepare_context", side_effect=recording_prepare_context):
+        for turn in range(12):
+            _send(client, f"Requirement {turn}.")
+
+    assert all(context.tokens <= 300 for context in contexts)
+    # Compaction runs once every few turns, not on every one
+    assert 0 < len(summaries) < len(contexts) / 2
+    assert contexts[-1].summary == f"Summary {len(summaries)}."
+    # The recent turns are sent verbatim, starting with a user message
+    history = _history(db)
+    recent = contexts[-1].messages
+    assert recent[0]["role"] == "user"
+    assert recent == history[len(history) - 2 - len(recent):-2]
+    # The stored transcript keeps every message
+    assert len(history) == 2 * 13
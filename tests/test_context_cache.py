@@ -0,0 +1,58 @@
+"""Tests for caching the refined prompt shared by generation stages."""
+
+from benchmarks.fake_genai import FakeModel, patched_model
+from src import context_cache
+from src.context_cache import TokenUsage, min_cache_tokens
+from src.gemini_config import generate_project_data
+from src.llm_client import CHARS_PER_TOKEN
+
+MODEL_NAME = "models/gemini-2.5-flash"
+
+
+def _refined_prompt(tokens: int) -> str:
+    """Return a refined prompt of at least ``tokens`` estimated tokens."""
+    words = tokens * CHARS_PER_TOKEN // len("requirement ") + 1
+    return "Project: Cached\nDescription: " + "requirement " * words
+
+
+def test_minimum_follows_the_model():
+    assert min_cache_tokens(MODEL_NAME) == 1024
+    assert min_cache_tokens("gemini-2.5-pro") == 4096
+    assert min_cache_tokens("gemini-1.5-flash-002") == 32768
+
+
+def test_setting_overrides_the_model_minimum(monkeypatch):
+    monkeypatch.setattr(context_cache, "CONTEXT_CACHE_MIN_TOKENS", 100)
+
+    assert min_cache_tokens(MODEL_NAME) == 100
+
+
+def test_prefix_is_cached_once_and_read_by_every_stage(db):
+    refined_prompt = _refined_prompt(2000)
+    usage = TokenUsage()
+    model = FakeModel(context_caching=True, model_name=MODEL_NAME)
+
+    with patched_model(model):
+        data = generate_project_data(refined_prompt, bypass_cache=True, usage=usage, mode="staged")
+
+    assert all(data.values())
+    assert model.cache_writes == 1
+    assert model.calls == 3
+    # Every stage sent only its instruction and read the prefix from the cache
+    assert not any(refined_prompt in prompt for prompt, _, _ in model.spans)
+    assert model.cached_tokens == 3 * model.cache_write_tokens
+    assert usage.cached_tokens == model.cached_tokens
+    assert usage.saved_tokens > 0
+    assert model.cache_deletes == 1
+
+
+def test_prefix_below_the_model_minimum_is_sent_whole(db):
+    refined_prompt = _refined_prompt(500)
+    model = FakeModel(context_caching=True, model_name=MODEL_NAME)
+
+    with patched_model(model):
+        generate_project_data(refined_prompt, bypass_cache=True, mode="staged")
+
+    assert model.cache_writes == 0
+    assert model.cached_tokens == 0
+    assert all(refined_prompt in prompt for prompt, _, _ in model.spans)
@@ -0,0 +1,46 @@
+"""Tests for the engine setup and the per-request session."""
+
+from sqlalchemy import text
+
+from src.database import get_db, get_engine
+
+
+def _pragma(connection, name: str):
+    return connection.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_connections_get_the_pragmas(app):
+    with get_engine().connect() as connection:
+        assert _pragma(connection, "journal_mode") == "wal"
+        assert _pragma(connection, "synchronous") == 1  # NORMAL
+        assert _pragma(connection, "busy_timeout") == 15000
+        assert _pragma(connection, "cache_size") == -20000
+        assert _pragma(connection, "temp_store") == 2  # MEMORY
+        assert _pragma(connection, "foreign_keys") == 1
+
+
+def test_session_is_shared_within_a_context_and_removed_after_it(app):
+    pool = get_engine().pool
+    checked_out = pool.checkedout()
+
+    with app.app_context():
+        db = get_db()
+        assert get_db() is db
+        db.execute(text("SELECT 1"))
+        assert db.in_transaction()
+        assert pool.checkedout() == checked_out + 1
+
+    # Teardown closed the session and returned its connection
+    assert not db.in_transaction()
+    assert pool.checkedout() == checked_out
+    with app.app_context():
+        assert get_db() is not db
+
+
+def test_request_returns_its_connection(client, db):
+    pool = get_engine().pool
+    checked_out = pool.checkedout()
+
+    assert client.get("/projects").status_code == 200
+
+    assert pool.checkedout() == checked_out
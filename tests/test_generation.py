@@ -0,0 +1,144 @@
+"""Tests for project generation against the fake model."""
+
+import json
+import threading
+from unittest import mock
+
+import pytest
+
+from benchmarks.fake_genai import FakeModel, patched_model
+from src import gemini_config
+from src.gemini_config import GenerationError, generate_project_data
+
+PROMPT = "Project: Test\nDescription: A project generated by the tests."
+
+LATENCY = 0.2
+
+FRAMEWORKS = "suggest the most appropriate coding frameworks"
+
+CHECKLIST = "development checklist"
+
+
+def _failing_on(marker: str, model_reply=None):
+    """Build a responder raising for prompts containing ``marker``."""
+    def respond(prompt: str) -> str:
+        if marker in prompt:
+            raise ValueError(f"stage failed: {marker}")
+        return model_reply(prompt) if model_reply else FakeModel().respond(prompt)
+
+    return respond
+
+
+@pytest.fixture(autouse=True)
+def warm_up(db):
+    """Import what the first generation loads lazily, outside the timings."""
+    with patched_model(FakeModel()):
+        generate_project_data(PROMPT, bypass_cache=True)
+
+
+def _span(model: FakeModel, marker: str) -> list:
+    """Return the recorded call whose prompt contains ``marker``."""
+    (span,) = [span for span in model.spans if marker in span[0]]
+    return span
+
+
+def test_concurrent_stages_overlap(db):
+    with patched_model(FakeModel(latency=LATENCY)) as model:
+        data = generate_project_data(PROMPT, bypass_cache=True, mode="staged")
+
+    assert model.calls == 3
+    assert all(data.values())
+    _, frameworks_start, frameworks_end = _span(model, FRAMEWORKS)
+    _, checklist_start, checklist_end = _span(model, CHECKLIST)
+    _, rules_start, _ = _span(model, "JSON object")
+    # The checklist runs alongside frameworks; the rules need the frameworks
+    assert checklist_start < frameworks_end and frameworks_start < checklist_end
+    assert rules_start >= frameworks_end
+
+
+def test_failed_stage_leaves_only_its_field_empty(db):
+    with patched_model(FakeModel(responder=_failing_on(CHECKLIST))):
+        data = generate_project_data(PROMPT, bypass_cache=True, mode="staged")
+
+    assert data["checklist_steps"] is None
+    assert data["frameworks_languages"]
+    assert data["cursor_rules_content"]
+
+
+def test_timed_out_stage_is_abandoned(db):
+    release = threading.Event()
+
+    def stuck_checklist(prompt: str) -> str:
+        if CHECKLIST in prompt:
+            release.wait(10)
+        return FakeModel().respond(prompt)
+
+    try:
+        with patched_model(FakeModel(responder=stuck_checklist)) as model:
+            data = generate_project_data(
+                PROMPT, stage_timeout=0.2, bypass_cache=True, mode="staged"
+            )
+        # The result came back while the checklist call was still running
+        assert _span(model, CHECKLIST)[2] is None
+    finally:
+        release.set()
+
+    assert data["checklist_steps"] is None
+    assert data["frameworks_languages"]
+
+
+def test_every_stage_failing_raises(db):
+    with patched_model(FakeModel(responder=_failing_on("project"))):
+        with pytest.raises(GenerationError):
+            generate_project_data(PROMPT, bypass_cache=True, mode="staged")
+
+
+def test_single_mode_repairs_only_invalid_fields(db):
+    def without_checklist(prompt: str) -> str:
+        reply = FakeModel().respond(prompt)
+        if "Plan the software project" in prompt:
+            document = json.loads(reply)
+            del document["checklist_steps"]
+            reply = json.dumps(document)
+        return reply
+
+    with patched_model(FakeModel(responder=without_checklist)) as model:
+        data = generate_project_data(PROMPT, bypass_cache=True, mode="single")
+
+    assert all(data.values())
+    # The JSON document, then the checklist stage alone
+    assert model.calls == 2
+
+
+def test_single_mode_failure_reports_the_json_call(db):
+    with patched_model(FakeModel(responder=_failing_on("project"))):
+        with pytest.raises(GenerationError, match="project_data: stage failed"):
+            generate_project_data(PROMPT, bypass_cache=True, mode="single")
+
+
+def test_mode_is_chosen_by_the_app_config(app, db):
+    gemini_config.configure({**app.config, "GEMINI_GENERATION_MODE": "single"})
+    try:
+        with patched_model(FakeModel()) as model:
+            generate_project_data(PROMPT, bypass_cache=True)
+    finally:
+        gemini_config.configure(app.config)
+
+    assert model.calls == 1
+    assert "Plan the software project" in model.spans[0][0]
+
+
+def test_unknown_configured_mode_is_rejected():
+    with pytest.raises(ValueError, match="GEMINI_GENERATION_MODE"):
+        gemini_config.configure({"GEMINI_GENERATION_MODE": "batch"})
+
+
+def test_rules_stage_fails_on_a_cached_reply_that_is_not_json(db):
+    with (
+        patched_model(FakeModel()),
+        mock.patch("src.gemini_config._cached_stage", return_value="Not JSON."),
+    ):
+        data = generate_project_data(PROMPT, mode="staged")
+
+    assert data["frameworks_languages"] == "Not JSON."
+    assert data["cursor_rules_content"] is None
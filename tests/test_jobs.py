@@ -0,0 +1,119 @@
+"""Tests for the generation job queue."""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from src import jobs
+from src.jobs import (
+    FAILED,
+    JOB_STALE_SECONDS,
+    PENDING,
+    RUNNING,
+    SUCCEEDED,
+    claim_job,
+    resume_jobs,
+    run_job,
+)
+from src.models import Conversation, GenerationJob, Project
+
+
+def _job(name: str, status: str = PENDING, started_ago: float = 0) -> GenerationJob:
+    """Build a job as left in the database by a previous process."""
+    return GenerationJob(
+        project_name=name,
+        refined_prompt=f"Project: {name}\nDescription: A test project.",
+        status=status,
+        started_at=datetime.utcnow() - timedelta(seconds=started_ago) if status == RUNNING else None,
+    )
+
+
+def test_approved_prompt_goes_through_the_job_lifecycle(client, db, fake_model, wait_for_job):
+    client.post("/create_project", data={
+        "action": "start_chat", "name": "Lifecycle", "description": "A queued project.",
+    })
+    client.post("/create_project", data={"action": "send_message", "message": "Use Flask."})
+    response = client.post("/create_project", data={"action": "approve_prompt", "generate": "1"})
+
+    assert "/jobs/" in response.headers["Location"]
+    job_id = int(response.headers["Location"].rstrip("/").rsplit("/", 1)[1])
+    payload = wait_for_job(job_id)
+
+    assert payload["status"] == SUCCEEDED
+    project = db.scalar(select(Project).where(Project.name == "Lifecycle"))
+    assert payload["project_url"] == f"/project/{project.id}"
+    assert project.checklist_steps and project.cursor_rules_content
+    # The conversation is dropped once its project exists
+    assert db.scalar(select(func.count()).select_from(Conversation)) == 0
+    assert client.get(f"/jobs/{job_id}").status_code == 302
+
+
+def test_job_states(db, fake_model):
+    job = _job("States")
+    db.add(job)
+    db.commit()
+
+    assert claim_job(db) == job.id
+    db.refresh(job)
+    assert job.status == RUNNING and job.started_at is not None
+    # A claimed job cannot be claimed again
+    assert claim_job(db, job.id) is None
+
+    run_job(job.id)
+    db.refresh(job)
+    assert job.status == SUCCEEDED and job.finished_at is not None
+    assert job.project_id is not None
+
+
+def test_job_for_existing_name_fails(db, fake_model):
+    db.add(Project(name="Taken"))
+    job = _job("Taken")
+    db.add(job)
+    db.commit()
+
+    run_job(claim_job(db, job.id))
+    db.refresh(job)
+    assert job.status == FAILED
+    assert job.error == "Project 'Taken' already exists."
+
+
+def test_first_request_resumes_jobs_left_by_previous_process(
+    client, db, fake_model, wait_for_job, monkeypatch
+):
+    pending = _job("Left pending")
+    stale = _job("Left running", RUNNING, started_ago=JOB_STALE_SECONDS + 60)
+    db.add_all([pending, stale])
+    db.commit()
+
+    # As after a restart: nothing has been submitted in this process yet
+    monkeypatch.setattr(jobs, "_sweeper_pid", None)
+    client.get("/projects")
+
+    for job in (pending, stale):
+        payload = wait_for_job(job.id)
+        assert payload["status"] == SUCCEEDED
+
+
+def test_resume_jobs_leaves_recently_started_jobs_running(db, fake_model, wait_for_job):
+    running = _job("Still running", RUNNING, started_ago=5)
+    pending = _job("Queued")
+    db.add_all([running, pending])
+    db.commit()
+
+    assert resume_jobs(db) == 1
+    assert wait_for_job(pending.id)["status"] == SUCCEEDED
+    db.refresh(running)
+    assert running.status == RUNNING
+
+
+def test_job_is_submitted_once(db, monkeypatch):
+    submitted = []
+    monkeypatch.setattr(jobs._inline_executor, "submit", lambda *args: submitted.append(args))
+    db.add(_job("Queued once"))
+    db.commit()
+
+    resume_jobs(db)
+    resume_jobs(db)
+
+    assert len(submitted) == 1
+    jobs._submitted.clear()
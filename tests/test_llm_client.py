@@ -0,0 +1,155 @@
+"""Tests for the rate limits, retries and circuit breaker of model calls."""
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from src.gemini_config import transient_errors
+from src.llm_client import CircuitBreaker, LLMClient, TokenBucket, UpstreamUnavailableError
+
+
+class FakeClock:
+    """Clock whose sleeps advance it instantly."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _flaky(errors: list[Exception]):
+    """Build a call raising ``errors`` in turn, then returning "ok"."""
+    def call() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    return call
+
+
+def test_bucket_waits_for_tokens_to_accrue():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, refill_per_second=1, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() and bucket.acquire()
+    assert clock.sleeps == []
+    assert bucket.acquire()
+
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_bucket_gives_up_at_the_timeout():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=1, refill_per_second=0.1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()
+
+    assert not bucket.acquire(timeout=2)
+    assert clock.now == pytest.approx(2.0)
+
+
+def test_breaker_opens_then_lets_one_trial_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only the trial call goes through until it reports back
+    assert not breaker.allow()
+
+
+def test_failed_trial_reopens_and_successful_trial_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+    breaker.record_failure()
+
+    clock.now += 30
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+    clock.now += 30
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_client_retries_rate_limited_calls():
+    clock = FakeClock()
+    client = LLMClient(
+        requests_per_minute=0, tokens_per_minute=0, max_retries=3,
+        transient_errors=transient_errors, sleep=clock.sleep,
+    )
+    call = _flaky([
+        google_exceptions.TooManyRequests("429"),
+        google_exceptions.ResourceExhausted("quota exceeded"),
+    ])
+
+    assert client.call(call) == "ok"
+    assert client.stats()["calls"] == 3
+    assert client.stats()["retries"] == 2
+    assert len(clock.sleeps) == 2
+    assert client.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_gives_up_after_the_retries():
+    clock = FakeClock()
+    client = LLMClient(
+        requests_per_minute=0, tokens_per_minute=0, max_retries=2,
+        transient_errors=transient_errors, sleep=clock.sleep,
+    )
+    call = _flaky([google_exceptions.TooManyRequests("429")] * 3)
+
+    with pytest.raises(UpstreamUnavailableError):
+        client.call(call)
+    assert client.stats()["calls"] == 3
+
+
+def test_client_does_not_retry_other_errors():
+    client = LLMClient(
+        requests_per_minute=0, tokens_per_minute=0, transient_errors=transient_errors
+    )
+
+    with pytest.raises(google_exceptions.InvalidArgument):
+        client.call(_flaky([google_exceptions.InvalidArgument("bad request")]))
+    assert client.stats()["calls"] == 1
+
+
+def test_open_breaker_rejects_calls_without_calling_upstream():
+    client = LLMClient(
+        requests_per_minute=0, tokens_per_minute=0, max_retries=0,
+        transient_errors=transient_errors,
+        breaker=CircuitBreaker(failure_threshold=1, reset_timeout=30),
+    )
+    with pytest.raises(UpstreamUnavailableError):
+        client.call(_flaky([google_exceptions.ServiceUnavailable("503")]))
+
+    with pytest.raises(UpstreamUnavailableError):
+        client.call(_flaky([]))
+    assert client.stats()["calls"] == 1
+    assert client.stats()["rejected"] == 1
+
+
+def test_client_waits_for_the_request_rate_limit():
+    clock = FakeClock()
+    client = LLMClient(tokens_per_minute=0)
+    client.request_bucket = TokenBucket(1, 1, clock=clock, sleep=clock.sleep)
+
+    client.call(_flaky([]))
+    client.call(_flaky([]))
+
+    assert clock.now == pytest.approx(1.0)
+    assert client.stats()["throttled"] == 1
@@ -0,0 +1,47 @@
+"""Tests for the /metrics endpoint."""
+
+from flask import Flask
+
+from src import metrics
+from src.database import get_engine
+
+
+def test_metrics_are_served_to_local_clients(client):
+    client.get("/projects")
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'promptforge_http_requests_total{method="GET",endpoint="main.projects"' in (
+        response.get_data(as_text=True)
+    )
+
+
+def test_metrics_are_hidden_from_other_clients(client):
+    remote = client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.7"})
+    proxied = client.get("/metrics", headers={"X-Forwarded-For": "203.0.113.7"})
+
+    assert remote.status_code == 404
+    assert proxied.status_code == 404
+
+
+def test_allowed_networks_are_configurable(app, client):
+    metrics.configure({**app.config, "METRICS_ALLOWED_IPS": "203.0.113.0/24"})
+    try:
+        remote = client.get("/metrics", environ_base={"REMOTE_ADDR": "203.0.113.7"})
+        local = client.get("/metrics")
+    finally:
+        metrics.configure(app.config)
+
+    assert remote.status_code == 200
+    assert local.status_code == 404
+
+
+def test_metrics_can_be_disabled(app):
+    metrics.configure({"METRICS_ENABLED": "false"})
+    try:
+        disabled = Flask(__name__)
+        metrics.init_app(disabled, get_engine())
+    finally:
+        metrics.configure(app.config)
+
+    assert disabled.test_client().get("/metrics").status_code == 404
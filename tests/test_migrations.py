@@ -0,0 +1,49 @@
+"""Tests for the versioned schema migrations."""
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.orm import Session
+
+from src.migrations import applied_versions, schema_differences, upgrade
+from src.models import Artifact, Project
+from src.search import ensure_search_index, search_projects
+
+LEGACY_SCHEMA = (
+    "CREATE TABLE projects (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL UNIQUE, "
+    "description TEXT, refined_prompt TEXT, frameworks_languages TEXT, checklist_steps TEXT, "
+    "cursor_rules_content TEXT, created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)",
+    "CREATE VIRTUAL TABLE projects_fts USING fts5(name, description, refined_prompt, "
+    "frameworks_languages, checklist_steps, content='projects', content_rowid='id')",
+    "CREATE TRIGGER projects_fts_ai AFTER INSERT ON projects BEGIN "
+    "INSERT INTO projects_fts(rowid, name, description, refined_prompt, frameworks_languages, "
+    "checklist_steps) VALUES (new.id, new.name, new.description, new.refined_prompt, "
+    "new.frameworks_languages, new.checklist_steps); END",
+)
+
+
+def test_initial_migration_converts_inline_texts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/legacy.db")
+    with engine.begin() as connection:
+        for statement in LEGACY_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(
+            text(
+                "INSERT INTO projects (name, refined_prompt, checklist_steps, created_at, "
+                "updated_at) VALUES (:name, :prompt, 'Shared checklist', '2024-01-01', "
+                "'2024-01-01')"
+            ),
+            [{"name": "Legacy", "prompt": "Pelican tracker"}, {"name": "Clone", "prompt": None}],
+        )
+
+    assert [migration.name for migration in upgrade(engine)] == ["0001_initial_schema"]
+    ensure_search_index(engine)
+
+    assert list(applied_versions(engine)) == [1]
+    assert schema_differences(engine) == []
+    with Session(engine) as db:
+        legacy = db.scalar(select(Project).where(Project.name == "Legacy"))
+        assert legacy.refined_prompt == "Pelican tracker"
+        assert legacy.checklist_steps == "Shared checklist"
+        # The shared checklist is stored once
+        assert db.scalar(select(func.count()).select_from(Artifact)) == 2
+        assert [result.id for result in search_projects(db, "pelican")] == [legacy.id]
+    engine.dispose()
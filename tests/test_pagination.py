@@ -0,0 +1,67 @@
+"""Tests for the keyset-paginated project list."""
+
+import re
+from datetime import datetime, timedelta
+from html import unescape
+from urllib.parse import unquote
+
+import pytest
+
+from src.models import Project
+
+PAGE_SIZE = 2
+
+
+@pytest.fixture
+def small_pages(app, monkeypatch):
+    """List a few projects per page."""
+    monkeypatch.setitem(app.config, "PROJECTS_PER_PAGE", PAGE_SIZE)
+
+
+def _projects(db) -> list[str]:
+    """Add projects, two of them created at the same instant, newest last."""
+    start = datetime(2024, 1, 1)
+    created = [start, start + timedelta(minutes=1), start + timedelta(minutes=1),
+               start + timedelta(minutes=2), start + timedelta(minutes=3)]
+    projects = [
+        Project(name=f"Listed {index}", description="Listed.", created_at=created_at)
+        for index, created_at in enumerate(created)
+    ]
+    db.add_all(projects)
+    db.commit()
+    # Newest first; ties are broken by the newer id
+    return [project.name for project in reversed(projects)]
+
+
+def _page(client, cursor=None) -> tuple[list[str], str]:
+    """Return the project names of a page and the cursor of the next one."""
+    query = {"after": cursor} if cursor is not None else {}
+    response = client.get("/projects", query_string=query)
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    names = re.findall(r">(Listed \d)</a>", html)
+    next_link = re.search(r'href="/projects\?after=([^"]+)"', html)
+    return names, unquote(unescape(next_link.group(1))) if next_link else None
+
+
+def test_cursor_walks_every_project_once(client, db, small_pages):
+    expected = _projects(db)
+
+    listed, cursor = _page(client)
+    pages = 1
+    while cursor:
+        names, cursor = _page(client, cursor)
+        listed += names
+        pages += 1
+
+    assert listed == expected
+    assert pages == 3
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "2024-13-01T00:00:00_1", "2024-01-01_x", ""])
+def test_malformed_cursor_shows_the_first_page(client, db, small_pages, cursor):
+    expected = _projects(db)
+
+    names, _ = _page(client, cursor)
+
+    assert names == expected[:PAGE_SIZE]
@@ -0,0 +1,66 @@
+"""Tests for editing and regenerating project artifacts."""
+
+from src.models import Project
+
+
+def _project(db) -> Project:
+    project = Project(
+        name="Editable",
+        refined_prompt="Build an editable project.",
+        frameworks_languages="Backend: Python, Flask",
+        checklist_steps="1. Edit the project",
+        cursor_rules_content="Rules",
+    )
+    db.add(project)
+    db.commit()
+    return project
+
+
+def test_form_edit_redirects_to_the_project(client, db, fake_model):
+    project = _project(db)
+
+    response = client.post(
+        f"/project/{project.id}/edit/frameworks_languages",
+        data={"content": "Backend: Go, chi"},
+        headers={"Accept": "text/html"},
+    )
+
+    assert response.status_code == 303
+    assert response.headers["Location"] == f"/project/{project.id}"
+    assert b"Backend: Go, chi" in client.get(response.headers["Location"]).data
+
+
+def test_form_regenerate_redirects_to_the_project(client, db, fake_model):
+    project = _project(db)
+
+    response = client.post(
+        f"/project/{project.id}/regenerate/checklist_steps", headers={"Accept": "text/html"}
+    )
+
+    assert response.status_code == 303
+    assert fake_model.calls == 1
+
+
+def test_form_error_is_shown_on_the_project_page(client, db):
+    project = _project(db)
+
+    response = client.post(
+        f"/project/{project.id}/edit/frameworks_languages",
+        data={"content": " "},
+        headers={"Accept": "text/html"},
+    )
+
+    assert response.status_code == 400
+    assert response.mimetype == "text/html"
+    assert b"Content is required." in response.data
+    # The error is not cached into the project page
+    assert b"Content is required." not in client.get(f"/project/{project.id}").data
+
+
+def test_json_error_stays_json(client, db):
+    project = _project(db)
+
+    response = client.post(f"/project/{project.id}/regenerate/name", json={})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "'name' cannot be regenerated."}
@@ -0,0 +1,47 @@
+"""Tests for conditional requests and cached project pages."""
+
+from src.models import Project
+
+
+def _project(db) -> Project:
+    project = Project(
+        name="Cached page",
+        description="A project page served from the render cache.",
+        refined_prompt="Build a page cache.",
+        frameworks_languages="Backend: Python, Flask",
+        checklist_steps="1. Cache the page",
+        cursor_rules_content="Rules",
+    )
+    db.add(project)
+    db.commit()
+    return project
+
+
+def test_unchanged_project_is_not_modified(client, db):
+    project = _project(db)
+    first = client.get(f"/project/{project.id}")
+    assert first.status_code == 200 and first.headers["ETag"]
+
+    again = client.get(
+        f"/project/{project.id}", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert again.status_code == 304
+
+
+def test_edit_invalidates_etag_and_page(client, db, fake_model):
+    project = _project(db)
+    first = client.get(f"/project/{project.id}")
+
+    edited = client.post(
+        f"/project/{project.id}/edit/frameworks_languages",
+        json={"content": "Backend: Go, chi"},
+    )
+    assert edited.status_code == 200
+    assert edited.get_json()["changed"] == ["frameworks_languages", "cursor_rules_content"]
+
+    after = client.get(
+        f"/project/{project.id}", headers={"If-None-Match": first.headers["ETag"]}
+    )
+    assert after.status_code == 200
+    assert after.headers["ETag"] != first.headers["ETag"]
+    assert b"Backend: Go, chi" in after.data
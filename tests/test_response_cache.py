@@ -0,0 +1,21 @@
+"""Tests for the Gemini response cache."""
+
+from src.response_cache import cache_stats, cached_generate
+
+
+def test_stats_are_read_from_the_stored_entries(db):
+    calls = []
+
+    def generate(prompt: str) -> str:
+        calls.append(prompt)
+        return f"Reply to {prompt}"
+
+    for prompt in ("first prompt", "first  prompt", "first prompt", "second prompt"):
+        cached_generate("models/fake-model", prompt, generate)
+
+    assert calls == ["first prompt", "second prompt"]
+    assert cache_stats() == {"entries": 2, "hits": 2, "hit_rate": 0.5}
+
+
+def test_empty_cache_has_no_hit_rate(db):
+    assert cache_stats() == {"entries": 0, "hits": 0, "hit_rate": None}
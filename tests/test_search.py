@@ -0,0 +1,83 @@
+"""Tests for full-text project search."""
+
+from sqlalchemy import delete, func, select, text
+
+from src.database import get_engine
+from src.models import Project
+from src.search import FTS_DOCS_TABLE, FTS_TABLE, rebuild_search_index, search_projects
+
+
+def _project(db, **fields) -> Project:
+    project = Project(
+        name=fields.pop("name", "Search"),
+        description=fields.pop("description", "A searchable project."),
+        **fields,
+    )
+    db.add(project)
+    db.commit()
+    return project
+
+
+def _hits(db, query: str) -> list[int]:
+    return [result.id for result in search_projects(db, query)]
+
+
+def _documents(db) -> int:
+    return db.scalar(text(f"SELECT count(*) FROM {FTS_TABLE}_docsize"))
+
+
+def test_compressed_prompt_text_is_found_and_highlighted(db):
+    project = _project(db, refined_prompt="Build a kanban board with websockets.")
+
+    (result,) = search_projects(db, "kanban")
+
+    assert result.id == project.id
+    assert "<mark>kanban</mark>" in result.snippet
+    assert str(result.name) == "Search"
+
+
+def test_update_replaces_the_indexed_text(db):
+    project = _project(db, refined_prompt="Build a kanban board.")
+
+    project.refined_prompt = "Build a recipe planner."
+    db.commit()
+
+    assert _hits(db, "kanban") == []
+    assert _hits(db, "recipe") == [project.id]
+
+
+def test_deleted_project_is_not_found(db):
+    project = _project(db, refined_prompt="Build a kanban board.")
+    other = _project(db, name="Other", refined_prompt="Another kanban tool.")
+
+    db.delete(project)
+    db.commit()
+    # Deletes outside the ORM are caught by the trigger
+    db.execute(delete(Project).where(Project.id == other.id))
+    db.commit()
+
+    assert _hits(db, "kanban") == []
+
+
+def test_name_matches_rank_first(db):
+    in_prompt = _project(db, name="Planner", refined_prompt="A ledger of expenses.")
+    in_name = _project(db, name="Ledger", refined_prompt="Track spending.")
+
+    assert _hits(db, "ledger") == [in_name.id, in_prompt.id]
+
+
+def test_rebuild_drops_replaced_documents(db):
+    # Start from an index holding no replaced documents of earlier tests
+    rebuild_search_index(get_engine())
+    project = _project(db, refined_prompt="Build a kanban board.")
+    project.refined_prompt = "Build a recipe planner."
+    db.commit()
+    assert _documents(db) == 2
+
+    # End the read transaction so the rebuild can write
+    db.commit()
+    rebuild_search_index(get_engine())
+
+    assert _documents(db) == 1
+    assert db.scalar(select(func.count()).select_from(text(FTS_DOCS_TABLE))) == 1
+    assert _hits(db, "recipe") == [project.id]
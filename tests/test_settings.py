@@ -0,0 +1,39 @@
+"""Tests for module settings read from the app config and the environment."""
+
+import pytest
+
+from src import context_cache, conversation, gemini_config, jobs
+from src.app import create_app
+
+
+@pytest.fixture
+def reconfigure(app, monkeypatch):
+    """Restore the settings of the test app after a test changed them."""
+    yield
+    monkeypatch.undo()
+    for module in (gemini_config, context_cache, conversation, jobs):
+        module.configure(app.config)
+
+
+def test_environment_set_after_import_takes_effect(monkeypatch, reconfigure):
+    # As when .env is loaded by create_app, after src was imported
+    monkeypatch.setenv("GEMINI_GENERATION_MODE", "single")
+    monkeypatch.setenv("JOB_WORKER", "external")
+    monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "123")
+    monkeypatch.setenv("GEMINI_CONTEXT_CACHE_DISABLED", "true")
+
+    create_app({"TESTING": True})
+
+    assert gemini_config.GENERATION_MODE == "single"
+    assert jobs.JOB_WORKER == "external"
+    assert conversation.CONTEXT_TOKEN_BUDGET == 123
+    assert context_cache.CONTEXT_CACHE_DISABLED is True
+
+
+def test_app_config_overrides_the_environment(monkeypatch, reconfigure):
+    monkeypatch.setenv("GEMINI_STAGE_TIMEOUT", "30")
+
+    create_app({"TESTING": True, "GEMINI_STAGE_TIMEOUT": 5, "GEMINI_MAX_RETRIES": 0})
+
+    assert gemini_config.STAGE_TIMEOUT_SECONDS == 5.0
+    assert gemini_config.llm_client.max_retries == 0
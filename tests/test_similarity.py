@@ -0,0 +1,50 @@
+"""Tests for reusing the artifacts of a similar project."""
+
+from sqlalchemy import func, select
+
+from src.database import SessionLocal
+from src.models import Conversation, Project
+from src.similarity import clone_project
+
+
+def _source(db) -> Project:
+    project = Project(
+        name="Source",
+        description="A task tracker.",
+        frameworks_languages="Flask",
+        checklist_steps="- [ ] Build it",
+        cursor_rules_content="# Rules",
+    )
+    db.add(project)
+    db.commit()
+    return project
+
+
+def test_clone_copies_the_artifacts_and_drops_the_conversation(db):
+    source = _source(db)
+    conversation = Conversation(project_name="Clone", project_description="Tasks.")
+    db.add(conversation)
+    db.commit()
+
+    project = clone_project(db, conversation, "Refined prompt.", source)
+
+    assert project.checklist_steps == source.checklist_steps
+    assert project.cursor_rules_content == source.cursor_rules_content
+    assert db.scalar(select(func.count()).select_from(Conversation)) == 0
+
+
+def test_clone_under_a_name_taken_meanwhile_returns_none(db):
+    source = _source(db)
+    conversation = Conversation(project_name="Raced", project_description="Tasks.")
+    db.add(conversation)
+    db.commit()
+
+    # Another request creates the name after the route checked it
+    other = SessionLocal()
+    other.add(Project(name="Raced"))
+    other.commit()
+    other.close()
+
+    assert clone_project(db, conversation, "Refined prompt.", source) is None
+    # The conversation survives to show the error
+    assert db.get(Conversation, conversation.id) is not None
@@ -0,0 +1,17 @@
+"""WSGI entry point for PromptForge.
+
+Production servers import ``app`` from here, e.g.::
+
+    gunicorn wsgi:app
+
+The environment is loaded before ``src`` is imported so that module-level
+settings read from ``.env`` see the same values as ``create_app``.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.app import create_app  # noqa: E402
+
+app = create_app()